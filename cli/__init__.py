@@ -0,0 +1 @@
+from .common import RECOGNIZERS, SYNTHESIZERS, parse_options, build_component, format_report
\ No newline at end of file
@@ -0,0 +1,213 @@
+from ..utils.metrics.word_error_rate import word_error_rate
+from ..speech_recognizer.whisper_profile import save_profile, host_id, DEFAULT_PROFILE_PATH
+from .common import SYNTHESIZERS, build_component, parse_options, format_report
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import multiprocessing as mp
+import numpy as np
+import argparse, itertools, json, os, resource, time
+
+# Sample texts rendered when no manifest is given
+SAMPLE_TEXTS = [
+    "Please tell me the weather forecast for tomorrow morning in London.",
+    "I would like to book a table for four people at seven thirty tonight.",
+    "The quick brown fox jumps over the lazy dog near the river bank.",
+    "Can you remind me to call my mother when I get home from work?",
+    "Our meeting has been moved to Thursday afternoon because of the holiday.",
+    "Turn off the lights in the living room and lock the front door.",
+    "She bought three apples, two bananas and a loaf of fresh bread.",
+    "How many kilometres is it from Paris to Berlin by train?",
+]
+SAMPLE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "eve_agent", "calibration")
+
+def render_samples(synthesizer :str = "gtts",
+                   directory :str = SAMPLE_DIRECTORY,
+                   **kwargs) -> List[Dict[str, str]]:
+    """
+    Render sample texts once with a synthesizer, return manifest rows {"audio", "text"}
+    :param synthesizer: Synthesizer name. Default: gtts
+    :param directory: Directory of rendered samples. Default: ~/.cache/eve_agent/calibration
+    :param kwargs: Synthesizer arguments
+    :return: Manifest rows
+    """
+    rows = []
+    component = None
+    os.makedirs(directory, exist_ok = True)
+    for (index, text) in enumerate(SAMPLE_TEXTS):
+        path = os.path.join(directory, f"{synthesizer}_{index:02d}.mp3")
+        if not os.path.exists(path):
+            component = component or build_component(SYNTHESIZERS, synthesizer, **kwargs)
+            component.generate(text = text, generated_path = path)
+        rows.append({"audio": path, "text": text})
+    return rows
+
+def load_manifest(manifest :str) -> List[Dict[str, str]]:
+    """Read JSONL rows {"audio", "text"}, relative audio paths are resolved from manifest directory"""
+    base = os.path.dirname(os.path.abspath(manifest))
+    rows = []
+    with open(manifest, "r") as file:
+        for line in file:
+            if line.strip():
+                row = json.loads(line)
+                audio = row["audio"] if os.path.isabs(row["audio"]) else os.path.join(base, row["audio"])
+                rows.append({"audio": audio, "text": row["text"]})
+    return rows
+
+def _benchmark(model_name :str,
+               device :str,
+               download_root :Optional[str],
+               settings :Dict[str, Any],
+               beam_size :int,
+               language :Optional[str],
+               samples :List[np.ndarray],
+               references :List[str]) -> Dict[str, Any]:
+    """Run one configuration in a fresh process, so memory of configurations is measured separately"""
+    from ..speech_recognizer.faster_whisper_recognizer import FasterWhisperRecognizer
+
+    start = time.perf_counter()
+    recognizer = FasterWhisperRecognizer(model_name = model_name,
+                                         device = device,
+                                         download_root = download_root,
+                                         **settings)
+    load_seconds = time.perf_counter() - start
+    recognizer.warmup(rounds = 1, detect_words = False, language = language)
+
+    # Concurrent requests use the model workers
+    def transcribe(audio :np.ndarray) -> str:
+        return recognizer.transcribe(audio, beam_size = beam_size, language = language).text or ""
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers = settings["num_workers"]) as executor:
+        hypotheses = list(executor.map(transcribe, samples))
+    wall = time.perf_counter() - start
+
+    audio_seconds = sum(len(audio) for audio in samples) / 16000
+    (wer, _, _) = word_error_rate(references, hypotheses)
+    return {"real_time_factor": wall / audio_seconds,
+            "word_error_rate": wer,
+            # Kilobytes on Linux
+            "peak_memory_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "load_seconds": load_seconds}
+
+def calibrate(rows :List[Dict[str, str]],
+              model_name :str = "small.en",
+              device :str = "cpu",
+              download_root :Optional[str] = None,
+              compute_types :Optional[List[str]] = None,
+              threads :Optional[List[int]] = None,
+              workers :Optional[List[int]] = None,
+              beam_sizes :Optional[List[int]] = None,
+              batch :Optional[List[bool]] = None,
+              language :Optional[str] = None,
+              wer_tolerance :float = 0.02) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Benchmark configurations and return best one: lowest real-time factor among configurations whose
+    word error rate is within wer_tolerance of best word error rate (lower memory breaks ties)
+    :param rows: Manifest rows {"audio", "text"}
+    :param model_name: Model name. Default: small.en
+    :param device: cpu or cuda. Default: cpu
+    :param download_root: Model directory. Default: None (Hugging Face cache)
+    :param compute_types: Compute types. Default: None (all supported by device)
+    :param threads: CPU threads. Default: None (powers of 2 up to available cores)
+    :param workers: Model workers. Default: None ([1, 2])
+    :param beam_sizes: Beam sizes. Default: None ([1, 5])
+    :param batch: Batched inference pipeline on/off. Default: None ([False], plus True when available)
+    :param language: Language of samples. Default: None (detected)
+    :param wer_tolerance: Accepted word error rate increase for speed. Default: 0.02
+    :return: (best result, all results)
+    """
+    import ctranslate2, faster_whisper
+    from faster_whisper.audio import decode_audio
+
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    compute_types = compute_types or sorted(ctranslate2.get_supported_compute_types(device))
+    threads = threads or [2 ** power for power in range(cores.bit_length()) if 2 ** power <= cores]
+    workers = workers or [1, 2]
+    beam_sizes = beam_sizes or [1, 5]
+    batch = batch or ([False, True] if hasattr(faster_whisper, "BatchedInferencePipeline") else [False])
+
+    samples = [decode_audio(row["audio"], sampling_rate = 16000) for row in rows]
+    references = [row["text"] for row in rows]
+    results = []
+    grid = list(itertools.product(compute_types, threads, workers, batch, beam_sizes))
+    for (position, (compute_type, cpu_threads, num_workers, use_batch, beam_size)) in enumerate(grid, start = 1):
+        # Threads of all workers must fit in available cores
+        if device == "cpu" and cpu_threads * num_workers > cores:
+            continue
+        settings = {"compute_type": compute_type, "cpu_threads": cpu_threads,
+                    "num_workers": num_workers, "use_batch": use_batch}
+        print(f"[{position}/{len(grid)}] {settings} beam_size={beam_size}")
+        try:
+            with ProcessPoolExecutor(max_workers = 1, mp_context = mp.get_context("spawn")) as executor:
+                metrics = executor.submit(_benchmark, model_name, device, download_root, settings,
+                                          beam_size, language, samples, references).result()
+        except Exception as e:
+            print(f"  failed: {e}")
+            continue
+        print("  " + ", ".join(f"{key}={round(value, 3)}" for (key, value) in metrics.items()))
+        results.append({"settings": settings, "transcribe": {"beam_size": beam_size}, "metrics": metrics})
+
+    if len(results) == 0:
+        raise RuntimeError("No configuration could be benchmarked")
+    best_wer = min(result["metrics"]["word_error_rate"] for result in results)
+    accepted = [result for result in results if result["metrics"]["word_error_rate"] <= best_wer + wer_tolerance]
+    best = min(accepted, key = lambda result: (result["metrics"]["real_time_factor"],
+                                               result["metrics"]["peak_memory_mb"]))
+    return (best, results)
+
+def _split(value :Optional[str], cast :Any = str) -> Optional[List[Any]]:
+    """Parse comma separated list"""
+    return None if not value else [cast(item.strip()) for item in value.split(",")]
+
+def parse_args(argv :Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Calibrate FasterWhisperRecognizer settings for this host")
+    parser.add_argument("-m", "--model", default = "small.en", help = "Model name. Default: small.en")
+    parser.add_argument("--manifest", default = None,
+                        help = "JSONL of {audio, text}. Default: sample texts rendered with --synthesizer")
+    parser.add_argument("--synthesizer", default = "gtts", choices = list(SYNTHESIZERS.keys()),
+                        help = "Synthesizer rendering sample texts when no manifest is given")
+    parser.add_argument("--synthesizer-option", action = "append", default = [], help = "Synthesizer argument key=value")
+    parser.add_argument("--device", default = "cpu", choices = ["cpu", "cuda"])
+    parser.add_argument("--download-root", default = None)
+    parser.add_argument("--compute-types", default = None, help = "e.g. int8,int8_float32. Default: all supported")
+    parser.add_argument("--threads", default = None, help = "e.g. 1,2,4. Default: powers of 2 up to cores")
+    parser.add_argument("--workers", default = None, help = "e.g. 1,2. Default: 1,2")
+    parser.add_argument("--beam-sizes", default = None, help = "e.g. 1,5. Default: 1,5")
+    parser.add_argument("--language", default = None)
+    parser.add_argument("--wer-tolerance", type = float, default = 0.02)
+    parser.add_argument("--profile", default = DEFAULT_PROFILE_PATH, help = "Profile file")
+    parser.add_argument("--results", default = None, help = "Save all results as JSON")
+    return parser.parse_args(argv)
+
+def main(argv :Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.manifest:
+        rows = load_manifest(args.manifest)
+    else:
+        rows = render_samples(args.synthesizer, **parse_options(args.synthesizer_option))
+
+    print(f"Host: {host_id()}, {len(rows)} samples")
+    (best, results) = calibrate(rows,
+                                model_name = args.model,
+                                device = args.device,
+                                download_root = args.download_root,
+                                compute_types = _split(args.compute_types),
+                                threads = _split(args.threads, int),
+                                workers = _split(args.workers, int),
+                                beam_sizes = _split(args.beam_sizes, int),
+                                language = args.language,
+                                wer_tolerance = args.wer_tolerance)
+    key = save_profile(args.model,
+                       settings = best["settings"],
+                       transcribe = best["transcribe"],
+                       metrics = best["metrics"],
+                       path = args.profile,
+                       device = args.device)
+    print(f"Saved profile {key} to {args.profile}")
+    print(format_report({**best["settings"], **best["transcribe"], **best["metrics"]}))
+    if args.results:
+        with open(args.results, "w") as file:
+            json.dump(results, file, indent = 2)
+
+if __name__ == "__main__":
+    main()
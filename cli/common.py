@@ -0,0 +1,67 @@
+from typing import Any, Dict, List, Tuple
+import importlib, json
+
+# Name: (module, class, keyword of model argument)
+RECOGNIZERS :Dict[str, Tuple[str, str, str]] = {
+    "faster_whisper": ("speech_recognizer.faster_whisper_recognizer", "FasterWhisperRecognizer", "model_name"),
+    "whisper_pool": ("speech_recognizer.whisper_worker_pool", "WhisperWorkerPool", "model_name"),
+    "groq": ("speech_recognizer.groq_recognizer", "GroqRecognizer", "model"),
+    "deepgram": ("speech_recognizer.deepgram_recognizer", "DeepGramRecognizer", "model"),
+    "assemblyai": ("speech_recognizer.assemblyai_recognizer", "AssemblyRecognizer", "model"),
+}
+
+SYNTHESIZERS :Dict[str, Tuple[str, str, str]] = {
+    "elevenlabs": ("speech_synthesizer.elevenlabs_synthesizer", "ElevenLabsSynthesizer", "model"),
+    "lmnt": ("speech_synthesizer.lmnt_synthesizer", "LmntSynthesizer", ""),
+    "deepgram": ("speech_synthesizer.deepgram_synthesizer", "DeepGramSynthesizer", ""),
+    "coqui": ("speech_synthesizer.coqui_synthesizer", "CoquiSynthesizer", "model"),
+    "gtts": ("speech_synthesizer.gtts_synthesizer", "GoogleTTSSynthesizer", ""),
+}
+
+def parse_options(items :List[str]) -> Dict[str, Any]:
+    """
+    Parse key=value options, values are read as JSON when possible (numbers, booleans, lists)
+    :param items: List of key=value strings
+    :return: Dictionary of options
+    """
+    options = {}
+    for item in items or []:
+        if "=" not in item:
+            raise ValueError(f"Option must be key=value: {item}")
+        (key, value) = item.split("=", 1)
+        try:
+            options[key.strip()] = json.loads(value)
+        except json.JSONDecodeError:
+            options[key.strip()] = value
+    return options
+
+def build_component(registry :Dict[str, Tuple[str, str, str]],
+                    name :str,
+                    model :str = "",
+                    **kwargs) -> Any:
+    """
+    Create recognizer or synthesizer by name, importing only its provider SDK
+    :param registry: RECOGNIZERS or SYNTHESIZERS
+    :param name: Component name
+    :param model: Model name. Default: "" (component default)
+    :param kwargs: Keyword arguments of component
+    :return: Component
+    """
+    if name not in registry:
+        raise ValueError(f"Unknown component: {name}. Choose from: {', '.join(registry.keys())}")
+    (module_name, class_name, model_argument) = registry[name]
+    package = __package__.rsplit(".", 1)[0]
+    component_class = getattr(importlib.import_module(f"{package}.{module_name}"), class_name)
+    if model and model_argument:
+        kwargs[model_argument] = model
+    return component_class(**kwargs)
+
+def format_report(report :Dict[str, Any]) -> str:
+    """Return readable report, one metric per line"""
+    width = max(len(key) for key in report.keys())
+    lines = []
+    for (key, value) in report.items():
+        if isinstance(value, float):
+            value = round(value, 3)
+        lines.append(f"{key.ljust(width)} : {value}")
+    return "\n".join(lines)
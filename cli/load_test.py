@@ -0,0 +1,286 @@
+from ..utils.metrics import LatencyTracker
+from ..utils.types import StatusCode, TranscriptionResponse
+from ..stand_in_servers import FaultProfile, synthetic_speech
+from ..utils.transport import SharedTransport
+from .common import RECOGNIZERS, SYNTHESIZERS, parse_options, build_component, format_report
+from typing import Any, Dict, List, Optional, Tuple
+import multiprocessing as mp
+import argparse, asyncio, httpx, json, os, tempfile, time
+
+# Scenario: (stand-in server, registry, component, operation)
+SCENARIOS :Dict[str, Tuple[str, Dict[str, Tuple[str, str, str]], str, str]] = {
+    "deepgram": ("DeepgramStandInServer", RECOGNIZERS, "deepgram", "transcribe"),
+    "groq": ("GroqStandInServer", RECOGNIZERS, "groq", "transcribe"),
+    "assemblyai": ("AssemblyStandInServer", RECOGNIZERS, "assemblyai", "transcribe"),
+    "elevenlabs": ("ElevenLabsStandInServer", SYNTHESIZERS, "elevenlabs", "synthesize"),
+    "lmnt": ("LmntStandInServer", SYNTHESIZERS, "lmnt", "synthesize"),
+    "deepgram_tts": ("DeepgramStandInServer", SYNTHESIZERS, "deepgram", "synthesize"),
+}
+# Client arguments of scenarios (async generation of ElevenLabs is opt-in, Groq client side limiter would
+# report its token bucket waits as client overhead)
+DEFAULT_OPTIONS :Dict[str, Dict[str, Any]] = {"elevenlabs": {"use_async": True},
+                                              "groq": {"use_rate_limit": False}}
+DEFAULT_TEXT = "Thanks for calling. Your appointment is confirmed for Tuesday at three in the afternoon."
+
+def _serve(server :str,
+           options :Dict[str, Any],
+           faults :Dict[str, Any],
+           connection) -> None:
+    """Run stand-in server in its own process until stop message, so it does not share CPU time with clients"""
+    from .. import stand_in_servers
+
+    async def serve() -> None:
+        instance = getattr(stand_in_servers, server)(faults = FaultProfile(**faults), **options)
+        await instance.start()
+        connection.send(instance.base_url)
+        # Wait for stop message
+        await asyncio.get_running_loop().run_in_executor(None, connection.recv)
+        await instance.stop()
+
+    asyncio.run(serve())
+
+async def _control(base_url :str,
+                   route :str) -> Dict[str, Any]:
+    """Call control route of stand-in server (stats, reset)"""
+    async with httpx.AsyncClient(base_url = base_url) as client:
+        response = await (client.get(f"/__stand_in__/{route}") if route == "stats" else
+                          client.post(f"/__stand_in__/{route}"))
+        response.raise_for_status()
+        return response.json()
+
+async def _call(component :Any,
+                operation :str,
+                payload :Any,
+                directory :str,
+                index :int) -> Optional[str]:
+    """Run one operation, return failure name or None on success"""
+    try:
+        if operation == "transcribe":
+            response = await component.atranscribe(payload)
+            if isinstance(response, TranscriptionResponse) and response.status_code != StatusCode.SUCCESS:
+                return "failed_status"
+        else:
+            path = os.path.join(directory, f"{index}.mp3")
+            await component.agenerate(text = payload, generated_path = path, format = "mp3")
+            # Keep disk usage flat
+            if os.path.exists(path):
+                os.remove(path)
+    except Exception as e:
+        return type(e).__name__
+    return None
+
+async def run_load(component :Any,
+                   operation :str,
+                   payload :Any,
+                   requests :int,
+                   concurrency :int) -> Dict[str, Any]:
+    """
+    Run operations with fixed concurrency (closed loop: each worker starts next operation when previous one ends)
+    :param component: Recognizer (atranscribe) or synthesizer (agenerate)
+    :param operation: transcribe or synthesize
+    :param payload: Audio bytes or text
+    :param requests: Number of operations
+    :param concurrency: Number of concurrent operations
+    :return: {"ok", "failed", "failures", "wall_seconds", "cpu_seconds", "latency", "latency_total"}
+    """
+    latency = LatencyTracker(window = max(requests, 1))
+    failures :Dict[str, int] = {}
+    total = 0.0
+    indexes = iter(range(requests))
+
+    with tempfile.TemporaryDirectory() as directory:
+        async def worker() -> None:
+            nonlocal total
+            for index in indexes:
+                start = time.perf_counter()
+                failure = await _call(component, operation, payload, directory, index)
+                elapsed = time.perf_counter() - start
+                latency.record(elapsed)
+                total += elapsed
+                if failure is not None:
+                    failures[failure] = failures.get(failure, 0) + 1
+
+        cpu = time.process_time()
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(max(min(concurrency, requests), 1))])
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu
+
+    failed = sum(failures.values())
+    return {"ok": requests - failed,
+            "failed": failed,
+            "failures": failures,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "latency": latency,
+            "latency_total": total}
+
+async def load_test(scenario :str,
+                    requests :int = 200,
+                    concurrency :int = 16,
+                    warmup :int = 5,
+                    faults :Optional[FaultProfile] = None,
+                    client_options :Optional[Dict[str, Any]] = None,
+                    server_options :Optional[Dict[str, Any]] = None,
+                    text :str = DEFAULT_TEXT,
+                    audio :Optional[str] = None,
+                    in_process :bool = False,
+                    shared_transport :bool = False) -> Dict[str, Any]:
+    """
+    Drive real client of a provider against its stand-in server and report throughput, latency and
+    overhead of client side: mean latency minus mean server time per operation (injected latency included),
+    and client CPU time per operation. Server runs in another process unless in_process is set.
+    :param scenario: Scenario name (see SCENARIOS)
+    :param requests: Number of measured operations. Default: 200
+    :param concurrency: Number of concurrent operations. Default: 16
+    :param warmup: Number of operations before measuring (connections, lazy clients). Default: 5
+    :param faults: Injected latency and errors. Default: None (no fault)
+    :param client_options: Client arguments. Default: None
+    :param server_options: Stand-in server arguments. Default: None
+    :param text: Text of synthesis. Default: DEFAULT_TEXT
+    :param audio: Audio file of transcription. Default: None (synthetic speech of text)
+    :param in_process: Run server on client event loop (debugging). Default: False
+    :param shared_transport: Send requests over a SharedTransport and report its connection reuse. Default: False
+    :return: Report
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario: {scenario}. Choose from: {', '.join(SCENARIOS.keys())}")
+    (server, registry, name, operation) = SCENARIOS[scenario]
+    faults = faults or FaultProfile()
+
+    # Start stand-in server
+    process = None
+    instance = None
+    if in_process:
+        from .. import stand_in_servers
+        instance = getattr(stand_in_servers, server)(faults = faults, **(server_options or {}))
+        await instance.start()
+        base_url = instance.base_url
+    else:
+        (connection, child) = mp.get_context("spawn").Pipe()
+        process = mp.get_context("spawn").Process(target = _serve,
+                                                  args = (server, server_options or {}, faults.model_dump(), child),
+                                                  daemon = True)
+        process.start()
+        base_url = await asyncio.get_running_loop().run_in_executor(None, connection.recv)
+
+    component = None
+    transport = SharedTransport() if shared_transport else None
+    try:
+        options = {"api_key": "stand-in", **DEFAULT_OPTIONS.get(scenario, {}), **(client_options or {})}
+        if transport is not None:
+            options["transport"] = transport
+        component = build_component(registry, name, base_url = base_url, **options)
+        # Define payload
+        if operation == "transcribe":
+            if audio is not None:
+                with open(audio, "rb") as file:
+                    payload = file.read()
+            else:
+                payload = synthetic_speech(text, sample_rate = 16000)[0].to_wav_bytes()
+        else:
+            payload = text
+
+        if warmup > 0:
+            await run_load(component, operation, payload, requests = warmup, concurrency = min(concurrency, warmup))
+        await _control(base_url, "reset")
+        if transport is not None:
+            transport.stats.reset()
+        result = await run_load(component, operation, payload, requests = requests, concurrency = concurrency)
+        stats = await _control(base_url, "stats")
+    finally:
+        if component is not None and hasattr(component, "aclose"):
+            await component.aclose()
+        if transport is not None:
+            await transport.aclose()
+        if instance is not None:
+            await instance.stop()
+        if process is not None:
+            connection.send("stop")
+            process.join(timeout = 5)
+
+    latency = result["latency"]
+    mean_latency = result["latency_total"] / max(requests, 1)
+    server_time = stats["service_time_total"] / max(requests, 1)
+    report = {"scenario": scenario,
+              "requests": requests,
+              "concurrency": concurrency,
+              "ok": result["ok"],
+              "failed": result["failed"],
+              "failures": result["failures"],
+              "throughput_per_second": requests / result["wall_seconds"],
+              "latency_mean_ms": mean_latency * 1000,
+              "latency_p50_ms": latency.percentile(50) * 1000,
+              "latency_p95_ms": latency.percentile(95) * 1000,
+              "latency_p99_ms": latency.percentile(99) * 1000,
+              "latency_max_ms": latency.percentile(100) * 1000,
+              "server_requests": int(stats.get("requests", 0)),
+              "server_rate_limited": int(stats.get("rate_limited", 0)),
+              "server_injected_errors": int(stats.get("injected_error", 0)),
+              "server_time_per_operation_ms": server_time * 1000,
+              "client_overhead_per_operation_ms": (mean_latency - server_time) * 1000,
+              "client_cpu_per_operation_ms": result["cpu_seconds"] / max(requests, 1) * 1000}
+    if transport is not None:
+        report.update({"transport_requests": int(transport.stats.get("requests")),
+                       "transport_connections_opened": int(transport.stats.get("connections_opened")),
+                       "transport_connection_reuse": transport.connection_reuse,
+                       "transport_http2": transport.http2})
+    return report
+
+def parse_args(argv :Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Load-test provider clients against local stand-in servers")
+    parser.add_argument("scenario", choices = list(SCENARIOS.keys()))
+    parser.add_argument("-n", "--requests", type = int, default = 200)
+    parser.add_argument("-c", "--concurrency", type = int, default = 16)
+    parser.add_argument("--warmup", type = int, default = 5)
+    parser.add_argument("--latency", type = float, default = 0.0, help = "Mean injected latency in second")
+    parser.add_argument("--jitter", type = float, default = 0.0, help = "Spread of injected latency in second")
+    parser.add_argument("--distribution", default = "fixed",
+                        choices = ["fixed", "uniform", "normal", "exponential", "lognormal"])
+    parser.add_argument("--error-rate", type = float, default = 0.0, help = "Share of requests failed")
+    parser.add_argument("--error-status", type = int, default = 500)
+    parser.add_argument("--rate-limit-rate", type = float, default = 0.0, help = "Share of requests rejected with 429")
+    parser.add_argument("--retry-after", type = float, default = 1.0, help = "Retry-After of 429 in second")
+    parser.add_argument("--seed", type = int, default = None)
+    parser.add_argument("--option", action = "append", default = [],
+                        help = "Client argument key=value (e.g. use_rate_limit=true for groq)")
+    parser.add_argument("--server-option", action = "append", default = [],
+                        help = "Stand-in server argument key=value (e.g. processing_time=0.2)")
+    parser.add_argument("--text", default = DEFAULT_TEXT, help = "Text of synthesis")
+    parser.add_argument("--audio", default = None, help = "Audio file of transcription. Default: synthetic speech")
+    parser.add_argument("--in-process", action = "store_true", help = "Run server in client process")
+    parser.add_argument("--shared-transport", action = "store_true",
+                        help = "Send requests over a shared connection pool and report its connection reuse")
+    parser.add_argument("--report", default = None, help = "Save report as JSON")
+    return parser.parse_args(argv)
+
+def main(argv :Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    faults = FaultProfile(latency = args.latency,
+                          jitter = args.jitter,
+                          distribution = args.distribution,
+                          error_rate = args.error_rate,
+                          error_status = args.error_status,
+                          rate_limit_rate = args.rate_limit_rate,
+                          retry_after = args.retry_after,
+                          seed = args.seed)
+    report = asyncio.run(load_test(args.scenario,
+                                   requests = args.requests,
+                                   concurrency = args.concurrency,
+                                   warmup = args.warmup,
+                                   faults = faults,
+                                   client_options = parse_options(args.option),
+                                   server_options = parse_options(args.server_option),
+                                   text = args.text,
+                                   audio = args.audio,
+                                   in_process = args.in_process,
+                                   shared_transport = args.shared_transport))
+    print(format_report({key: value for (key, value) in report.items() if not isinstance(value, dict)}))
+    if report["failures"]:
+        print("failures: " + ", ".join(f"{name}={count}" for (name, count) in report["failures"].items()))
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump(report, file, indent = 2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+from ..utils.metrics import LatencyTracker
+from .common import SYNTHESIZERS, parse_options, build_component, format_report
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import argparse, asyncio, json, os, shutil, threading, time
+
+# Providers with native async generation, the others run on a worker pool
+ASYNC_PROVIDERS = ("elevenlabs", "lmnt", "deepgram")
+# Default number of concurrent syntheses per provider
+DEFAULT_CONCURRENCY = {"elevenlabs": 4, "lmnt": 8, "deepgram": 8, "coqui": 1, "gtts": 4}
+
+def load_jobs(manifest :str,
+              default_provider :Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Read JSONL rows {"text", "output", "voice", "provider", "settings"} and group identical syntheses.
+    Rows are identical when provider, text, voice, settings and output extension are equal.
+    Relative outputs are resolved from manifest directory.
+    :param manifest: JSONL path
+    :param default_provider: Provider of rows without provider. Default: None
+    :return: List of jobs {"provider", "text", "voice", "settings", "outputs"}
+    """
+    base = os.path.dirname(os.path.abspath(manifest))
+    jobs :Dict[Tuple, Dict[str, Any]] = {}
+    with open(manifest, "r") as file:
+        for (number, line) in enumerate(file, start = 1):
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            provider = row.get("provider") or default_provider
+            if not row.get("text") or not row.get("output") or not provider:
+                raise ValueError(f"Line {number}: text, output and provider are required")
+            if provider not in SYNTHESIZERS:
+                raise ValueError(f"Line {number}: unknown provider {provider}")
+            output = row["output"] if os.path.isabs(row["output"]) else os.path.join(base, row["output"])
+            settings = row.get("settings") or {}
+            key = (provider, row["text"], row.get("voice"), json.dumps(settings, sort_keys = True),
+                   os.path.splitext(output)[1].lower())
+            job = jobs.setdefault(key, {"provider": provider,
+                                        "text": row["text"],
+                                        "voice": row.get("voice"),
+                                        "settings": settings,
+                                        "outputs": []})
+            if output not in job["outputs"]:
+                job["outputs"].append(output)
+    return list(jobs.values())
+
+class BatchSynthesizer():
+    def __init__(self,
+                 provider_options :Optional[Dict[str, Dict[str, Any]]] = None,
+                 concurrency :Optional[Dict[str, int]] = None):
+        """
+        Render synthesis jobs with bounded concurrency per provider. ElevenLabs, LMNT and Deepgram run
+        as coroutines on one event loop, Coqui and gTTS run on a thread pool with one synthesizer per thread.
+        :param provider_options: Constructor arguments by provider. Default: None
+        :param concurrency: Concurrent syntheses by provider. Default: DEFAULT_CONCURRENCY
+        """
+        self.__provider_options = provider_options or {}
+        self.__concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        # Async synthesizers by provider
+        self.__synthesizers :Dict[str, Any] = {}
+        # Thread pools and thread local synthesizers
+        self.__executors :Dict[str, ThreadPoolExecutor] = {}
+        self.__local = threading.local()
+        # Stats
+        self.__latency :Dict[str, LatencyTracker] = {}
+        self.__counts :Dict[str, Dict[str, int]] = {}
+
+    def _create(self, provider :str) -> Any:
+        """Create synthesizer of provider"""
+        options = dict(self.__provider_options.get(provider, {}))
+        if provider == "elevenlabs":
+            options.setdefault("use_async", True)
+        return build_component(SYNTHESIZERS, provider, **options)
+
+    def _thread_synthesizer(self, provider :str) -> Any:
+        """Return synthesizer of current worker thread (models are not shared between threads)"""
+        synthesizers = self.__local.__dict__.setdefault("synthesizers", {})
+        if provider not in synthesizers:
+            synthesizers[provider] = self._create(provider)
+        return synthesizers[provider]
+
+    @staticmethod
+    def _arguments(job :Dict[str, Any], path :str) -> Dict[str, Any]:
+        """Return generate arguments of job"""
+        arguments = {**job["settings"], "text": job["text"], "generated_path": path}
+        if job["voice"] is not None:
+            arguments["voice"] = job["voice"]
+        return arguments
+
+    def _generate(self, provider :str, arguments :Dict[str, Any]) -> None:
+        """Run blocking generation on worker thread"""
+        self._thread_synthesizer(provider).generate(**arguments)
+
+    async def _render(self,
+                      job :Dict[str, Any],
+                      semaphore :asyncio.Semaphore) -> bool:
+        """Render one job to its missing outputs, return True on success"""
+        provider = job["provider"]
+        counts = self.__counts.setdefault(provider, {"rendered": 0, "failed": 0, "characters": 0})
+        missing = [path for path in job["outputs"] if not os.path.exists(path)]
+        target = missing[0]
+        # Render next to output, then move, so an interrupted run never leaves a truncated output
+        (root, extension) = os.path.splitext(target)
+        temporary = f"{root}.partial{extension}"
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok = True)
+
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                arguments = self._arguments(job, temporary)
+                if provider in ASYNC_PROVIDERS:
+                    if provider not in self.__synthesizers:
+                        self.__synthesizers[provider] = self._create(provider)
+                    await self.__synthesizers[provider].agenerate(**arguments)
+                else:
+                    if provider not in self.__executors:
+                        self.__executors[provider] = ThreadPoolExecutor(max_workers = self.__concurrency[provider],
+                                                                        thread_name_prefix = provider)
+                    await asyncio.get_running_loop().run_in_executor(self.__executors[provider],
+                                                                     self._generate, provider, arguments)
+                os.replace(temporary, target)
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"Failed {target}: {e}")
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+                return False
+            self.__latency.setdefault(provider, LatencyTracker(window = 10000)).record(time.perf_counter() - start)
+
+        # Duplicates are copied
+        for path in missing[1:]:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok = True)
+            shutil.copyfile(target, path)
+        counts["rendered"] += 1
+        counts["characters"] += len(job["text"])
+        return True
+
+    async def arun(self, jobs :List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Render jobs, skipping jobs whose outputs all exist
+        :param jobs: Jobs of load_jobs
+        :return: Report
+        """
+        todo = [job for job in jobs if any(not os.path.exists(path) for path in job["outputs"])]
+        semaphores = {provider: asyncio.Semaphore(self.__concurrency[provider])
+                      for provider in set(job["provider"] for job in todo)}
+        print(f"{len(jobs)} unique syntheses, {len(jobs) - len(todo)} already rendered, {len(todo)} to render")
+
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*[self._render(job, semaphores[job["provider"]]) for job in todo])
+        finally:
+            for executor in self.__executors.values():
+                executor.shutdown(wait = True)
+            self.__executors.clear()
+        wall = time.perf_counter() - start
+
+        rendered = sum(counts["rendered"] for counts in self.__counts.values())
+        characters = sum(counts["characters"] for counts in self.__counts.values())
+        report = {"outputs": sum(len(job["outputs"]) for job in jobs),
+                  "unique": len(jobs),
+                  "skipped": len(jobs) - len(todo),
+                  "rendered": rendered,
+                  "failed": sum(counts["failed"] for counts in self.__counts.values()),
+                  "wall_seconds": wall,
+                  "renders_per_second": rendered / wall if wall > 0 else 0.0,
+                  "characters_per_second": characters / wall if wall > 0 else 0.0}
+        # Latency by provider
+        for (provider, counts) in self.__counts.items():
+            latency = self.__latency.get(provider, LatencyTracker())
+            report[provider] = {"rendered": counts["rendered"],
+                                "failed": counts["failed"],
+                                "p50": latency.percentile(50),
+                                "p95": latency.percentile(95),
+                                "max": latency.percentile(100)}
+        return report
+
+    def run(self, jobs :List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Synchronously render jobs, see arun"""
+        return asyncio.run(self.arun(jobs))
+
+def parse_args(argv :Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Render a JSONL of (text, voice, provider, settings, output) rows")
+    parser.add_argument("manifest", help = "JSONL manifest")
+    parser.add_argument("-p", "--provider", default = None, choices = list(SYNTHESIZERS.keys()),
+                        help = "Provider of rows without provider")
+    parser.add_argument("--option", action = "append", default = [],
+                        help = "Synthesizer argument provider.key=value (e.g. elevenlabs.model=eleven_multilingual_v2)")
+    parser.add_argument("--concurrency", action = "append", default = [],
+                        help = "Concurrent syntheses provider=N (e.g. lmnt=16)")
+    parser.add_argument("--report", default = None, help = "Save report as JSON")
+    return parser.parse_args(argv)
+
+def main(argv :Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    # Group options by provider
+    provider_options :Dict[str, Dict[str, Any]] = {}
+    for (key, value) in parse_options(args.option).items():
+        if "." not in key:
+            raise ValueError(f"Option must be provider.key=value: {key}")
+        (provider, name) = key.split(".", 1)
+        provider_options.setdefault(provider, {})[name] = value
+
+    batch = BatchSynthesizer(provider_options = provider_options,
+                             concurrency = {key: int(value) for (key, value) in parse_options(args.concurrency).items()})
+    report = batch.run(load_jobs(args.manifest, default_provider = args.provider))
+
+    print(format_report({key: value for (key, value) in report.items() if not isinstance(value, dict)}))
+    for (key, value) in report.items():
+        if isinstance(value, dict):
+            print(f"{key}: " + ", ".join(f"{name}={round(item, 3) if isinstance(item, float) else item}"
+                                         for (name, item) in value.items()))
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump(report, file, indent = 2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+from ..utils.types import CompositeRecognizer, StatusCode, TranscriptionResponse
+from ..utils.audio import probe_duration
+from .common import RECOGNIZERS, parse_options, build_component, format_report
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, List, Optional, Set, Tuple
+import argparse, json, os, time
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg", ".opus", ".m4a", ".aac", ".webm")
+# Recognizer arguments of the command line (Groq client is async by default, batch calls transcribe)
+DEFAULT_OPTIONS :Dict[str, Dict[str, Any]] = {"groq": {"use_async": False}}
+
+def list_inputs(source :str) -> List[str]:
+    """
+    Return audio files of a directory (recursive) or a manifest.
+    Manifest is a JSONL file with "audio" (or "path") field, or a text file with one path per line.
+    Relative paths of manifest are resolved from manifest directory.
+    :param source: Directory or manifest path
+    :return: List of file paths
+    """
+    if os.path.isdir(source):
+        paths = []
+        for (root, _, files) in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(AUDIO_EXTENSIONS))
+        return sorted(paths)
+
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Input {source} not found")
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, "r") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = line
+            if line.startswith("{"):
+                row = json.loads(line)
+                path = row.get("audio") or row.get("path")
+            paths.append(path if os.path.isabs(path) else os.path.join(base, path))
+    return paths
+
+def load_checkpoint(output :str,
+                    retry_failed :bool = True) -> Set[str]:
+    """
+    Return files already written to output. Output is compacted so that each file keeps one row: a partially
+    written last line (interrupted run) is removed, a file written several times keeps its last row, and rows of
+    files to retry are removed (written again when retried).
+    :param output: Output JSONL path
+    :param retry_failed: Failed files are not considered done. Default: True
+    :return: Set of file paths
+    """
+    if not os.path.exists(output):
+        return set()
+
+    # {file: (line, succeeded)}, last row wins
+    rows :Dict[str, Tuple[bytes, bool]] = {}
+    with open(output, "rb") as file:
+        for line in file:
+            try:
+                row = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                break
+            if not line.endswith(b"\n"):
+                break
+            rows.pop(row["audio"], None)
+            rows[row["audio"]] = (line, row.get("status_code") == StatusCode.SUCCESS.value)
+    if retry_failed:
+        rows = {path: (line, succeeded) for (path, (line, succeeded)) in rows.items() if succeeded}
+
+    # Rewrite when something was dropped
+    if sum(len(line) for (line, _) in rows.values()) < os.path.getsize(output):
+        temp = f"{output}.tmp"
+        with open(temp, "wb") as file:
+            file.writelines(line for (line, _) in rows.values())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, output)
+    return set(rows.keys())
+
+def transcribe_file(recognizer :Any,
+                    path :str,
+                    options :Dict[str, Any]) -> Dict[str, Any]:
+    """Transcribe one file and return its output row, a missing or unreadable file is recorded as failed"""
+    duration = None
+    start = time.perf_counter()
+    try:
+        duration = probe_duration(path)
+        response = CompositeRecognizer._to_response(recognizer.transcribe(path, **options))
+    except Exception as e:
+        response = TranscriptionResponse(status_code = StatusCode.FAILED,
+                                         description = str(e))
+    row = {"audio": path,
+           "duration": duration,
+           "latency": round(time.perf_counter() - start, 4)}
+    row.update(response.model_dump(mode = "json", exclude_none = True))
+    return row
+
+def run(recognizer :Any,
+        paths :List[str],
+        output :str,
+        options :Optional[Dict[str, Any]] = None,
+        workers :int = 4,
+        retry_failed :bool = True,
+        fsync_every :int = 20) -> Dict[str, Any]:
+    """
+    Transcribe files in parallel, appending one JSON line per file to output, skipping files already in output
+    :param recognizer: Any recognizer
+    :param paths: Audio file paths
+    :param output: Output JSONL path, also used as checkpoint
+    :param options: Keyword arguments of transcribe. Default: None
+    :param workers: Number of files transcribed in parallel. Default: 4
+    :param retry_failed: Transcribe again files which failed in previous runs. Default: True
+    :param fsync_every: Force output to disk every N files. Default: 20
+    :return: Report
+    """
+    options = options or {}
+    done = load_checkpoint(output, retry_failed = retry_failed)
+    todo = [path for path in dict.fromkeys(paths) if path not in done]
+    print(f"{len(paths)} files, {len(paths) - len(todo)} already done, {len(todo)} to transcribe")
+
+    counts = {"succeeded": 0, "failed": 0}
+    audio_seconds = 0.0
+    processing_seconds = 0.0
+    interrupted = False
+    start = time.perf_counter()
+
+    with open(output, "a") as file, ThreadPoolExecutor(max_workers = workers) as executor:
+        pending = set()
+        remaining = iter(todo)
+        written = 0
+        try:
+            while True:
+                # Keep a bounded number of files in flight
+                for path in remaining:
+                    pending.add(executor.submit(transcribe_file, recognizer, path, options))
+                    if len(pending) >= workers * 2:
+                        break
+                if len(pending) == 0:
+                    break
+                (finished, pending) = wait(pending, return_when = FIRST_COMPLETED)
+                for future in finished:
+                    row = future.result()
+                    file.write(json.dumps(row, ensure_ascii = False) + "\n")
+                    file.flush()
+                    written += 1
+                    if written % fsync_every == 0:
+                        os.fsync(file.fileno())
+                    # Update report
+                    succeeded = row["status_code"] == StatusCode.SUCCESS.value
+                    counts["succeeded" if succeeded else "failed"] += 1
+                    audio_seconds += row["duration"] or 0.0
+                    processing_seconds += row["latency"]
+        except KeyboardInterrupt:
+            # Finish files in flight, resume later
+            interrupted = True
+            for future in pending:
+                future.cancel()
+            for future in pending:
+                if not future.cancelled():
+                    file.write(json.dumps(future.result(), ensure_ascii = False) + "\n")
+        finally:
+            file.flush()
+            os.fsync(file.fileno())
+
+    wall = time.perf_counter() - start
+    processed = counts["succeeded"] + counts["failed"]
+    return {"files": len(paths),
+            "skipped": len(paths) - len(todo),
+            "succeeded": counts["succeeded"],
+            "failed": counts["failed"],
+            "interrupted": interrupted,
+            "wall_seconds": wall,
+            "files_per_second": processed / wall if wall > 0 else 0.0,
+            "audio_hours": audio_seconds / 3600,
+            "audio_hours_per_hour": audio_seconds / wall if wall > 0 else 0.0,
+            "real_time_factor": wall / audio_seconds if audio_seconds > 0 else None,
+            "mean_latency": processing_seconds / processed if processed > 0 else None}
+
+def parse_args(argv :Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Resumable batch transcription of a directory or manifest")
+    parser.add_argument("input", help = "Directory of audio files, JSONL manifest (audio field) or text list")
+    parser.add_argument("-o", "--output", required = True, help = "Output JSONL, also used as checkpoint")
+    parser.add_argument("-r", "--recognizer", default = "faster_whisper", choices = list(RECOGNIZERS.keys()))
+    parser.add_argument("-m", "--model", default = "", help = "Model name. Default: recognizer default")
+    parser.add_argument("--option", action = "append", default = [], help = "Recognizer argument key=value")
+    parser.add_argument("--transcribe-option", action = "append", default = [],
+                        help = "Transcribe argument key=value (e.g. language=en, detect_words=true)")
+    parser.add_argument("-w", "--workers", type = int, default = 4, help = "Files transcribed in parallel")
+    parser.add_argument("--no-retry-failed", action = "store_true", help = "Skip files which failed before")
+    parser.add_argument("--report", default = None, help = "Save report as JSON")
+    return parser.parse_args(argv)
+
+def main(argv :Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    options = {**DEFAULT_OPTIONS.get(args.recognizer, {}), **parse_options(args.option)}
+    recognizer = build_component(RECOGNIZERS, args.recognizer, model = args.model, **options)
+    try:
+        report = run(recognizer = recognizer,
+                     paths = list_inputs(args.input),
+                     output = args.output,
+                     options = parse_options(args.transcribe_option),
+                     workers = args.workers,
+                     retry_failed = not args.no_retry_failed)
+    finally:
+        if hasattr(recognizer, "close"):
+            recognizer.close()
+
+    print(format_report(report))
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump(report, file, indent = 2)
+
+if __name__ == "__main__":
+    main()
@@ -9,3 +9,7 @@ GROQ_KEY = os.getenv("GROQ_KEY")
 DEEPGRAM_KEY = os.getenv("DEEPGRAM_KEY")
 ELEVEN_API_KEY = os.getenv("ELEVEN_API_KEY")
 LMNT_KEY = os.getenv("LMNT_KEY")
+
+# Audio admission control
+AUDIO_MEMORY_BUDGET = int(float(os.getenv("AUDIO_MEMORY_BUDGET_MB", "512")) * 1024 * 1024)
+AUDIO_ADMISSION_MODE = os.getenv("AUDIO_ADMISSION_MODE", "wait")
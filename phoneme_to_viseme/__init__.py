@@ -1 +1,2 @@
-from .phonemizer_mapper import PhonemizerMapper
\ No newline at end of file
+from .phonemizer_mapper import PhonemizerMapper
+from .backend_pool import EspeakBackendPool
\ No newline at end of file
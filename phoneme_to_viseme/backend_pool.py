@@ -0,0 +1,133 @@
+from phonemizer.backend import EspeakBackend
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Iterator
+import threading, time
+
+class EspeakBackendPool():
+    # Process-wide pool
+    _default :Optional["EspeakBackendPool"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self,
+                 max_size :int = 4,
+                 timeout :Optional[float] = None):
+        """
+        Thread-safe per-language pool of EspeakBackend. A backend is used by one thread at a time and reused
+        afterwards, so initialization cost is paid once per pooled instance instead of once per request.
+        :param max_size: Maximum number of backends per language. Default: 4
+        :param timeout: Maximum waiting time of checkout in second when all backends are busy. Default: None (no limit)
+        """
+        if max_size < 1:
+            raise ValueError("Max size must be at least 1")
+
+        # Define params
+        self.__max_size = max_size
+        self.__timeout = timeout
+        # Define state
+        self.__condition = threading.Condition()
+        self.__idle :Dict[str, List[EspeakBackend]] = {}
+        self.__created :Dict[str, int] = {}
+
+    @classmethod
+    def default(cls) -> "EspeakBackendPool":
+        """Return process-wide pool shared by mappers"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @property
+    def max_size(self) -> int:
+        """Return maximum number of backends per language"""
+        return self.__max_size
+
+    def size(self, lang :str) -> int:
+        """Return number of created backends of a language"""
+        with self.__condition:
+            return self.__created.get(lang, 0)
+
+    def idle(self, lang :str) -> int:
+        """Return number of idle backends of a language"""
+        with self.__condition:
+            return len(self.__idle.get(lang, []))
+
+    def prewarm(self,
+                lang :str,
+                count :int = 1) -> None:
+        """
+        Create backends ahead of first request
+        :param lang: Language (en-gb, en-us, ...)
+        :param count: Number of idle backends wanted (capped by max size)
+        :return: None
+        """
+        backends = []
+        try:
+            while len(backends) < count:
+                with self.__condition:
+                    if len(self.__idle.get(lang, [])) + len(backends) >= count \
+                            or self.__created.get(lang, 0) >= self.__max_size:
+                        break
+                backends.append(self.checkout(lang))
+        finally:
+            for backend in backends:
+                self.checkin(lang, backend)
+
+    def checkout(self,
+                 lang :str,
+                 timeout :Optional[float] = None) -> EspeakBackend:
+        """
+        Take a backend for exclusive use, creating one when none is idle and pool is not full
+        :param lang: Language (en-gb, en-us, ...)
+        :param timeout: Maximum waiting time in second. Default: None (pool timeout)
+        :return: EspeakBackend
+        """
+        timeout = timeout if timeout is not None else self.__timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self.__condition:
+            while True:
+                idle = self.__idle.setdefault(lang, [])
+                if len(idle) > 0:
+                    return idle.pop()
+                # Reserve slot, backend is created outside lock
+                if self.__created.get(lang, 0) < self.__max_size:
+                    self.__created[lang] = self.__created.get(lang, 0) + 1
+                    break
+                # Wait for checkin
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No espeak backend available for {lang}")
+                self.__condition.wait(remaining)
+
+        try:
+            return EspeakBackend(lang)
+        except BaseException:
+            # Release reserved slot
+            with self.__condition:
+                self.__created[lang] -= 1
+                self.__condition.notify()
+            raise
+
+    def checkin(self,
+                lang :str,
+                backend :EspeakBackend) -> None:
+        """
+        Give back a backend taken by checkout
+        :param lang: Language of backend
+        :param backend: EspeakBackend
+        :return: None
+        """
+        with self.__condition:
+            self.__idle.setdefault(lang, []).append(backend)
+            self.__condition.notify()
+
+    @contextmanager
+    def backend(self,
+                lang :str,
+                timeout :Optional[float] = None) -> Iterator[EspeakBackend]:
+        """Context manager: checkout a backend and check it in afterwards"""
+        backend = self.checkout(lang, timeout = timeout)
+        try:
+            yield backend
+        finally:
+            self.checkin(lang, backend)
@@ -1,19 +1,33 @@
-from phonemizer.backend import EspeakBackend
 from phonemizer.separator import Separator
-from typing import List, Union,Literal
+from typing import List, Union,Literal, Optional, Dict
 from ..utils.types import BasePhonemeMapper
-import json, os
+from .backend_pool import EspeakBackendPool
+import json, os, threading
 # pyphen = pyphen.Pyphen(lang="en")
 
+# Mapping rules loaded once per file
+_MAPPING_RULES :Dict[str, dict] = {}
+_MAPPING_LOCK = threading.Lock()
+
 class PhonemizerMapper(BasePhonemeMapper):
     def __init__(self,
                  separator :str = "-",
-                 lang :Union[Literal["en-gb","en-us"],str] = "en-gb"):
+                 lang :Union[Literal["en-gb","en-us"],str] = "en-gb",
+                 pool :Optional[EspeakBackendPool] = None,
+                 prewarm :int = 1):
+        """
+        Mapping class with supported by Phonemizer. Safe to share across threads: each call takes an EspeakBackend
+        from a pool for exclusive use.
+        :param separator: Phone separator
+        :param lang: Default backend with EN-UK (For US, type en-us)
+        :param pool: Backend pool. Default: None (process-wide pool)
+        :param prewarm: Number of backends created ahead of first request. Default: 1
+        """
         super().__init__()
-        """Mapping class with supported by Phonemizer"""
         self._lang = lang
         # Define params
-        self.__phonemizer_backend = EspeakBackend(self._lang) # Default backend with EN-UK (For US, type en-us)
+        self.__pool = pool if pool is not None else EspeakBackendPool.default()
+        self.__pool.prewarm(self._lang, count = prewarm)
         # Default separator
         self.__separator = Separator(phone = separator, word=' ')
 
@@ -35,18 +49,22 @@ class PhonemizerMapper(BasePhonemeMapper):
         if len(words) == 0: raise Exception("Words is empty")
 
         # Return phonemized format
-        return self.__phonemizer_backend.phonemize(text = words,
-                                                  separator = self.__separator,
-                                                  strip = strip,
-                                                  njobs = n_job)
+        with self.__pool.backend(self._lang) as backend:
+            return backend.phonemize(text = words,
+                                     separator = self.__separator,
+                                     strip = strip,
+                                     njobs = n_job)
 
     @property
     def mapping_dict(self, mapping_dir: str = "mapping_rules"):
         """
-        Property contains an dictionary of mapping with language
+        Property contains an dictionary of mapping with language (loaded once)
         :param mapping_dir: Path to dictionary
         :return:
         """
+        # Fall back to rules shipped with package
+        if not os.path.exists(mapping_dir):
+            mapping_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), mapping_dir)
         # Check path valid
         if not os.path.exists(mapping_dir):
             raise FileNotFoundError
@@ -59,12 +77,16 @@ class PhonemizerMapper(BasePhonemeMapper):
             file_path = os.path.join(mapping_dir, "uk_rule.json")
 
         # Check path existed!
-        if not os.path.exists(file_path):
+        if file_path is None or not os.path.exists(file_path):
             raise Exception(f"{file_path} is not existed!")
 
         # Load mapping rule
-        with open(file_path, 'r') as file:
-            return json.load(file)
+        file_path = os.path.abspath(file_path)
+        with _MAPPING_LOCK:
+            if file_path not in _MAPPING_RULES:
+                with open(file_path, 'r') as file:
+                    _MAPPING_RULES[file_path] = json.load(file)
+            return _MAPPING_RULES[file_path]
 
     def word_to_viseme(self,words :Union[List[str],str]):
         """
@@ -0,0 +1,2 @@
+from .inference_server import InferenceServer
+from .micro_batcher import MicroBatcher
\ No newline at end of file
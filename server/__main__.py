@@ -0,0 +1,54 @@
+from .inference_server import InferenceServer
+import argparse, asyncio, logging
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Local STT/TTS/viseme inference server with micro-batching")
+    parser.add_argument("--host", default = "0.0.0.0", help = "Host to bind")
+    parser.add_argument("--port", type = int, default = 8080, help = "Port to bind")
+    parser.add_argument("--recognizer-model", default = "small.en", help = "FasterWhisper model, empty to disable")
+    parser.add_argument("--device", default = "auto", choices = ["auto", "cpu", "cuda"], help = "Inference device")
+    parser.add_argument("--compute-type", default = "default", help = "FasterWhisper compute type")
+    parser.add_argument("--cpu-threads", type = int, default = 4, help = "FasterWhisper CPU threads")
+    parser.add_argument("--use-batch", action = "store_true", help = "Use BatchedInferencePipeline for long audio")
+    parser.add_argument("--synthesizer-model", default = "", help = "Coqui model, empty to disable")
+    parser.add_argument("--mapper-lang", default = "en-gb", help = "PhonemizerMapper language, empty to disable")
+    parser.add_argument("--max-batch-size", type = int, default = 8, help = "Maximum number of requests per batch")
+    parser.add_argument("--max-wait-ms", type = float, default = 10.0, help = "Maximum waiting time of a batch")
+    return parser.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level = logging.INFO)
+
+    # Components are loaded after server starts, so health endpoint answers during loading
+    def recognizer():
+        from ..speech_recognizer.faster_whisper_recognizer import FasterWhisperRecognizer
+        return FasterWhisperRecognizer(model_name = args.recognizer_model,
+                                       device = args.device,
+                                       compute_type = args.compute_type,
+                                       cpu_threads = args.cpu_threads,
+                                       use_batch = args.use_batch)
+
+    def synthesizer():
+        from ..speech_synthesizer.coqui_synthesizer import CoquiSynthesizer
+        return CoquiSynthesizer(model = args.synthesizer_model,
+                                device = args.device)
+
+    def mapper():
+        from ..phoneme_to_viseme import PhonemizerMapper
+        return PhonemizerMapper(lang = args.mapper_lang)
+
+    server = InferenceServer(recognizer = recognizer if args.recognizer_model else None,
+                             synthesizer = synthesizer if args.synthesizer_model else None,
+                             mapper = mapper if args.mapper_lang else None,
+                             host = args.host,
+                             port = args.port,
+                             max_batch_size = args.max_batch_size,
+                             max_wait_ms = args.max_wait_ms)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
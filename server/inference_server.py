@@ -0,0 +1,353 @@
+from ..utils.types import BaseRecognizer, BaseSynthesizer, BasePhonemeMapper, CompositeRecognizer, TranscriptionResponse
+from ..utils.audio import AudioBuffer
+from .micro_batcher import MicroBatcher
+from aiohttp import web, WSMsgType
+from typing import Callable, Dict, List, Optional, Tuple, Union, Any
+import numpy as np
+import regex as re
+import asyncio, logging, os, tempfile
+
+logger = logging.getLogger(__name__)
+
+# Content type of synthesized audio by extension
+AUDIO_CONTENT_TYPES = {".wav": "audio/wav", ".mp3": "audio/mpeg", ".ogg": "audio/ogg",
+                       ".flac": "audio/flac", ".aac": "audio/aac"}
+# Transcribe options accepted from clients
+TRANSCRIBE_OPTIONS = ("language", "detect_words")
+# Synthesize options accepted from clients (engine arguments, paths and deadline stay on server side)
+SYNTHESIZE_OPTIONS = ("text", "voice", "lang", "speed")
+
+class InferenceServer():
+    def __init__(self,
+                 recognizer :Union[BaseRecognizer, Callable[[], BaseRecognizer], None] = None,
+                 synthesizer :Union[BaseSynthesizer, Callable[[], BaseSynthesizer], None] = None,
+                 mapper :Union[BasePhonemeMapper, Callable[[], BasePhonemeMapper], None] = None,
+                 host :str = "0.0.0.0",
+                 port :int = 8080,
+                 max_batch_size :int = 8,
+                 max_wait_ms :float = 10.0,
+                 max_body_size :int = 25 * 1024 * 1024,
+                 synthesis_format :str = ".wav"):
+        """
+        HTTP/websocket server sharing one copy of each model between clients. Concurrent requests are collected
+        into micro-batches: transcriptions are decoded together by recognizers supporting transcribe_batch
+        (FasterWhisperRecognizer), viseme requests are phonemized in one call, synthesis runs on one inference thread.
+        Components can be given as instances or factories, factories are loaded in background after server starts.
+        :param recognizer: Recognizer or factory. Default: None (disabled)
+        :param synthesizer: Synthesizer or factory. Default: None (disabled)
+        :param mapper: Phoneme to viseme mapper or factory. Default: None (disabled)
+        :param host: Host to bind. Default: 0.0.0.0
+        :param port: Port to bind. Default: 8080
+        :param max_batch_size: Maximum number of requests per batch. Default: 8
+        :param max_wait_ms: Maximum waiting time of first request of a batch in millisecond. Default: 10
+        :param max_body_size: Maximum request body size in bytes. Default: 25 MB
+        :param synthesis_format: Audio format of synthesized audio. Default: .wav
+        """
+        # Define params
+        self.__host = host
+        self.__port = port
+        self.__max_body_size = max_body_size
+        self.__synthesis_format = synthesis_format
+        # Define components
+        self.__factories = {"recognizer": recognizer, "synthesizer": synthesizer, "mapper": mapper}
+        self.__components :Dict[str, Any] = {}
+        # Define batchers
+        handlers = {"recognizer": self._transcribe_batch,
+                    "synthesizer": self._synthesize_batch,
+                    "mapper": self._viseme_batch}
+        self.__batchers = {name: MicroBatcher(handler = handlers[name],
+                                              max_batch_size = max_batch_size,
+                                              max_wait = max_wait_ms / 1000,
+                                              name = name)
+                           for (name, factory) in self.__factories.items() if factory is not None}
+        # Define state
+        self.__runner :Optional[web.AppRunner] = None
+        self.__load_task :Optional[asyncio.Task] = None
+        self.__load_errors :Dict[str, str] = {}
+
+    @property
+    def is_ready(self) -> bool:
+        """Return True when all components are loaded"""
+        return len(self.__batchers) > 0 and all(batcher.is_running for batcher in self.__batchers.values())
+
+    @property
+    def batchers(self) -> Dict[str, MicroBatcher]:
+        """Return batchers by component name"""
+        return dict(self.__batchers)
+
+    async def start(self) -> None:
+        """Start serving and load components in background"""
+        if self.__runner is not None:
+            return
+        app = web.Application(client_max_size = self.__max_body_size)
+        app.add_routes([web.get("/healthz", self._healthz),
+                        web.get("/readyz", self._readyz),
+                        web.post("/v1/transcribe", self._transcribe),
+                        web.post("/v1/synthesize", self._synthesize),
+                        web.post("/v1/viseme", self._viseme),
+                        web.get("/v1/ws", self._websocket)])
+        self.__runner = web.AppRunner(app)
+        await self.__runner.setup()
+        await web.TCPSite(self.__runner, host = self.__host, port = self.__port).start()
+        self.__load_task = asyncio.create_task(self._load())
+
+    async def stop(self) -> None:
+        """Stop serving"""
+        if self.__load_task is not None:
+            self.__load_task.cancel()
+            await asyncio.gather(self.__load_task, return_exceptions = True)
+        for batcher in self.__batchers.values():
+            await batcher.stop()
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def serve_forever(self) -> None:
+        """Start serving until cancelled"""
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    async def _load(self) -> None:
+        """Create components from factories, warm them up, then start batchers (one failing component does not stop others)"""
+        expected = {"recognizer": BaseRecognizer, "synthesizer": BaseSynthesizer, "mapper": BasePhonemeMapper}
+        for (name, factory) in self.__factories.items():
+            if factory is None:
+                continue
+            try:
+                if isinstance(factory, expected[name]):
+                    self.__components[name] = factory
+                else:
+                    logger.info(f"Loading {name}")
+                    self.__components[name] = await asyncio.to_thread(factory)
+                # Warm up local engines before accepting traffic
+                component = self.__components[name]
+                if hasattr(component, "warmup") and not getattr(component, "is_ready", False):
+                    logger.info(f"Warming up {name}")
+                    await asyncio.to_thread(component.warmup)
+                await self.__batchers[name].start()
+            except Exception as e:
+                logger.exception(f"Loading {name} failed")
+                self.__load_errors[name] = str(e)
+
+    def _transcribe_batch(self, items :List[Tuple[AudioBuffer, Dict[str, Any]]]) -> List[Any]:
+        """Transcribe a batch: plain transcriptions are decoded together, word timestamps one by one"""
+        recognizer = self.__components["recognizer"]
+        results :List[Any] = [None] * len(items)
+        groups :Dict[Optional[str], List[int]] = {}
+        for (index, (audio, options)) in enumerate(items):
+            if hasattr(recognizer, "transcribe_batch") and not options.get("detect_words"):
+                groups.setdefault(options.get("language"), []).append(index)
+                continue
+            try:
+                results[index] = CompositeRecognizer._to_response(recognizer.transcribe(audio, **options))
+            except Exception as e:
+                results[index] = e
+
+        # One decode per language
+        for (language, indexes) in groups.items():
+            try:
+                responses = recognizer.transcribe_batch([items[index][0] for index in indexes], language = language)
+            except Exception as e:
+                responses = [e] * len(indexes)
+            for (index, response) in zip(indexes, responses):
+                results[index] = response if isinstance(response, Exception) else CompositeRecognizer._to_response(response)
+        return results
+
+    def _synthesize_batch(self, items :List[Dict[str, Any]]) -> List[Any]:
+        """Synthesize a batch on inference thread"""
+        synthesizer = self.__components["synthesizer"]
+        results :List[Any] = []
+        for options in items:
+            (descriptor, path) = tempfile.mkstemp(suffix = self.__synthesis_format)
+            os.close(descriptor)
+            try:
+                synthesizer.generate(generated_path = path, **options)
+                with open(path, "rb") as file:
+                    results.append(file.read())
+            except Exception as e:
+                results.append(e)
+            finally:
+                os.remove(path)
+        return results
+
+    def _viseme_batch(self, items :List[List[str]]) -> List[Any]:
+        """Phonemize words of all requests in one call"""
+        words = [word for item in items for word in item]
+        if len(words) == 0:
+            return [[] for _ in items]
+        visemes = self.__components["mapper"].word_to_viseme(words)
+        # Split back per request
+        results = []
+        position = 0
+        for item in items:
+            results.append(visemes[position:position + len(item)])
+            position += len(item)
+        return results
+
+    def _check_component(self, name :str) -> Optional[web.Response]:
+        """Return error response when component is disabled or not loaded"""
+        if name not in self.__batchers:
+            return web.json_response({"error": f"{name} is not enabled"}, status = 404)
+        if name in self.__load_errors:
+            return web.json_response({"error": f"{name} failed to load: {self.__load_errors[name]}"}, status = 503)
+        if not self.__batchers[name].is_running:
+            return web.json_response({"error": f"{name} is not ready"}, status = 503)
+        return None
+
+    @staticmethod
+    def _words(data :Dict[str, Any]) -> List[str]:
+        """Return words of viseme request ({"words": [...]} or {"text": "..."})"""
+        if "words" in data:
+            return [str(word) for word in data["words"]]
+        return [word for word in (re.sub(r"[^\p{L}\p{N}'\s]", " ", str(data.get("text", "")))).split() if word]
+
+    @staticmethod
+    async def _read_json(request :web.Request) -> Dict[str, Any]:
+        """Return JSON object of request body, raise ValueError when body is not a JSON object"""
+        try:
+            data = await request.json()
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid JSON: {e}")
+        if not isinstance(data, dict):
+            raise ValueError("Body must be a JSON object")
+        return data
+
+    @staticmethod
+    def _synthesis_options(data :Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return options of a synthesize request, raise ValueError on unknown options or file path voice
+        :param data: Request options
+        :return: Keyword arguments of synthesizer
+        """
+        unknown = set(data.keys()) - set(SYNTHESIZE_OPTIONS)
+        if len(unknown) > 0:
+            raise ValueError(f"Unknown synthesize options: {', '.join(sorted(unknown))}")
+        if not data.get("text"):
+            raise ValueError("Text cant be empty")
+        # Voice is a name or id, never a file of server (speaker_wav of Coqui)
+        voice = data.get("voice")
+        if voice is not None and (not isinstance(voice, str) or "/" in voice or "\\" in voice or os.path.exists(voice)):
+            raise ValueError("Voice must be a voice name or id")
+        return {key: value for (key, value) in data.items() if value is not None}
+
+    async def _healthz(self, request :web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    async def _readyz(self, request :web.Request) -> web.Response:
+        components = {name: batcher.is_running for (name, batcher) in self.__batchers.items()}
+        if len(self.__load_errors) > 0:
+            return web.json_response({"status": "failed", "errors": self.__load_errors,
+                                      "components": components}, status = 503)
+        if not self.is_ready:
+            return web.json_response({"status": "loading", "components": components}, status = 503)
+        return web.json_response({"status": "ready", "components": components,
+                                  "batches": {name: batcher.stats.snapshot()
+                                              for (name, batcher) in self.__batchers.items()}})
+
+    async def _transcribe(self, request :web.Request) -> web.Response:
+        error = self._check_component("recognizer")
+        if error is not None:
+            return error
+        options = {}
+        if request.query.get("language"):
+            options["language"] = request.query["language"]
+        if request.query.get("words", "").lower() == "true":
+            options["detect_words"] = True
+        # Decode in worker thread
+        try:
+            audio = await asyncio.to_thread(AudioBuffer.from_bytes, await request.read())
+        except Exception as e:
+            return web.json_response({"error": f"Invalid audio: {e}"}, status = 400)
+
+        try:
+            response = await self.__batchers["recognizer"].submit((audio, options))
+        except Exception as e:
+            return web.json_response({"error": str(e)}, status = 500)
+        return web.json_response(response.model_dump(mode = "json"))
+
+    async def _synthesize(self, request :web.Request) -> web.Response:
+        error = self._check_component("synthesizer")
+        if error is not None:
+            return error
+        try:
+            options = self._synthesis_options(await self._read_json(request))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status = 400)
+
+        try:
+            audio = await self.__batchers["synthesizer"].submit(options)
+        except Exception as e:
+            return web.json_response({"error": str(e)}, status = 500)
+        return web.Response(body = audio,
+                            content_type = AUDIO_CONTENT_TYPES.get(self.__synthesis_format, "application/octet-stream"))
+
+    async def _viseme(self, request :web.Request) -> web.Response:
+        error = self._check_component("mapper")
+        if error is not None:
+            return error
+        try:
+            words = self._words(await self._read_json(request))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status = 400)
+        try:
+            visemes = await self.__batchers["mapper"].submit(words)
+        except Exception as e:
+            return web.json_response({"error": str(e)}, status = 500)
+        return web.json_response({"words": words, "visemes": visemes})
+
+    async def _websocket(self, request :web.Request) -> web.WebSocketResponse:
+        """
+        Websocket protocol: binary messages are 16-bit PCM mono chunks of current utterance, then JSON messages
+        {"type": "transcribe", "sample_rate": 16000, "language": ...}, {"type": "synthesize", "text": ...}
+        or {"type": "viseme", "words": [...]}
+        """
+        socket = web.WebSocketResponse(max_msg_size = self.__max_body_size)
+        await socket.prepare(request)
+        chunks :List[bytes] = []
+
+        async for message in socket:
+            if message.type == WSMsgType.BINARY:
+                chunks.append(message.data)
+                continue
+            if message.type != WSMsgType.TEXT:
+                break
+            try:
+                data = message.json()
+                kind = data.pop("type", None)
+                if kind == "transcribe":
+                    error = self._check_component("recognizer")
+                    if error is not None:
+                        raise Exception(error.text)
+                    sample_rate = data.pop("sample_rate", 16000)
+                    # Only known options reach recognizer
+                    unknown = set(data.keys()) - set(TRANSCRIBE_OPTIONS)
+                    if len(unknown) > 0:
+                        raise ValueError(f"Unknown transcribe options: {', '.join(sorted(unknown))}")
+                    options = {key: value for (key, value) in data.items() if value is not None}
+                    samples = np.frombuffer(b"".join(chunks), dtype = "<i2").astype(np.float32) / 32768
+                    chunks = []
+                    audio = AudioBuffer(samples = samples, sample_rate = sample_rate)
+                    response :TranscriptionResponse = await self.__batchers["recognizer"].submit((audio, options))
+                    await socket.send_json({"type": "transcription", **response.model_dump(mode = "json")})
+                elif kind == "synthesize":
+                    error = self._check_component("synthesizer")
+                    if error is not None:
+                        raise Exception(error.text)
+                    options = self._synthesis_options(data)
+                    await socket.send_bytes(await self.__batchers["synthesizer"].submit(options))
+                    await socket.send_json({"type": "synthesis_end"})
+                elif kind == "viseme":
+                    error = self._check_component("mapper")
+                    if error is not None:
+                        raise Exception(error.text)
+                    words = self._words(data)
+                    visemes = await self.__batchers["mapper"].submit(words)
+                    await socket.send_json({"type": "viseme", "words": words, "visemes": visemes})
+                else:
+                    raise ValueError(f"Unknown message type: {kind}")
+            except Exception as e:
+                await socket.send_json({"type": "error", "error": str(e)})
+        return socket
@@ -0,0 +1,138 @@
+from ..utils.metrics import MetricCounter, LatencyTracker
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+import asyncio, time
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+class MicroBatcher(Generic[Item, Result]):
+    def __init__(self,
+                 handler :Callable[[List[Item]], List[Result]],
+                 max_batch_size :int = 8,
+                 max_wait :float = 0.01,
+                 max_queue_size :int = 256,
+                 name :str = "batcher"):
+        """
+        Collect concurrent requests into micro-batches. A batch is run as soon as it is full or when its oldest
+        request has waited max_wait. Batches run one at a time on a dedicated inference thread.
+        :param handler: Blocking function receiving a list of items and returning one result per item.
+        An exception instance returned as result fails only its item.
+        :param max_batch_size: Maximum number of items per batch. Default: 8
+        :param max_wait: Maximum waiting time of first item before batch is run, in second. Default: 0.01
+        :param max_queue_size: Maximum number of pending items, submit waits when full. Default: 256
+        :param name: Name used in stats. Default: batcher
+        """
+        if max_batch_size < 1:
+            raise ValueError("Max batch size must be at least 1")
+
+        # Define params
+        self.__handler = handler
+        self.__max_batch_size = max_batch_size
+        self.__max_wait = max_wait
+        self.__max_queue_size = max_queue_size
+        # Define state
+        self.__queue :Optional[asyncio.Queue] = None
+        self.__task :Optional[asyncio.Task] = None
+        self.__executor :Optional[ThreadPoolExecutor] = None
+        # Define stats
+        self.__stats = MetricCounter(name = name)
+        self.__latency = LatencyTracker()
+
+    @property
+    def is_running(self) -> bool:
+        """Return True when batches are being collected"""
+        return self.__task is not None and not self.__task.done()
+
+    @property
+    def stats(self) -> MetricCounter:
+        """Return counters: requests, batches, batched_requests, failed_batches"""
+        return self.__stats
+
+    @property
+    def latency(self) -> LatencyTracker:
+        """Return latency of batches"""
+        return self.__latency
+
+    @property
+    def queue_size(self) -> int:
+        """Return number of pending items"""
+        return 0 if self.__queue is None else self.__queue.qsize()
+
+    async def start(self) -> None:
+        """Start collecting batches"""
+        if self.__task is None:
+            self.__queue = asyncio.Queue(maxsize = self.__max_queue_size)
+            self.__executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = self.__stats.name)
+            self.__task = asyncio.create_task(self._collect())
+
+    async def stop(self) -> None:
+        """Stop collecting batches, pending items fail"""
+        if self.__task is not None:
+            self.__task.cancel()
+            await asyncio.gather(self.__task, return_exceptions = True)
+            self.__task = None
+            # Fail pending items
+            while not self.__queue.empty():
+                (_, future) = self.__queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Batcher stopped"))
+            self.__executor.shutdown(wait = False)
+            self.__executor = None
+
+    async def submit(self, item :Item) -> Result:
+        """
+        Add item to next batch and wait for its result
+        :param item: Item
+        :return: Result of item
+        """
+        assert self.is_running, "Batcher is not running"
+        future = asyncio.get_running_loop().create_future()
+        await self.__queue.put((item, future))
+        self.__stats.increment("requests")
+        return await future
+
+    async def _collect(self) -> None:
+        """Form batches and run them"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch :List[Tuple[Item, asyncio.Future]] = [await self.__queue.get()]
+            deadline = loop.time() + self.__max_wait
+            # Fill batch until full or deadline
+            while len(batch) < self.__max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.__queue.get(), timeout = remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Skip cancelled requests
+            batch = [(item, future) for (item, future) in batch if not future.done()]
+            if len(batch) == 0:
+                continue
+
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.__executor, self.__handler, [item for (item, _) in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError("Handler must return one result per item")
+            except Exception as e:
+                self.__stats.increment("failed_batches")
+                for (_, future) in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                self.__stats.increment("batches")
+                self.__stats.increment("batched_requests", len(batch))
+                self.__latency.record(time.perf_counter() - start)
+
+            for ((_, future), result) in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
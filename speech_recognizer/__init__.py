@@ -2,3 +2,9 @@ from .faster_whisper_recognizer import FasterWhisperRecognizer, QuantizeType
 from .assemblyai_recognizer import AssemblyRecognizer
 from .groq_recognizer import GroqRecognizer
 from .deepgram_recognizer import DeepGramRecognizer
+from .router_recognizer import RouterRecognizer
+from .assemblyai_webhook_receiver import AssemblyWebhookReceiver
+from .vad_recognizer import VadRecognizer
+from .cached_recognizer import CachedRecognizer
+from .whisper_worker_pool import WhisperWorkerPool
+from .cascade_recognizer import CascadeRecognizer
\ No newline at end of file
@@ -1,13 +1,36 @@
 from ..utils.types import AdvancedRecognizer, Word, AudioType, StatusCode, TranscriptionResponse
-from typing import Literal, List, BinaryIO, Union
+from ..utils.audio import AudioBuffer, UploadEncoder
+from ..utils.deadline import Deadline
+from ..utils.transport import SharedTransport
+from .assemblyai_webhook_receiver import AssemblyWebhookReceiver
+from typing import Literal, List, BinaryIO, Union, Dict, Tuple, Optional
 from ..config import ASSEMBLYAI_KEY
+from assemblyai import api as aai_api
 import assemblyai as aai
-import os
+import asyncio, aiofiles, httpx, io, os, threading, time, weakref
+
+class _LoopState:
+    """Async client, request semaphore, poll task and pending jobs bound to one event loop"""
+    def __init__(self,
+                 client :httpx.AsyncClient,
+                 max_concurrent_requests :int):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self.poll_task :Optional[asyncio.Task] = None
+        self.jobs :Dict[str, Tuple[asyncio.Future, bool, bool, float]] = {}
 
 class AssemblyRecognizer(AdvancedRecognizer):
     def __init__(self,
                  model :Literal["best","nano"] = "nano",
                  api_key :str = ASSEMBLYAI_KEY,
+                 min_poll_interval :float = 1.0,
+                 max_poll_interval :float = 15.0,
+                 max_job_age :float = 3600.0,
+                 max_concurrent_requests :int = 32,
+                 webhook_receiver :Optional[AssemblyWebhookReceiver] = None,
+                 upload_encoder :Optional[UploadEncoder] = None,
+                 base_url :Optional[str] = None,
+                 transport :Optional[SharedTransport] = None,
                  **kwargs):
         """
         Initialize Assembly recognizer service
@@ -15,17 +38,59 @@ class AssemblyRecognizer(AdvancedRecognizer):
         useful for most use case. Nano is less accurate, but lower cost models to product results.
         (Language supported: https://www.assemblyai.com/docs/getting-started/supported-languages)
         :param api_key: AssemblyAI key
+        :param min_poll_interval: Shortest interval in second between two polls of submitted jobs. Default: 1.0
+        :param max_poll_interval: Longest interval in second between two polls of submitted jobs. Default: 15.0
+        :param max_job_age: Jobs still unfinished this many seconds after submission are failed. Default: 3600.0
+        :param max_concurrent_requests: Maximum concurrent upload/submit/poll requests of async API. Default: 32
+        :param webhook_receiver: Receiver of completion notifications. When set, jobs are resolved on notification
+        and polling only runs at longest interval as fallback. Default: None
+        :param upload_encoder: Opt-in encoder compressing audio (FLAC/Opus) before upload. Default: None
+        :param base_url: Override API url (e.g. local stand-in server). Default: None (AssemblyAI API)
+        :param transport: Shared connection pool of sync and async requests. Default: None (own pools)
         """
         super().__init__()
-        # Set API key
-        aai.settings.api_key = api_key
+        # Define client settings (Global aai.settings is left untouched)
+        self.__settings = aai.Settings(api_key = api_key)
+        if base_url is not None:
+            self.__settings.base_url = base_url
+        self.__aai_client = aai.Client(settings = self.__settings)
+        self.__transport = transport
+        if transport is not None:
+            # SDK has no client argument, replace its client by one over shared pool (same url, headers, timeout)
+            http_client = self.__aai_client.http_client
+            self.__aai_client._http_client = transport.client(base_url = http_client.base_url,
+                                                              headers = http_client.headers,
+                                                              timeout = http_client.timeout)
+            http_client.close()
         # Define model
+        self.__model_name = model
         self.__speech_model = aai.SpeechModel.best if model == "best" else aai.SpeechModel.nano
         # Define config
         self.__config = aai.TranscriptionConfig(speech_model = self.__speech_model,
                                                 **kwargs)
         # Define transcriber
-        self.__client = aai.Transcriber(config = self.__config)
+        self.__client = aai.Transcriber(client = self.__aai_client,
+                                        config = self.__config)
+
+        # Async params
+        self.__min_poll_interval = min_poll_interval
+        self.__max_poll_interval = max_poll_interval
+        self.__max_job_age = max_job_age
+        self.__max_concurrent_requests = max_concurrent_requests
+        self.__webhook_receiver = webhook_receiver
+        self.__upload_encoder = upload_encoder
+        # Async state, one per event loop (client, semaphore and futures can not be shared across loops)
+        self.__loop_states :"weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = \
+            weakref.WeakKeyDictionary()
+        self.__lock = threading.Lock()
+        # Subscribe to notifications
+        if self.__webhook_receiver is not None:
+            self.__webhook_receiver.subscribe(self._on_notification)
+
+    @property
+    def model_name(self) -> str:
+        """Return model name property"""
+        return self.__model_name
 
     def __contruct_segments(self,
                             segments :List[aai.types.Word],
@@ -45,16 +110,30 @@ class AssemblyRecognizer(AdvancedRecognizer):
             output.append(Word(text=word.text, start=start, end=end, confidence=word.confidence))
         return output
 
+    def _wait_transcript(self,
+                         transcript :aai.Transcript,
+                         deadline :Deadline) -> aai.types.TranscriptResponse:
+        """Poll submitted job until it finishes, stopping when deadline is exceeded or cancelled"""
+        while True:
+            deadline.check(step = "polling")
+            response = aai_api.get_transcript(self.__aai_client.http_client, transcript.id)
+            if response.status in (aai.TranscriptStatus.completed, aai.TranscriptStatus.error):
+                return response
+            deadline.sleep(self.__settings.polling_interval)
+
     def transcribe(self,
-                   audio :Union[str, BinaryIO,bytes],
+                   audio :Union[str, BinaryIO, bytes, AudioBuffer],
                    in_milliseconds: bool = True,
                    detect_words: bool = False,
+                   deadline :Union[None, float, Deadline] = None,
                    **kwargs) -> TranscriptionResponse:
         """
         Synchronous function to return transcription from audio
-        :param audio: Audio object ( Accepted types: str (file path), bytes and BinaryIO)
+        :param audio: Audio object ( Accepted types: str (file path), bytes, BinaryIO and AudioBuffer)
         :param in_milliseconds: Whether return time under second or millisecond type
         :param detect_words: Enable return list of segmented words.
+        :param deadline: Time budget in second or Deadline, polling stops when it is exceeded or cancelled and
+        DeadlineExceeded is raised (upload is bounded by http timeout of settings only). Default: None
         :return: str
         """
         # Get AudioType from audio input
@@ -66,11 +145,25 @@ class AssemblyRecognizer(AdvancedRecognizer):
             return TranscriptionResponse(status_code = StatusCode.FAILED,
                                          description = description)
 
+        # Read local file when it will be compressed
+        if audio_type == AudioType.LOCAL_FILE and self.__upload_encoder is not None:
+            with open(audio, "rb") as file:
+                audio = file.read()
+            audio_type = AudioType.BYTES
+        # Upload in-memory audio as file
+        if audio_type in (AudioType.AUDIO_BUFFER, AudioType.BYTES):
+            audio = io.BytesIO(self._get_upload_content(audio, self.__upload_encoder)[0])
+
         # Get transcription
-        transcription = self.__client.transcribe(audio)
+        if deadline is None:
+            transcription = self.__client.transcribe(audio)
+        else:
+            deadline = Deadline.coerce(deadline)
+            deadline.check(step = "upload")
+            transcription = self._wait_transcript(self.__client.submit(audio), deadline)
 
         # Set status
-        status_code = StatusCode.SUCCESS if aai.TranscriptStatus.completed else StatusCode.FAILED
+        status_code = StatusCode.SUCCESS if transcription.status == aai.TranscriptStatus.completed else StatusCode.FAILED
 
         segments = None
         # Add segments
@@ -84,3 +177,275 @@ class AssemblyRecognizer(AdvancedRecognizer):
                                      confidence = transcription.confidence,
                                      segments = segments)
 
+    def _loop_state(self) -> _LoopState:
+        """Return async state of running event loop (created on first use in that loop)"""
+        loop = asyncio.get_running_loop()
+        with self.__lock:
+            state = self.__loop_states.get(loop)
+            if state is None:
+                client = httpx.AsyncClient if self.__transport is None else self.__transport.async_client
+                state = _LoopState(client = client(base_url = self.__settings.base_url,
+                                                   headers = {"authorization": self.__settings.api_key},
+                                                   timeout = self.__settings.http_timeout),
+                                   max_concurrent_requests = self.__max_concurrent_requests)
+                self.__loop_states[loop] = state
+            return state
+
+    async def _request(self,
+                       method :str,
+                       url :str,
+                       **kwargs) -> dict:
+        """Send a request with bounded concurrency and return JSON body"""
+        state = self._loop_state()
+        async with state.semaphore:
+            response = await state.client.request(method, url, **kwargs)
+        # Check status
+        if response.status_code != httpx.codes.OK:
+            raise aai.types.TranscriptError(f"AssemblyAI request {method} {url} failed: {response.text}")
+        return response.json()
+
+    async def _aupload(self,
+                       audio :Union[str, BinaryIO, bytes, AudioBuffer]) -> str:
+        """Upload audio (or pass link as it is) and return audio URL"""
+        # Get AudioType from audio input
+        audio_type = self._get_audio_type(audio)
+
+        match audio_type:
+            case AudioType.LINK:
+                return audio
+            case AudioType.LOCAL_FILE:
+                # Local file case
+                if not os.path.exists(audio):
+                    raise FileNotFoundError(f"File: {audio} not found")
+                async with aiofiles.open(audio, "rb") as file:
+                    buffer_data = await file.read()
+            case AudioType.BYTES:
+                buffer_data = bytes(audio)
+            case AudioType.AUDIO_BUFFER:
+                buffer_data = audio
+            case _:
+                # File-like object
+                buffer_data = audio.read()
+
+        # Upload
+        (content, _) = self._get_upload_content(buffer_data, self.__upload_encoder)
+        body = await self._request("POST", "/v2/upload", content = content)
+        return body["upload_url"]
+
+    async def asubmit(self,
+                      audio :Union[str, BinaryIO, bytes, AudioBuffer],
+                      in_milliseconds: bool = True,
+                      detect_words: bool = False) -> asyncio.Future:
+        """
+        Asynchronously submit a transcription job without waiting for its completion
+        :param audio: Audio object ( Accepted types: str (file path or link), bytes, BinaryIO and AudioBuffer)
+        :param in_milliseconds: Whether return time under second or millisecond type
+        :param detect_words: Enable return list of segmented words.
+        :return: Future resolved with TranscriptionResponse when job completes
+        """
+        # Start webhook receiver
+        if self.__webhook_receiver is not None and not self.__webhook_receiver.is_running:
+            await self.__webhook_receiver.start()
+
+        # Define request
+        audio_url = await self._aupload(audio)
+        request = aai.types.TranscriptRequest(audio_url = audio_url,
+                                              **self.__config.raw.dict(exclude_none = True))
+        if self.__webhook_receiver is not None:
+            request.webhook_url = self.__webhook_receiver.url
+            request.webhook_auth_header_name = self.__webhook_receiver.auth_header_name
+            request.webhook_auth_header_value = self.__webhook_receiver.auth_header_value
+
+        # Submit job
+        body = await self._request("POST", "/v2/transcript",
+                                   json = request.dict(exclude_none = True, by_alias = True))
+        # Register job
+        state = self._loop_state()
+        future = asyncio.get_running_loop().create_future()
+        state.jobs[body["id"]] = (future, in_milliseconds, detect_words, time.monotonic())
+        future.add_done_callback(lambda done: self._abandon_job(state, body["id"], done))
+        # Start polling
+        if state.poll_task is None or state.poll_task.done():
+            state.poll_task = asyncio.create_task(self._poll_loop())
+        return future
+
+    @staticmethod
+    def _abandon_job(state :_LoopState,
+                     transcript_id :str,
+                     future :asyncio.Future) -> None:
+        """Stop polling a job whose caller gave up (future cancelled by deadline or caller cancellation)"""
+        if future.cancelled():
+            state.jobs.pop(transcript_id, None)
+
+    async def atranscribe(self,
+                          audio :Union[str, BinaryIO, bytes, AudioBuffer],
+                          in_milliseconds: bool = True,
+                          detect_words: bool = False,
+                          deadline :Union[None, float, Deadline] = None,
+                          **kwargs) -> TranscriptionResponse:
+        """
+        Asynchronous function to return transcription from audio. No thread is held while job is processing.
+        :param audio: Audio object ( Accepted types: str (file path or link), bytes, BinaryIO and AudioBuffer)
+        :param in_milliseconds: Whether return time under second or millisecond type
+        :param detect_words: Enable return list of segmented words.
+        :param deadline: Time budget in second or Deadline, shared by upload, submission and waiting. At expiry
+        upload is cancelled or job is no longer polled, and DeadlineExceeded is raised. Default: None
+        :return: TranscriptionResponse
+        """
+        deadline = Deadline.coerce(deadline)
+        try:
+            future = await deadline.run(self.asubmit(audio = audio,
+                                                     in_milliseconds = in_milliseconds,
+                                                     detect_words = detect_words))
+        except FileNotFoundError as e:
+            return TranscriptionResponse(status_code = StatusCode.FAILED,
+                                         description = str(e))
+        return await deadline.run(future)
+
+    async def asubmit_many(self,
+                           audios :List[Union[str, BinaryIO, bytes, AudioBuffer]],
+                           in_milliseconds: bool = True,
+                           detect_words: bool = False) -> List[asyncio.Future]:
+        """
+        Asynchronously submit many transcription jobs up front. Use asyncio.as_completed to handle results as jobs complete.
+        :param audios: List of audio objects
+        :param in_milliseconds: Whether return time under second or millisecond type
+        :param detect_words: Enable return list of segmented words.
+        :return: List of futures (same order as audios). Failed submission resolves with a failed response.
+        """
+        async def submit(audio):
+            try:
+                return await self.asubmit(audio = audio,
+                                          in_milliseconds = in_milliseconds,
+                                          detect_words = detect_words)
+            except Exception as e:
+                future = asyncio.get_running_loop().create_future()
+                future.set_result(TranscriptionResponse(status_code = StatusCode.FAILED,
+                                                        description = str(e)))
+                return future
+        return list(await asyncio.gather(*[submit(audio) for audio in audios]))
+
+    async def atranscribe_many(self,
+                               audios :List[Union[str, BinaryIO, bytes, AudioBuffer]],
+                               in_milliseconds: bool = True,
+                               detect_words: bool = False) -> List[TranscriptionResponse]:
+        """
+        Asynchronously transcribe many audios, all jobs are in flight at the same time
+        :param audios: List of audio objects
+        :param in_milliseconds: Whether return time under second or millisecond type
+        :param detect_words: Enable return list of segmented words.
+        :return: List of TranscriptionResponse (same order as audios)
+        """
+        futures = await self.asubmit_many(audios = audios,
+                                          in_milliseconds = in_milliseconds,
+                                          detect_words = detect_words)
+        return list(await asyncio.gather(*futures))
+
+    def _on_notification(self,
+                         transcript_id :str,
+                         status :str) -> None:
+        """Webhook callback: fetch finished job right away, in event loop that submitted it"""
+        if status not in ("completed", "error"):
+            return
+        with self.__lock:
+            loops = [loop for (loop, state) in self.__loop_states.items() if transcript_id in state.jobs]
+        for loop in loops:
+            if not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(self._fetch(transcript_id), loop)
+
+    async def _fetch(self, transcript_id :str) -> bool:
+        """
+        Fetch a job and resolve its future when finished
+        :param transcript_id: Transcript id
+        :return: True when job finished
+        """
+        try:
+            body = await self._request("GET", f"/v2/transcript/{transcript_id}")
+        except (httpx.HTTPError, aai.types.TranscriptError):
+            # Retry on next poll
+            return False
+        try:
+            transcript = aai.types.TranscriptResponse.parse_obj(body)
+        except Exception as e:
+            # Malformed body fails only this job
+            self._fail_job(transcript_id, f"Invalid transcript response: {e}")
+            return True
+
+        # Still processing
+        if transcript.status not in (aai.TranscriptStatus.completed, aai.TranscriptStatus.error):
+            return False
+        # Already resolved
+        jobs = self._loop_state().jobs
+        if transcript_id not in jobs:
+            return True
+
+        (future, in_milliseconds, detect_words, _) = jobs.pop(transcript_id)
+        if future.done():
+            return True
+        # Error case
+        if transcript.status == aai.TranscriptStatus.error:
+            future.set_result(TranscriptionResponse(status_code = StatusCode.FAILED,
+                                                    description = transcript.error))
+            return True
+
+        segments = None
+        # Add segments
+        if detect_words:
+            try:
+                segments = self.__contruct_segments(segments = transcript.words or [],
+                                                    in_milliseconds = in_milliseconds)
+            except Exception as e:
+                future.set_result(TranscriptionResponse(status_code = StatusCode.FAILED,
+                                                        description = f"Invalid transcript response: {e}"))
+                return True
+        future.set_result(TranscriptionResponse(status_code = StatusCode.SUCCESS,
+                                                text = transcript.text,
+                                                confidence = transcript.confidence,
+                                                segments = segments))
+        return True
+
+    async def _poll_loop(self) -> None:
+        """Poll all pending jobs together. Interval grows while nothing completes and resets on completion."""
+        interval = self.__min_poll_interval
+        # With webhook, polling is only a fallback
+        if self.__webhook_receiver is not None:
+            interval = self.__max_poll_interval
+
+        jobs = self._loop_state().jobs
+        try:
+            while len(jobs) > 0:
+                await asyncio.sleep(interval)
+                # Give up on jobs running too long
+                now = time.monotonic()
+                for (transcript_id, job) in list(jobs.items()):
+                    if now - job[3] > self.__max_job_age:
+                        self._fail_job(transcript_id, f"Job {transcript_id} did not finish within {self.__max_job_age}s")
+                finished = await asyncio.gather(*[self._fetch(transcript_id) for transcript_id in list(jobs.keys())])
+                # Adapt interval
+                if self.__webhook_receiver is None:
+                    interval = self.__min_poll_interval if any(finished) else min(interval * 1.5, self.__max_poll_interval)
+        except Exception as e:
+            # No job is left waiting on a dead poller
+            for transcript_id in list(jobs.keys()):
+                self._fail_job(transcript_id, f"Polling failed: {e}")
+            raise
+
+    def _fail_job(self,
+                  transcript_id :str,
+                  description :str) -> None:
+        """Stop tracking a job and resolve its future with a failed response"""
+        job = self._loop_state().jobs.pop(transcript_id, None)
+        if job is not None and not job[0].done():
+            job[0].set_result(TranscriptionResponse(status_code = StatusCode.FAILED,
+                                                    description = description))
+
+    async def aclose(self) -> None:
+        """Close async HTTP client of running event loop and webhook receiver"""
+        with self.__lock:
+            state = self.__loop_states.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            if state.poll_task is not None:
+                state.poll_task.cancel()
+            await state.client.aclose()
+        if self.__webhook_receiver is not None:
+            await self.__webhook_receiver.stop()
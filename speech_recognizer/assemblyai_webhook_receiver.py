@@ -0,0 +1,108 @@
+from typing import Callable, List, Optional
+import asyncio, json
+
+class AssemblyWebhookReceiver():
+    def __init__(self,
+                 public_url :str,
+                 host :str = "0.0.0.0",
+                 port :int = 8000,
+                 auth_header_name :Optional[str] = None,
+                 auth_header_value :Optional[str] = None,
+                 max_body_size :int = 65536):
+        """
+        Small local HTTP server receiving AssemblyAI webhook notifications (POST {"transcript_id", "status"}).
+        :param public_url: URL where AssemblyAI can reach this receiver (e.g. https://example.com/assemblyai)
+        :param host: Host to bind. Default: 0.0.0.0
+        :param port: Port to bind. Default: 8000
+        :param auth_header_name: Header name sent by AssemblyAI with each notification (Default: None)
+        :param auth_header_value: Expected header value. Requests with wrong value are rejected (Default: None)
+        :param max_body_size: Maximum accepted body size in bytes. Default: 65536
+        """
+        # Define params
+        self.__public_url = public_url
+        self.__host = host
+        self.__port = port
+        self.__auth_header_name = auth_header_name
+        self.__auth_header_value = auth_header_value
+        self.__max_body_size = max_body_size
+        # Define state
+        self.__server = None
+        self.__callbacks :List[Callable[[str, str], None]] = []
+
+    @property
+    def url(self) -> str:
+        """Return public URL of receiver"""
+        return self.__public_url
+
+    @property
+    def auth_header_name(self) -> Optional[str]:
+        """Return auth header name"""
+        return self.__auth_header_name
+
+    @property
+    def auth_header_value(self) -> Optional[str]:
+        """Return auth header value"""
+        return self.__auth_header_value
+
+    @property
+    def is_running(self) -> bool:
+        """Return True when server is serving"""
+        return self.__server is not None
+
+    def subscribe(self, callback :Callable[[str, str], None]) -> None:
+        """
+        Register a callback called with (transcript_id, status) for each notification
+        :param callback: Callback function
+        :return: None
+        """
+        self.__callbacks.append(callback)
+
+    async def start(self) -> None:
+        """Start serving"""
+        if self.__server is None:
+            self.__server = await asyncio.start_server(self._handle, host = self.__host, port = self.__port)
+
+    async def stop(self) -> None:
+        """Stop serving"""
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+
+    async def _handle(self,
+                      reader :asyncio.StreamReader,
+                      writer :asyncio.StreamWriter) -> None:
+        """Handle one HTTP request"""
+        status = "400 Bad Request"
+        try:
+            # Read request line and headers
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method = lines[0].split(" ")[0]
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    (name, value) = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+
+            # Read body
+            length = int(headers.get("content-length", 0))
+            if method != "POST" or length > self.__max_body_size:
+                status = "405 Method Not Allowed" if method != "POST" else "413 Payload Too Large"
+            elif self.__auth_header_name and headers.get(self.__auth_header_name.lower()) != self.__auth_header_value:
+                status = "401 Unauthorized"
+            else:
+                body = json.loads(await reader.readexactly(length))
+                # Notify subscribers
+                for callback in self.__callbacks:
+                    callback(body["transcript_id"], body.get("status", ""))
+                status = "200 OK"
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, KeyError):
+            pass
+
+        # Response
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
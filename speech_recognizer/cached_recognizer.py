@@ -0,0 +1,170 @@
+from ..utils.types import CompositeRecognizer, BaseRecognizer, StatusCode, TranscriptionResponse
+from ..utils.audio import AudioBuffer
+from ..utils.cache import TranscriptionCache
+from ..utils.deadline import DeadlineExceeded
+from typing import Union, BinaryIO, Dict, Optional
+from concurrent.futures import Future
+import threading, asyncio
+
+class CachedRecognizer(CompositeRecognizer):
+    def __init__(self,
+                 recognizer :BaseRecognizer,
+                 cache :Optional[TranscriptionCache] = None,
+                 model :Optional[str] = None):
+        """
+        Cache in front of a recognizer, keyed by content hash of audio, recognizer model and options.
+        Concurrent identical requests are coalesced into a single in-flight call. Only successful responses are stored.
+        :param recognizer: Inner recognizer
+        :param cache: Transcription cache. Default: None (TranscriptionCache with default settings)
+        :param model: Model part of cache key. Default: None (model_name of recognizer)
+        """
+        super().__init__()
+        # Define params
+        self.__recognizer = recognizer
+        self.__cache = cache if cache is not None else TranscriptionCache()
+        # Responses of different models must not share entries
+        if model is None and not getattr(recognizer, "model_name", None):
+            raise ValueError(f"Can not determine model of {type(recognizer).__name__}, please set model")
+        self.__name = f"{type(recognizer).__name__}:{model}" if model is not None else self._recognizer_name(recognizer)
+        # In-flight requests
+        self.__lock = threading.Lock()
+        self.__in_flight :Dict[str, Future] = {}
+        self.__async_in_flight :Dict[str, asyncio.Future] = {}
+
+    @property
+    def cache(self) -> TranscriptionCache:
+        """Return transcription cache"""
+        return self.__cache
+
+    def _make_key(self,
+                  audio :Union[str, bytes, AudioBuffer],
+                  in_milliseconds :bool,
+                  detect_words :bool,
+                  **kwargs) -> str:
+        """Return cache key of a request (deadline is not part of it)"""
+        options = {key: value for (key, value) in kwargs.items() if key != "deadline"}
+        options.update({"in_milliseconds": in_milliseconds, "detect_words": detect_words})
+        return self.__cache.make_key(audio_hash = self.__cache.hash_audio(audio),
+                                     model = self.__name,
+                                     options = options)
+
+    def transcribe(self,
+                   audio :Union[str, bytes, BinaryIO, AudioBuffer],
+                   in_milliseconds :bool = True,
+                   detect_words :bool = False,
+                   **kwargs) -> TranscriptionResponse:
+        """
+        Synchronous function to return transcription from cache or inner recognizer
+        :param audio: Audio object ( Accepted types: str (file path or link), bytes, BinaryIO and AudioBuffer)
+        :param in_milliseconds: Whether return time under second or millisecond type
+        :param detect_words: Enable return list of segmented words.
+        :param kwargs: Keyword arguments passed to inner recognizer (language, ...), part of cache key.
+        deadline also bounds waiting for an identical in-flight request.
+        :return: TranscriptionResponse
+        """
+        deadline = self._bind_deadline(kwargs)
+        # Stream is consumed once
+        if not isinstance(audio, (str, bytes, AudioBuffer)):
+            audio = audio.read()
+        try:
+            key = self._make_key(audio, in_milliseconds, detect_words, **kwargs)
+        except FileNotFoundError as e:
+            return TranscriptionResponse(status_code = StatusCode.FAILED,
+                                         description = str(e))
+
+        # Cache hit
+        response = self.__cache.get(key)
+        if response is not None:
+            return response
+
+        # Join identical in-flight request
+        with self.__lock:
+            future = self.__in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.__in_flight[key] = future
+        if not owner:
+            response = future.result() if deadline is None else deadline.wait_result(future)
+            return response.model_copy(deep = True)
+
+        try:
+            response = self._run_recognizer(self.__recognizer, audio,
+                                            in_milliseconds = in_milliseconds,
+                                            detect_words = detect_words,
+                                            **kwargs)
+            if response.status_code == StatusCode.SUCCESS:
+                self.__cache.set(key, response)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.__lock:
+                self.__in_flight.pop(key, None)
+
+    async def atranscribe(self,
+                          audio :Union[str, bytes, BinaryIO, AudioBuffer],
+                          in_milliseconds :bool = True,
+                          detect_words :bool = False,
+                          **kwargs) -> TranscriptionResponse:
+        """
+        Asynchronous function to return transcription from cache or inner recognizer
+        :param audio: Audio object ( Accepted types: str (file path or link), bytes, BinaryIO and AudioBuffer)
+        :param in_milliseconds: Whether return time under second or millisecond type
+        :param detect_words: Enable return list of segmented words.
+        :param kwargs: Keyword arguments passed to inner recognizer (language, ...), part of cache key.
+        deadline also bounds waiting for an identical in-flight request.
+        :return: TranscriptionResponse
+        """
+        deadline = self._bind_deadline(kwargs)
+        # Stream is consumed once
+        if not isinstance(audio, (str, bytes, AudioBuffer)):
+            audio = audio.read()
+        try:
+            # Hash in worker thread (large files)
+            key = await asyncio.to_thread(self._make_key, audio, in_milliseconds, detect_words, **kwargs)
+        except FileNotFoundError as e:
+            return TranscriptionResponse(status_code = StatusCode.FAILED,
+                                         description = str(e))
+
+        # Cache hit
+        response = await asyncio.to_thread(self.__cache.get, key)
+        if response is not None:
+            return response
+
+        # Join identical in-flight request
+        while (future := self.__async_in_flight.get(key)) is not None:
+            waiter = asyncio.shield(future)
+            try:
+                response = await (waiter if deadline is None else deadline.run(waiter))
+            except asyncio.CancelledError:
+                # Owner gave up (cancelled or own deadline), take over unless this waiter is cancelled too
+                if future.cancelled() and asyncio.current_task().cancelling() == 0:
+                    continue
+                raise
+            return response.model_copy(deep = True)
+        future = asyncio.get_running_loop().create_future()
+        self.__async_in_flight[key] = future
+
+        try:
+            response = await self._arun_recognizer(self.__recognizer, audio,
+                                                   in_milliseconds = in_milliseconds,
+                                                   detect_words = detect_words,
+                                                   **kwargs)
+            if response.status_code == StatusCode.SUCCESS:
+                await asyncio.to_thread(self.__cache.set, key, response)
+            future.set_result(response)
+            return response
+        except (asyncio.CancelledError, DeadlineExceeded):
+            # Cancellation and deadline belong to owner, waiters recompute
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Exception is retrieved by waiters, avoid warning when there is none
+            future.exception()
+            raise
+        finally:
+            self.__async_in_flight.pop(key, None)
@@ -0,0 +1,180 @@
+from ..utils.types import CompositeRecognizer, BaseRecognizer, AudioType, StatusCode, TranscriptionResponse
+from ..utils.audio import AudioBuffer
+from ..utils.metrics import MetricCounter
+from ..utils.deadline import DeadlineExceeded
+from typing import Union, BinaryIO, List, Dict, Optional
+import asyncio
+
+class CascadeRecognizer(CompositeRecognizer):
+    def __init__(self,
+                 recognizers :Union[List[BaseRecognizer], Dict[str, BaseRecognizer]],
+                 min_confidence :Optional[float] = 0.6,
+                 min_word_confidence :Optional[float] = 0.4,
+                 max_low_confidence_words :float = 0.2,
+                 min_language_probability :Optional[float] = 0.7,
+                 languages :Optional[List[str]] = None,
+                 escalate_missing :bool = False):
+        """
+        Run cheapest recognizer first and escalate to next one only when its answer is not trusted.
+        Tiers are ordered from cheapest to most expensive, e.g. FasterWhisperRecognizer("tiny.en", compute_type = "int8"),
+        FasterWhisperRecognizer("small.en"), then GroqRecognizer. Audio is decoded once and the same AudioBuffer
+        is given to every tier (links are passed as they are). Last tier always answers.
+        An answer is escalated when it failed, or when one of these checks fails:
+        - confidence (FasterWhisper: mean token probability) is lower than min_confidence
+        - share of words below min_word_confidence is higher than max_low_confidence_words (only when words are
+        returned, i.e. detect_words = True)
+        - language probability is lower than min_language_probability, or language is not in languages
+        :param recognizers: Tiers as list (cheapest first) or dictionary of name and recognizer
+        :param min_confidence: Lowest accepted confidence. Default: 0.6 (None disables check)
+        :param min_word_confidence: Confidence under which a word is uncertain. Default: 0.4 (None disables check)
+        :param max_low_confidence_words: Highest accepted share of uncertain words, from 0 to 1. Default: 0.2
+        :param min_language_probability: Lowest accepted language probability. Default: 0.7 (None disables check)
+        :param languages: Expected languages (e.g. ["en"]). Default: None (any)
+        :param escalate_missing: Escalate answers without confidence or language (e.g. remote tiers returning text
+        only). Default: False (missing values are accepted)
+        """
+        super().__init__()
+        # Convert list to named recognizers
+        if isinstance(recognizers, dict):
+            named_recognizers = list(recognizers.items())
+        else:
+            named_recognizers = [(f"{index}:{self._recognizer_name(recognizer)}", recognizer)
+                                 for (index, recognizer) in enumerate(recognizers)]
+        # When empty
+        if len(named_recognizers) == 0:
+            raise ValueError("Recognizers cant be empty")
+        # Check share
+        if max_low_confidence_words < 0.0 or max_low_confidence_words > 1.0:
+            raise ValueError("Max low confidence words must be in range [0, 1]")
+
+        # Define params
+        self.__recognizers = named_recognizers
+        self.__min_confidence = min_confidence
+        self.__min_word_confidence = min_word_confidence
+        self.__max_low_confidence_words = max_low_confidence_words
+        self.__min_language_probability = min_language_probability
+        self.__languages = languages
+        self.__escalate_missing = escalate_missing
+        # Define stats
+        self.__stats = MetricCounter(name = "cascade")
+
+    @property
+    def stats(self) -> MetricCounter:
+        """Return counters: requests, <tier>.answered, <tier>.escalated and, for last tier, <tier>.failed and <tier>.untrusted"""
+        return self.__stats
+
+    def _decode(self, audio :Union[str, bytes, BinaryIO, AudioBuffer]) -> Union[str, AudioBuffer]:
+        """Decode audio once (16 kHz mono) for all tiers, links are not downloaded"""
+        if self._get_audio_type(audio) == AudioType.LINK:
+            return audio
+        return AudioBuffer.load(audio)
+
+    def _escalation_reason(self, response :TranscriptionResponse) -> Optional[str]:
+        """Return why answer is not trusted, None when it is accepted"""
+        if response.status_code != StatusCode.SUCCESS:
+            return f"failed ({response.description})"
+
+        # Confidence
+        if self.__min_confidence is not None:
+            if response.confidence is None:
+                if self.__escalate_missing:
+                    return "no confidence"
+            elif response.confidence < self.__min_confidence:
+                return f"confidence {response.confidence:.2f} < {self.__min_confidence}"
+
+        # Word confidence
+        if self.__min_word_confidence is not None and response.segments:
+            uncertain = sum(1 for word in response.segments if word.confidence < self.__min_word_confidence)
+            share = uncertain / len(response.segments)
+            if share > self.__max_low_confidence_words:
+                return f"{share:.0%} of words below {self.__min_word_confidence}"
+
+        # Language
+        if response.language is None:
+            if self.__escalate_missing and (self.__languages is not None or self.__min_language_probability is not None):
+                return "no language"
+            return None
+        if self.__languages is not None and response.language not in self.__languages:
+            return f"language {response.language} not in {self.__languages}"
+        if (self.__min_language_probability is not None and response.language_probability is not None
+                and response.language_probability < self.__min_language_probability):
+            return f"language probability {response.language_probability:.2f} < {self.__min_language_probability}"
+        return None
+
+    def _accept(self,
+                name :str,
+                response :TranscriptionResponse,
+                is_last :bool,
+                escalations :List[str]) -> bool:
+        """Record outcome of a tier and return True when its answer is returned"""
+        response.provider = name
+        reason = self._escalation_reason(response)
+        if reason is None or is_last:
+            self.__stats.increment(f"{name}.answered")
+            if reason is not None:
+                self.__stats.increment(f"{name}.failed" if response.status_code != StatusCode.SUCCESS
+                                       else f"{name}.untrusted")
+            if len(escalations) > 0:
+                # Keep reasons of escalation
+                response.description = "; ".join(escalations + ([response.description] if response.description else []))
+            return True
+        self.__stats.increment(f"{name}.escalated")
+        escalations.append(f"{name}: {reason}")
+        return False
+
+    def transcribe(self,
+                   audio :Union[str, bytes, BinaryIO, AudioBuffer],
+                   **kwargs) -> TranscriptionResponse:
+        """
+        Synchronous function to return transcription of first trusted tier. Answering tier is set in provider,
+        reasons of escalation in description.
+        :param audio: Audio object ( Accepted types: str (file path or link), bytes, BinaryIO and AudioBuffer)
+        :param kwargs: Keyword arguments passed to tiers (e.g. detect_words, language, deadline shared by all tiers)
+        :return: TranscriptionResponse
+        """
+        self._bind_deadline(kwargs)
+        try:
+            audio = self._decode(audio)
+        except FileNotFoundError as e:
+            return TranscriptionResponse(status_code = StatusCode.FAILED, description = str(e))
+        self.__stats.increment("requests")
+
+        escalations = []
+        for (position, (name, recognizer)) in enumerate(self.__recognizers):
+            try:
+                response = self._run_recognizer(recognizer, audio, **kwargs)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                response = TranscriptionResponse(status_code = StatusCode.FAILED, description = f"{name}: {e}")
+            if self._accept(name, response, position == len(self.__recognizers) - 1, escalations):
+                return response
+
+    async def atranscribe(self,
+                          audio :Union[str, bytes, BinaryIO, AudioBuffer],
+                          **kwargs) -> TranscriptionResponse:
+        """
+        Asynchronous function to return transcription of first trusted tier (local tiers run in a worker thread).
+        Answering tier is set in provider, reasons of escalation in description.
+        :param audio: Audio object ( Accepted types: str (file path or link), bytes, BinaryIO and AudioBuffer)
+        :param kwargs: Keyword arguments passed to tiers (e.g. detect_words, language, deadline shared by all tiers)
+        :return: TranscriptionResponse
+        """
+        self._bind_deadline(kwargs)
+        # Decode in worker thread
+        try:
+            audio = await asyncio.to_thread(self._decode, audio)
+        except FileNotFoundError as e:
+            return TranscriptionResponse(status_code = StatusCode.FAILED, description = str(e))
+        self.__stats.increment("requests")
+
+        escalations = []
+        for (position, (name, recognizer)) in enumerate(self.__recognizers):
+            try:
+                response = await self._arun_recognizer(recognizer, audio, **kwargs)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                response = TranscriptionResponse(status_code = StatusCode.FAILED, description = f"{name}: {e}")
+            if self._accept(name, response, position == len(self.__recognizers) - 1, escalations):
+                return response
@@ -1,29 +1,56 @@
 from ..utils.types import BaseRecognizer, Word, AudioType, StatusCode, TranscriptionResponse
+from ..utils.audio import AudioBuffer, UploadEncoder
+from ..utils.admission import AudioAdmissionController, AdmissionRejected
+from ..utils.transport import SharedTransport
+from ..utils.deadline import Deadline
 from typing import Union, Literal, Optional, List, BinaryIO
-from ..config import DEEPGRAM_KEY
+from ..config import DEEPGRAM_KEY, AUDIO_MEMORY_BUDGET, AUDIO_ADMISSION_MODE
+from contextlib import nullcontext
 from deepgram import (DeepgramClient,
+                      DeepgramClientOptions,
                       PrerecordedOptions,
                       FileSource,
                       BufferSource)
-import httpx, aiofiles, os
+import asyncio, httpx, aiofiles, os
 
 class DeepGramRecognizer(BaseRecognizer):
     def __init__(self,
                  model :Union[Literal["nova-2","nova-2-general"],str] = "nova-2",
                  api_key :str = DEEPGRAM_KEY,
+                 upload_encoder :Optional[UploadEncoder] = None,
+                 use_admission :bool = True,
+                 admission :Optional[AudioAdmissionController] = None,
+                 base_url :Optional[str] = None,
+                 transport :Optional[SharedTransport] = None,
                  **kwargs):
         """
         Initialize Groq recognizer service
         :param model: Basically, there are 2 main model (nova-2 and nova-2-general). For more information,
         visit (https://developers.deepgram.com/docs/models-languages-overview)
         :param api_key: DeepGram key
+        :param upload_encoder: Opt-in encoder compressing audio (FLAC/Opus) before upload. Default: None
+        :param use_admission: Account audio held by async requests in memory budget. Default: True
+        :param admission: Admission controller. Default: None (Process-wide controller, see AUDIO_MEMORY_BUDGET_MB)
+        :param base_url: Override API url (e.g. local stand-in server). Default: None (Deepgram API)
+        :param transport: Shared connection pool reused by all requests. Default: None (new connection per request)
         """
         super().__init__()
+        # Define admission controller
+        self.__admission = None
+        if use_admission:
+            self.__admission = admission or AudioAdmissionController.default(max_bytes = AUDIO_MEMORY_BUDGET,
+                                                                             mode = AUDIO_ADMISSION_MODE)
+        # Define pre-upload encoder
+        self.__upload_encoder = upload_encoder
         # Set model name
         self.__model_name = model
         # Set API key
         # self.__client = DeepgramClient(api_key = api_key)
-        self.__client = DeepgramClient(api_key)
+        self.__client = DeepgramClient(api_key,
+                                       config = DeepgramClientOptions(url = base_url) if base_url else None)
+        # Deepgram opens a client per request, shared transport keeps connections open between them
+        self.__transport = {"transport": transport.transport()} if transport is not None else {}
+        self.__async_transport = {"transport": transport.async_transport()} if transport is not None else {}
         # Define option
         self.__options = PrerecordedOptions(
             model = self.__model_name,
@@ -35,6 +62,11 @@ class DeepGramRecognizer(BaseRecognizer):
         """Return model name property"""
         return self.__model_name
 
+    @property
+    def admission(self) -> Optional[AudioAdmissionController]:
+        """Return admission controller (None when disabled)"""
+        return self.__admission
+
     def __contruct_segments(self,
                             segments :List,
                             in_milliseconds: bool = True) -> List[Word]:
@@ -59,27 +91,39 @@ class DeepGramRecognizer(BaseRecognizer):
         # Return segments
         return output
 
+    @staticmethod
+    def _request_timeout(timeout :Optional[float],
+                         connect_time :float,
+                         deadline :Deadline) -> Optional[httpx.Timeout]:
+        """Return HTTP timeout, bounded by remaining time of deadline"""
+        timeout = deadline.timeout(timeout)
+        if timeout is None:
+            return None
+        return httpx.Timeout(timeout = timeout, connect = min(connect_time, timeout))
+
     def transcribe(self,
-                   audio: Union[str, BinaryIO,bytes],
+                   audio: Union[str, BinaryIO, bytes, AudioBuffer],
                    timeout: Optional[float] = None,
                    connect_time: float = 5,
                    in_milliseconds: bool = True,
                    detect_words :bool = False,
+                   deadline :Union[None, float, Deadline] = None,
                    **kwargs) -> TranscriptionResponse:
         """
         Synchronous function to return transcription from audio
-        :param audio: Audio object ( Accepted types: str (file path), bytes and BinaryIO).
+        :param audio: Audio object ( Accepted types: str (file path), bytes, BinaryIO and AudioBuffer).
         :param timeout: Timeout in second (Default :None)
         :param connect_time: Connect time in second
         :param in_milliseconds: Whether return time under second or millisecond type
         :param detect_words: Enable return list of segmented words.
+        :param deadline: Time budget in second or Deadline, bounds timeout of each network operation.
+        DeadlineExceeded is raised when request failed after expiry (Default: None)
         :param kwargs:
         :return: RecognizerResponse
         """
+        deadline = Deadline.coerce(deadline)
         # Define timeout
-        if timeout != None:
-            timeout = httpx.Timeout(timeout = timeout,
-                                    connect = connect_time)
+        timeout = self._request_timeout(timeout, connect_time, deadline)
 
         # Get AudioType from audio input
         audio_type = self._get_audio_type(audio)
@@ -96,7 +140,8 @@ class DeepGramRecognizer(BaseRecognizer):
                     # Return response from url
                     response = self.__client.listen.rest.v("1").transcribe_url(source = audio,
                                                                                options = self.__options,
-                                                                               timeout = timeout)
+                                                                               timeout = timeout,
+                                                                               **self.__transport)
                 except Exception as e:
                     # Failed status
                     status_code = StatusCode.FAILED
@@ -112,12 +157,13 @@ class DeepGramRecognizer(BaseRecognizer):
                         buffer_data = file.read()
                     # Create payload
                     payload: FileSource = {
-                        "buffer": buffer_data,
+                        "buffer": self._get_upload_content(buffer_data, self.__upload_encoder)[0],
                     }
                     # Return response from prerecorded file
                     response = self.__client.listen.rest.v("1").transcribe_file(source = payload,
                                                                                 options = self.__options,
-                                                                                timeout = timeout)
+                                                                                timeout = timeout,
+                                                                                **self.__transport)
                 except Exception as e:
                     # Failed status
                     status_code = StatusCode.FAILED
@@ -127,18 +173,56 @@ class DeepGramRecognizer(BaseRecognizer):
                 try:
                     # Create payload
                     payload: BufferSource = {
-                        "buffer": bytes(audio),
+                        "buffer": self._get_upload_content(audio, self.__upload_encoder)[0],
                     }
                     # Return response from url
                     response = self.__client.listen.rest.v("1").transcribe_file(source = payload,
                                                                                 options = self.__options,
-                                                                                timeout = timeout)
+                                                                                timeout = timeout,
+                                                                                **self.__transport)
                 except Exception as e:
                     # Failed status
                     status_code = StatusCode.FAILED
 
+            case AudioType.AUDIO_BUFFER:
+                # Decoded audio case (no decoding again)
+                try:
+                    # Create payload
+                    payload: BufferSource = {
+                        "buffer": self._get_upload_content(audio, self.__upload_encoder)[0],
+                    }
+                    # Return response from decoded audio
+                    response = self.__client.listen.rest.v("1").transcribe_file(source = payload,
+                                                                                options = self.__options,
+                                                                                timeout = timeout,
+                                                                                **self.__transport)
+                except Exception as e:
+                    # Failed status
+                    status_code = StatusCode.FAILED
+
+            case AudioType.BINARY_IO:
+                # File object case
+                try:
+                    # Create payload
+                    payload: BufferSource = {
+                        "buffer": self._get_upload_content(audio.read(), self.__upload_encoder)[0],
+                    }
+                    # Return response from file object
+                    response = self.__client.listen.rest.v("1").transcribe_file(source = payload,
+                                                                                options = self.__options,
+                                                                                timeout = timeout,
+                                                                                **self.__transport)
+                except Exception as e:
+                    # Failed status
+                    status_code = StatusCode.FAILED
+
+            case _:
+                return TranscriptionResponse(status_code = StatusCode.FAILED,
+                                             description = f"Unsupported audio type: {type(audio).__name__}")
+
         # Doesnt response
         if response == None:
+            deadline.check(step = "response")
             return TranscriptionResponse(status_code = status_code)
 
         # Get info
@@ -157,25 +241,43 @@ class DeepGramRecognizer(BaseRecognizer):
                                      segments = segments)
 
     async def atranscribe(self,
-                          audio: Union[str, BinaryIO, bytes],
+                          audio: Union[str, BinaryIO, bytes, AudioBuffer],
                           timeout: Optional[float] = None,
                           connect_time: float = 5,
                           in_milliseconds: bool = True,
                           detect_words: bool = False,
+                          deadline :Union[None, float, Deadline] = None,
                           **kwargs) -> TranscriptionResponse:
         """
         Asynchronous function to return transcription from audio
-        :param audio: Audio object ( Accepted types: str (file path), bytes and BinaryIO).
+        :param audio: Audio object ( Accepted types: str (file path), bytes, BinaryIO and AudioBuffer).
         :param timeout: Timeout in second (Default :None)
         :param connect_time: Connect time in second
         :param in_milliseconds: Whether return time under second or millisecond type
         :param detect_words: Enable return list of segmented words.
+        :param deadline: Time budget in second or Deadline, shared by admission and request. Request is cancelled
+        (connection closed) at expiry and DeadlineExceeded is raised (Default: None)
         :param kwargs:
         :return: RecognizerResponse
         """
+        deadline = Deadline.coerce(deadline)
+        return await deadline.run(self._atranscribe(audio = audio,
+                                                    timeout = timeout,
+                                                    connect_time = connect_time,
+                                                    in_milliseconds = in_milliseconds,
+                                                    detect_words = detect_words,
+                                                    deadline = deadline))
+
+    async def _atranscribe(self,
+                           audio: Union[str, BinaryIO, bytes, AudioBuffer],
+                           timeout: Optional[float],
+                           connect_time: float,
+                           in_milliseconds: bool,
+                           detect_words: bool,
+                           deadline :Deadline) -> TranscriptionResponse:
+        """Asynchronously reserve memory and request transcription, see atranscribe"""
         # Define timeout
-        if timeout != None:
-            timeout = httpx.Timeout(timeout = timeout, connect = connect_time)
+        timeout = self._request_timeout(timeout, connect_time, deadline)
 
         # Get AudioType from audio input
         audio_type = self._get_audio_type(audio)
@@ -184,56 +286,106 @@ class DeepGramRecognizer(BaseRecognizer):
         response = None
         status_code = StatusCode.SUCCESS
 
-        # Switch case
-        match audio_type:
-            case AudioType.LINK:
-                # Audio Link case
-                try:
-                    # Return response from url
-                    response = await self.__client.listen.asyncrest.v("1").transcribe_url(source = audio,
-                                                                                          options = self.__options,
-                                                                                          timeout = timeout)
-                except Exception as e:
-                    # Failed status
-                    status_code = StatusCode.FAILED
+        # Reserve memory of audio before reading it
+        nbytes = AudioAdmissionController.estimate_audio_bytes(audio)
+        reservation = self.__admission.areserve(nbytes) if self.__admission is not None else nullcontext()
+        try:
+            async with reservation:
+                # Switch case
+                match audio_type:
+                    case AudioType.LINK:
+                        # Audio Link case
+                        try:
+                            # Return response from url
+                            response = await self.__client.listen.asyncrest.v("1").transcribe_url(source = audio,
+                                                                                                  options = self.__options,
+                                                                                                  timeout = timeout,
+                                                                                                  **self.__async_transport)
+                        except Exception as e:
+                            # Failed status
+                            status_code = StatusCode.FAILED
 
-            case AudioType.LOCAL_FILE:
-                # Local file case
-                if not os.path.exists(audio):
-                    raise FileNotFoundError(f"Local path: {audio} not found")
+                    case AudioType.LOCAL_FILE:
+                        # Local file case
+                        if not os.path.exists(audio):
+                            raise FileNotFoundError(f"Local path: {audio} not found")
 
-                try:
-                    # Read buffer
-                    async with aiofiles.open(audio, "rb") as audio:
-                        buffer_data = await audio.read()
+                        try:
+                            # Read buffer
+                            async with aiofiles.open(audio, "rb") as audio:
+                                buffer_data = await audio.read()
 
-                    # Create payload
-                    payload: FileSource = {
-                        "buffer": buffer_data,
-                    }
-                    # Return response from prerecorded file
-                    response = await self.__client.listen.asyncrest.v("1").transcribe_file(source = payload,
-                                                                                           options = self.__options,
-                                                                                           timeout = timeout)
-                except Exception as e:
-                    # Failed status
-                    status_code = StatusCode.FAILED
+                            # Create payload
+                            payload: FileSource = {
+                                "buffer": self._get_upload_content(buffer_data, self.__upload_encoder)[0],
+                            }
+                            # Return response from prerecorded file
+                            response = await self.__client.listen.asyncrest.v("1").transcribe_file(source = payload,
+                                                                                                   options = self.__options,
+                                                                                                   timeout = timeout,
+                                                                                                   **self.__async_transport)
+                        except Exception as e:
+                            # Failed status
+                            status_code = StatusCode.FAILED
 
-            case AudioType.BYTES:
-                # Audio Bytes case
-                try:
-                    # Create payload
-                    payload: BufferSource = {
-                        "buffer": bytes(audio),
-                    }
-                    # Return response from bytes
-                    response = await self.__client.listen.asyncrest.v("1").transcribe_file(source = payload,
-                                                                                           options = self.__options,
-                                                                                           timeout = timeout)
+                    case AudioType.BYTES:
+                        # Audio Bytes case
+                        try:
+                            # Create payload
+                            payload: BufferSource = {
+                                "buffer": self._get_upload_content(audio, self.__upload_encoder)[0],
+                            }
+                            # Return response from bytes
+                            response = await self.__client.listen.asyncrest.v("1").transcribe_file(source = payload,
+                                                                                                   options = self.__options,
+                                                                                                   timeout = timeout,
+                                                                                                   **self.__async_transport)
 
-                except Exception as e:
-                    # Failed status
-                    status_code = StatusCode.FAILED
+                        except Exception as e:
+                            # Failed status
+                            status_code = StatusCode.FAILED
+
+                    case AudioType.AUDIO_BUFFER:
+                        # Decoded audio case (no decoding again)
+                        try:
+                            # Create payload
+                            payload: BufferSource = {
+                                "buffer": self._get_upload_content(audio, self.__upload_encoder)[0],
+                            }
+                            # Return response from decoded audio
+                            response = await self.__client.listen.asyncrest.v("1").transcribe_file(source = payload,
+                                                                                                   options = self.__options,
+                                                                                                   timeout = timeout,
+                                                                                                   **self.__async_transport)
+                        except Exception as e:
+                            # Failed status
+                            status_code = StatusCode.FAILED
+
+                    case AudioType.BINARY_IO:
+                        # File object case
+                        try:
+                            # Read in worker thread
+                            buffer_data = await asyncio.to_thread(audio.read)
+                            # Create payload
+                            payload: BufferSource = {
+                                "buffer": self._get_upload_content(buffer_data, self.__upload_encoder)[0],
+                            }
+                            # Return response from file object
+                            response = await self.__client.listen.asyncrest.v("1").transcribe_file(source = payload,
+                                                                                                   options = self.__options,
+                                                                                                   timeout = timeout,
+                                                                                                   **self.__async_transport)
+                        except Exception as e:
+                            # Failed status
+                            status_code = StatusCode.FAILED
+
+                    case _:
+                        return TranscriptionResponse(status_code = StatusCode.FAILED,
+                                                     description = f"Unsupported audio type: {type(audio).__name__}")
+        except AdmissionRejected as e:
+            # Memory budget exceeded (reject mode or waiting timeout)
+            return TranscriptionResponse(status_code = StatusCode.FAILED,
+                                         description = str(e))
 
         # Doesnt response
         if response == None:
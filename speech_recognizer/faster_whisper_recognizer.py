@@ -1,9 +1,17 @@
-from ..utils.types import AdvancedRecognizer, Word, TranscriptionResponse, BaseRecognizer, StatusCode
-from typing import Literal, List, Union, Optional, BinaryIO
-from faster_whisper.transcribe import TranscriptionInfo
+from ..utils.types import AdvancedRecognizer, Word, TranscriptionResponse, BaseRecognizer, StatusCode, ReadinessMixin
+from ..utils.audio import AudioBuffer
+from ..utils.deadline import Deadline
+from .whisper_profile import load_profile
+from typing import Literal, List, Union, Optional, BinaryIO, Tuple, Iterator
+from faster_whisper.transcribe import TranscriptionInfo, get_ctranslate2_storage
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.audio import decode_audio, pad_or_trim
 from faster_whisper import WhisperModel
 from strenum import StrEnum
-import os
+import numpy as np
+import io, os, time, logging
+
+logger = logging.getLogger(__name__)
 
 class QuantizeType(StrEnum):
     INT8 = "int8",
@@ -15,7 +23,7 @@ class QuantizeType(StrEnum):
     BFLOAT16 = "bfloat16",
     FLOAT32 = "float32",
 
-class FasterWhisperRecognizer(BaseRecognizer):
+class FasterWhisperRecognizer(BaseRecognizer, ReadinessMixin):
     def __init__(self,
                  model_name :str = "small.en",
                  device :Literal["cuda","cpu","auto"] = "auto",
@@ -25,6 +33,8 @@ class FasterWhisperRecognizer(BaseRecognizer):
                  num_workers :int = 1,
                  download_root :Optional[str] = None,
                  use_batch :bool = False,
+                 warmup :bool = False,
+                 profile :Optional[str] = None,
                  **kwargs):
         """
         This class handles interaction with phoneme in word element, powered by FasterWhisper model:
@@ -41,8 +51,34 @@ class FasterWhisperRecognizer(BaseRecognizer):
         :param num_workers: When transcribe() is called from multiple Python threads, having multiple workers enables true parallelism when running the model
         (concurrent calls to self.model.generate() will run in parallel). This can improve the global throughput at the cost of increased memory usage.
         :param download_root: Directory where the models should be saved. If not set, the models are saved in the standard Hugging Face cache directory.
+        Use prefetch to download ahead of time (with progress), then local_files_only = True to never download here.
+        :param warmup: Run warmup before returning, instance is ready afterwards. Default: False
+        :param profile: "auto" to load profile calibrated for this host (python -m eve_agent.cli.calibrate),
+        or path of a profile file. Profile overrides compute_type, cpu_threads, num_workers, use_batch
+        and default beam size. Default: None (use arguments)
         """
         super().__init__()
+        self.__model_name = model_name
+        # Default transcribe arguments of profile
+        self.__transcribe_defaults = {}
+        if profile is not None:
+            if device == "auto":
+                import ctranslate2
+                profile_device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+            else:
+                profile_device = device
+            calibrated = load_profile(model_name,
+                                      path = None if profile == "auto" else profile,
+                                      device = profile_device)
+            if calibrated is None:
+                logger.warning(f"No calibrated profile of {model_name} for this host, using arguments")
+            else:
+                settings = calibrated["settings"]
+                compute_type = settings.get("compute_type", compute_type)
+                cpu_threads = settings.get("cpu_threads", cpu_threads)
+                num_workers = settings.get("num_workers", num_workers)
+                use_batch = settings.get("use_batch", use_batch)
+                self.__transcribe_defaults = dict(calibrated.get("transcribe", {}))
         # Define TTS Model with input parameter
         self.__model = WhisperModel(model_size_or_path = model_name,
                                     device = device,
@@ -52,11 +88,79 @@ class FasterWhisperRecognizer(BaseRecognizer):
                                     num_workers = num_workers,
                                     download_root = download_root,
                                     **kwargs)
+        # Underlying model, used by transcribe_batch
+        self.__whisper_model = self.__model
         # Used batch
         # To use this feature, you must install FasterWhisper from scratch (pip install --force-reinstall "faster-whisper @ https://github.com/SYSTRAN/faster-whisper/archive/refs/heads/master.tar.gz")
         if use_batch:
             from faster_whisper import BatchedInferencePipeline
             self.__model = BatchedInferencePipeline(model=self.__model)
+        # Warm up
+        if warmup:
+            self.warmup()
+
+    @property
+    def model_name(self) -> str:
+        """Return model name property"""
+        return self.__model_name
+
+    @classmethod
+    def prefetch(cls,
+                 model_name :str = "small.en",
+                 download_root :Optional[str] = None,
+                 local_files_only :bool = False) -> str:
+        """
+        Download model ahead of time, with progress bar, into download_root (or Hugging Face cache)
+        :param model_name: Model size, CTranslate2 model id or local directory. Default: small.en
+        :param download_root: Directory where the models should be saved. Default: None (Hugging Face cache)
+        :param local_files_only: Only check that model is already downloaded. Default: False
+        :return: Local model directory
+        """
+        if os.path.isdir(model_name):
+            return model_name
+        import huggingface_hub
+        from faster_whisper.utils import _MODELS
+        # Same files as WhisperModel, without disabling progress bar
+        repo_id = model_name if "/" in model_name else _MODELS.get(model_name)
+        if repo_id is None:
+            raise ValueError(f"Invalid model size {model_name}, expected one of: {', '.join(_MODELS.keys())}")
+        return huggingface_hub.snapshot_download(repo_id,
+                                                 allow_patterns = ["config.json", "preprocessor_config.json",
+                                                                   "model.bin", "tokenizer.json", "vocabulary.*"],
+                                                 local_files_only = local_files_only,
+                                                 cache_dir = download_root)
+
+    def warmup(self,
+               rounds :int = 2,
+               duration :float = 5.0,
+               detect_words :bool = True,
+               language :Optional[str] = None) -> List[float]:
+        """
+        Run dummy transcriptions so kernels are initialized and allocator has grown before real traffic,
+        then mark instance as ready
+        :param rounds: Number of warmup rounds. Default: 2
+        :param duration: Duration of dummy audio in second. Default: 5.0
+        :param detect_words: Also warm up word timestamps path. Default: True
+        :param language: Language of dummy transcription. Default: None (also warms up language detection)
+        :return: Duration of each round in second
+        """
+        sample_rate = self.__whisper_model.feature_extractor.sampling_rate
+        # Voiced-like signal: harmonics of a gliding pitch under a syllable-rate envelope, plus noise
+        t = np.arange(int(duration * sample_rate), dtype = np.float32) / sample_rate
+        pitch = 2 * np.pi * (120 + 40 * np.sin(2 * np.pi * 0.5 * t)) * t
+        envelope = 0.5 * (1 - np.cos(2 * np.pi * 4 * t))
+        samples = sum(np.sin(pitch * harmonic) / harmonic for harmonic in (1, 2, 3, 4)) * envelope * 0.1
+        samples = (samples + np.random.default_rng(0).normal(0, 0.005, len(t))).astype(np.float32)
+
+        timings = []
+        for _ in range(max(rounds, 1)):
+            start = time.perf_counter()
+            self.transcribe(samples, language = language)
+            if detect_words:
+                self.transcribe(samples, detect_words = True, language = language)
+            timings.append(time.perf_counter() - start)
+        self._set_ready()
+        return timings
 
     def __contruct_segments(self,
                             segments: List,
@@ -77,57 +181,142 @@ class FasterWhisperRecognizer(BaseRecognizer):
                 output.append(Word(text=word.word, start=start, end=end, confidence=word.probability))
         return output
 
+    @staticmethod
+    def _segment_confidence(segments :List) -> Optional[float]:
+        """
+        Return confidence of transcription: mean probability of decoded tokens (exp of average log probability)
+        of segments, weighted by segment duration
+        :param segments: Segments of FasterWhisper
+        :return: Confidence from 0 to 1, None without segment
+        """
+        if len(segments) == 0:
+            return None
+        weights = np.array([max(segment.end - segment.start, 0.01) for segment in segments])
+        probabilities = np.exp([segment.avg_logprob for segment in segments])
+        return float(np.sum(weights * probabilities) / np.sum(weights))
+
+    @staticmethod
+    def _collect_segments(segments :Iterator,
+                          deadline :Deadline) -> List:
+        """Run lazy segment generator of model, stopping between segments when deadline is exceeded or cancelled"""
+        collected = []
+        try:
+            for segment in segments:
+                collected.append(segment)
+                deadline.check(step = "next segment")
+        finally:
+            # Free decoder state of abandoned transcription
+            segments.close()
+        return collected
+
+    @staticmethod
+    def _prepare_audio(audio :Union[str, bytes, BinaryIO, AudioBuffer, np.ndarray]) -> Union[str, BinaryIO, np.ndarray]:
+        """Return audio in a type accepted by WhisperModel. AudioBuffer is used without decoding again."""
+        if isinstance(audio, AudioBuffer):
+            return audio.to_speech().samples
+        if isinstance(audio, bytes):
+            return io.BytesIO(audio)
+        return audio
+
     def get_transcription_info(self,
-                               audio :Union[str, bytes, BinaryIO]) -> TranscriptionInfo:
+                               audio :Union[str, bytes, BinaryIO, AudioBuffer, np.ndarray]) -> TranscriptionInfo:
         """
-        Return information about transcription
-        :param audio: Path to the input file (or a file-like object), or the audio waveform.
-        :return: TranscriptionInfo
+        Return information about transcription (language, language probabilities and duration), without transcribing.
+        Language is detected from first audio window (30 s) only: features of one window, one encoder pass and
+        no decoding. English-only models return en without running the model.
+        :param audio: Path to the input file (or a file-like object), AudioBuffer, or the 16 kHz audio waveform.
+        :return: TranscriptionInfo (without transcription and VAD options)
         """
         # File not found
         if isinstance(audio, str) and not os.path.exists(audio):
             raise FileNotFoundError(f"File {audio} not found")
+        model = self.__whisper_model
+        # Decode to 16 kHz waveform
+        samples = self._prepare_audio(audio)
+        if not isinstance(samples, np.ndarray):
+            samples = decode_audio(samples, sampling_rate = model.feature_extractor.sampling_rate)
+        duration = len(samples) / model.feature_extractor.sampling_rate
 
-        # Return segmentation and info
-        _, information = self.__model.transcribe(audio = audio,
-                                                 word_timestamps = False)
-        return information
+        # English-only model
+        all_language_probs = None
+        if not model.model.is_multilingual:
+            (language, language_probability) = ("en", 1.0)
+        else:
+            # First window only, padded to full window
+            features = pad_or_trim(model.feature_extractor(samples[:model.feature_extractor.n_samples]),
+                                   model.feature_extractor.nb_max_frames)
+            results = model.model.detect_language(model.encode(features))[0]
+            # Tokens are <|code|>, sorted by probability
+            all_language_probs = [(token[2:-2], probability) for (token, probability) in results]
+            (language, language_probability) = all_language_probs[0]
+
+        return TranscriptionInfo(language = language,
+                                 language_probability = language_probability,
+                                 duration = duration,
+                                 duration_after_vad = duration,
+                                 all_language_probs = all_language_probs,
+                                 transcription_options = None,
+                                 vad_options = None)
+
+    def detect_language(self,
+                        audio :Union[str, bytes, BinaryIO, AudioBuffer, np.ndarray]) -> Tuple[str, float]:
+        """
+        Detect language from first audio window (30 s) only, see get_transcription_info
+        :param audio: Path to the input file (or a file-like object), AudioBuffer, or the 16 kHz audio waveform.
+        :return: (language code, probability)
+        """
+        info = self.get_transcription_info(audio)
+        return (info.language, info.language_probability)
 
     def transcribe(self,
-                   audio :Union[str, bytes, BinaryIO],
+                   audio :Union[str, bytes, BinaryIO, AudioBuffer],
                    in_milliseconds: bool = True,
                    detect_words: bool = False,
+                   deadline :Union[None, float, Deadline] = None,
                    **kwargs) -> TranscriptionResponse:
         """
         Synchronous function to return transcription from audio
-        :param audio: Path to the input file (or a file-like object), or the audio waveform.
+        :param audio: Path to the input file (or a file-like object), AudioBuffer, or the audio waveform.
         :param in_milliseconds: Whether return time under second or millisecond type
         :param detect_words: Enable return list of segmented words.
+        :param deadline: Time budget in second or Deadline, decoding stops at next segment (30 s window) when it
+        is exceeded or cancelled, raising DeadlineExceeded. Default: None
         :return: TranscriptionResponse
         """
+        deadline = Deadline.coerce(deadline)
         # Check file path
         if isinstance(audio, str) and not os.path.exists(audio):
             description = f"File {audio} not found"
             # Return value
             return TranscriptionResponse(status_code = StatusCode.FAILED,
                                          description = description)
+        # Convert audio
+        deadline.check(step = "decoding")
+        audio = self._prepare_audio(audio)
+        kwargs = {**self.__transcribe_defaults, **kwargs}
 
         if not detect_words:
             # Get segments
-            segments, _ = self.__model.transcribe(audio = audio,
-                                                  word_timestamps = False,
-                                                  without_timestamps = True,
-                                                  **kwargs)
+            segments, info = self.__model.transcribe(audio = audio,
+                                                     word_timestamps = False,
+                                                     without_timestamps = True,
+                                                     **kwargs)
+            segments = self._collect_segments(segments, deadline)
             # Define transcription
-            transcription = "".join([word.text for word in segments])
+            transcription = "".join([segment.text for segment in segments])
             # Return
             return TranscriptionResponse(status_code = StatusCode.SUCCESS,
-                                         text = transcription)
+                                         text = transcription,
+                                         confidence = self._segment_confidence(segments),
+                                         language = info.language,
+                                         language_probability = info.language_probability,
+                                         duration = info.duration)
 
         # Return only transcription
-        segments, _ = self.__model.transcribe(audio = audio,
-                                              word_timestamps = True,
-                                              **kwargs)
+        segments, info = self.__model.transcribe(audio = audio,
+                                                 word_timestamps = True,
+                                                 **kwargs)
+        segments = self._collect_segments(segments, deadline)
         # Get segments
         words_timestamp = self.__contruct_segments(segments = segments,
                                                    in_milliseconds = in_milliseconds)
@@ -138,8 +327,116 @@ class FasterWhisperRecognizer(BaseRecognizer):
         # Return value
         return TranscriptionResponse(status_code = StatusCode.SUCCESS,
                                      text = transcription,
-                                     segments = words_timestamp)
+                                     confidence = self._segment_confidence(segments),
+                                     segments = words_timestamp,
+                                     language = info.language,
+                                     language_probability = info.language_probability,
+                                     duration = info.duration)
+
+    async def atranscribe(self,
+                          audio :Union[str, bytes, BinaryIO, AudioBuffer],
+                          deadline :Union[None, float, Deadline] = None,
+                          **kwargs) -> TranscriptionResponse:
+        """
+        Asynchronous function to return transcription from audio, decoded in a worker thread.
+        When call is cancelled or deadline is exceeded, decoding stops at next segment and frees the CPU.
+        :param audio: Path to the input file (or a file-like object), AudioBuffer, or the audio waveform.
+        :param deadline: Time budget in second or Deadline. Default: None
+        :param kwargs: Keyword arguments of transcribe (in_milliseconds, detect_words, ...)
+        :return: TranscriptionResponse
+        """
+        return await Deadline.coerce(deadline).run_in_thread(self.transcribe, audio, **kwargs)
+
+    def transcribe_batch(self,
+                         audios :List[Union[str, bytes, BinaryIO, AudioBuffer, np.ndarray]],
+                         language :Optional[str] = None,
+                         beam_size :Optional[int] = None,
+                         deadline :Union[None, float, Deadline] = None,
+                         **kwargs) -> List[TranscriptionResponse]:
+        """
+        Transcribe several clips with one encoder and one decoder call. Clips longer than one window (30 s)
+        are transcribed one by one.
+        :param audios: List of audio (file path, bytes, file-like object, AudioBuffer or 16 kHz waveform)
+        :param language: Language code of all clips. Default: None (detected per clip)
+        :param beam_size: Beam size. Default: None (beam size of profile, or 5)
+        :param deadline: Time budget in second or Deadline, checked between clips and before batched encoding
+        and decoding (a running batched call is not interrupted). Default: None
+        :param kwargs: Keyword arguments of transcribe, used for long clips
+        :return: List of TranscriptionResponse, in order of audios
+        """
+        deadline = Deadline.coerce(deadline)
+        model = self.__whisper_model
+        beam_size = beam_size or self.__transcribe_defaults.get("beam_size", 5)
+        responses :List[Optional[TranscriptionResponse]] = [None] * len(audios)
+        indexes = []
+        features = []
+        durations = []
+        for (index, audio) in enumerate(audios):
+            deadline.check(step = "next clip")
+            # Check file path
+            if isinstance(audio, str) and not os.path.exists(audio):
+                responses[index] = TranscriptionResponse(status_code = StatusCode.FAILED,
+                                                         description = f"File {audio} not found")
+                continue
+            # Decode to 16 kHz waveform
+            samples = self._prepare_audio(audio)
+            if not isinstance(samples, np.ndarray):
+                samples = decode_audio(samples, sampling_rate = model.feature_extractor.sampling_rate)
+            # Longer than one window
+            if len(samples) > model.feature_extractor.n_samples:
+                responses[index] = self.transcribe(samples, language = language, beam_size = beam_size,
+                                                   deadline = deadline, **kwargs)
+                continue
+            # First window only, padded to full window
+            features.append(pad_or_trim(model.feature_extractor(samples), model.feature_extractor.nb_max_frames))
+            indexes.append(index)
+            durations.append(len(samples) / model.feature_extractor.sampling_rate)
+
+        if len(indexes) == 0:
+            return responses
 
+        # Encode all windows at once
+        deadline.check(step = "encoding")
+        to_cpu = model.model.device == "cuda" and len(model.model.device_index) > 1
+        encoder_output = model.model.encode(get_ctranslate2_storage(np.stack(features)), to_cpu = to_cpu)
 
+        # Define language per clip
+        if language is not None or not model.model.is_multilingual:
+            languages = [language if model.model.is_multilingual else "en"] * len(indexes)
+            probabilities = [1.0] * len(indexes)
+        else:
+            detected = [results[0] for results in model.model.detect_language(encoder_output)]
+            languages = [token[2:-2] for (token, _) in detected]
+            probabilities = [probability for (_, probability) in detected]
 
+        # Decode all windows at once
+        deadline.check(step = "decoding")
+        tokenizers = {lang: Tokenizer(model.hf_tokenizer,
+                                      model.model.is_multilingual,
+                                      task = "transcribe",
+                                      language = lang) for lang in set(languages)}
+        prompts = [list(tokenizers[lang].sot_sequence) + [tokenizers[lang].no_timestamps] for lang in languages]
+        results = model.model.generate(encoder_output,
+                                       prompts,
+                                       beam_size = beam_size,
+                                       max_length = model.max_length,
+                                       return_scores = True,
+                                       return_no_speech_prob = True,
+                                       suppress_blank = True,
+                                       suppress_tokens = [-1])
 
+        for (index, lang, probability, duration, result) in zip(indexes, languages, probabilities, durations, results):
+            tokens = result.sequences_ids[0]
+            text = tokenizers[lang].decode(tokens)
+            # Average log probability of sequence
+            avg_logprob = result.scores[0] * len(tokens) / (len(tokens) + 1)
+            # Silence
+            if result.no_speech_prob > 0.6 and avg_logprob < -1.0:
+                text = ""
+            responses[index] = TranscriptionResponse(status_code = StatusCode.SUCCESS,
+                                                     text = text,
+                                                     confidence = float(np.exp(avg_logprob)),
+                                                     language = lang,
+                                                     language_probability = probability,
+                                                     duration = duration)
+        return responses
@@ -1,12 +1,25 @@
 from ..utils.types import BaseRecognizer
-from typing import Literal, Union
-from ..config import GROQ_KEY
+from ..utils.audio import AudioBuffer, UploadEncoder
+from ..utils.rate_limit import RateLimitPolicy, AdaptiveRateLimiter, RateLimitExceeded
+from ..utils.admission import AudioAdmissionController
+from ..utils.deadline import Deadline, DeadlineExceeded
+from ..utils.transport import SharedTransport
+from typing import Any, Literal, Union, Optional, Dict, Tuple
+from ..config import GROQ_KEY, AUDIO_MEMORY_BUDGET, AUDIO_ADMISSION_MODE
+from contextlib import nullcontext
 from httpx import Timeout
 from groq import Groq, AsyncGroq
 from groq._types import NotGiven, NOT_GIVEN
 from groq._constants import DEFAULT_MAX_RETRIES
 from groq.resources.audio.transcriptions import AsyncTranscriptions, Transcriptions
-import groq, aiofiles
+import groq, aiofiles, asyncio, os
+
+# Default limits of each model (Groq free tier). Override with rate_limit for higher tiers.
+GROQ_RATE_LIMITS :Dict[str,RateLimitPolicy] = {
+    "whisper-large-v3-turbo": RateLimitPolicy(requests_per_minute = 20),
+    "distil-whisper-large-v3-en": RateLimitPolicy(requests_per_minute = 20),
+    "whisper-large-v3": RateLimitPolicy(requests_per_minute = 20),
+}
 
 class GroqRecognizer(BaseRecognizer):
     def __init__(self,
@@ -15,6 +28,13 @@ class GroqRecognizer(BaseRecognizer):
                  use_async :bool = True,
                  max_retries :int = DEFAULT_MAX_RETRIES,
                  timeout: float | Timeout | None | NotGiven = NOT_GIVEN,
+                 use_rate_limit :bool = False,
+                 rate_limit :Optional[RateLimitPolicy] = None,
+                 upload_encoder :Optional[UploadEncoder] = None,
+                 use_admission :bool = True,
+                 admission :Optional[AudioAdmissionController] = None,
+                 base_url :Optional[str] = None,
+                 transport :Optional[SharedTransport] = None,
                  **kwargs):
         """
         Initialize Groq recognizer service
@@ -26,10 +46,33 @@ class GroqRecognizer(BaseRecognizer):
         :param use_async: Enable async client. Default is True.
         :param max_retries: Total time retries. Default is 2.
         :param timeout: Set timeout for service. Default is NOT_GIVEN.
+        :param use_rate_limit: Enable built-in rate limiter (token bucket, retry-after, backoff with jitter and
+        AIMD concurrency). Retries are then handled by the limiter instead of Groq client. Default is False.
+        :param rate_limit: Rate limit policy. Default is None (Use policy of model in GROQ_RATE_LIMITS, free tier).
+        :param upload_encoder: Opt-in encoder compressing audio (FLAC/Opus) before upload. Default: None
+        :param use_admission: Account audio held by async requests in memory budget. Default is True.
+        :param admission: Admission controller. Default is None (Process-wide controller, see AUDIO_MEMORY_BUDGET_MB).
+        :param base_url: Override API url (e.g. local stand-in server). Default is None (Groq API).
+        :param transport: Shared connection pool (HTTP/2, keep-alive, DNS cache). Default is None (own pool of client).
         """
         super().__init__()
         # Set model name
         self.__model_name = model
+        # Define admission controller
+        self.__admission = None
+        if use_admission:
+            self.__admission = admission or AudioAdmissionController.default(max_bytes = AUDIO_MEMORY_BUDGET,
+                                                                             mode = AUDIO_ADMISSION_MODE)
+        # Define pre-upload encoder
+        self.__upload_encoder = upload_encoder
+        # Define rate limiter
+        self.__max_retries = max_retries
+        self.__limiter = None
+        if use_rate_limit:
+            policy = rate_limit if rate_limit is not None else GROQ_RATE_LIMITS.get(model, RateLimitPolicy())
+            self.__limiter = AdaptiveRateLimiter(policy = policy)
+            # Disable client retries
+            max_retries = 0
         # Default transcription
         self._transcription = None
         self._async_transcription = None
@@ -37,25 +80,29 @@ class GroqRecognizer(BaseRecognizer):
         if use_async:
             # Async client
             self.__async_client = AsyncGroq(api_key = api_key,
+                                            base_url = base_url,
                                             max_retries = max_retries,
-                                            timeout = timeout)
+                                            timeout = timeout,
+                                            http_client = transport.async_client() if transport is not None else None)
             # Async transcription
             self._async_transcription = AsyncTranscriptions(client = self.__async_client)
         else:
             # Sync client
             self.__client = Groq(api_key = api_key,
+                                 base_url = base_url,
                                  max_retries = max_retries,
-                                 timeout = timeout)
+                                 timeout = timeout,
+                                 http_client = transport.client() if transport is not None else None)
             # Sync transcription
             self._transcription = Transcriptions(client=self.__client)
 
     def _verify_transcription_condition(self,
-                                        audio_file :str,
+                                        audio_file :Union[str, bytes, AudioBuffer],
                                         language :Union[str,NotGiven] = NotGiven,
                                         temperature :float = 0.0) -> None:
         """
         Verify transcription condition
-        :param audio_file: Path to the input file
+        :param audio_file: Path to the input file, bytes or AudioBuffer
         :param language: Specify the language for transcription. Use ISO 639-1 language codes
         (e.g. "en" for English, "fr" for French, etc.). Specifying a language may improve transcription accuracy and speed.
         Default: Not Given.
@@ -64,26 +111,174 @@ class GroqRecognizer(BaseRecognizer):
         :return: None
         """
         # Verify
-        if not self._is_existed_path(audio_file):
+        if isinstance(audio_file, str) and not self._is_existed_path(audio_file):
             raise FileNotFoundError(f"File: {audio_file} is not existed!")
 
         # Check language supported
-        if language != NotGiven and self.__model_name == "distil-whisper-large-v3-en":
+        if self._given(language) is not NOT_GIVEN and self.__model_name == "distil-whisper-large-v3-en":
             raise ValueError(f"{self.__model_name} only supports English")
 
         # Check temperature
         if temperature < 0.0 or temperature > 1.0:
             raise ValueError(f"Temperature value only from 0 to 1 !")
 
+    def _get_upload_file(self,
+                         audio_file :Union[str, bytes, AudioBuffer],
+                         buffer_data :Optional[bytes] = None) -> Tuple[str, bytes]:
+        """Return file name and content to upload (compressed when encoder is set)"""
+        # Local file
+        if isinstance(audio_file, str):
+            if self.__upload_encoder is None:
+                return (audio_file, buffer_data)
+            (content, extension) = self._get_upload_content(buffer_data, self.__upload_encoder)
+            return (f"{os.path.splitext(audio_file)[0]}.{extension}" if extension else audio_file, content)
+        # In-memory audio
+        (content, extension) = self._get_upload_content(audio_file, self.__upload_encoder)
+        return (f"audio.{extension}" if extension else "audio", content)
+
+    @property
+    def supports_sync(self) -> bool:
+        """Return True when client is synchronous (use_async = False)"""
+        return self._transcription is not None
+
+    @property
+    def supports_async(self) -> bool:
+        """Return True when client is asynchronous (use_async = True)"""
+        return self._async_transcription is not None
+
+    @property
+    def admission(self) -> Optional[AudioAdmissionController]:
+        """Return admission controller (None when disabled)"""
+        return self.__admission
+
+    @property
+    def rate_limiter(self) -> Optional[AdaptiveRateLimiter]:
+        """Return rate limiter (None when disabled)"""
+        return self.__limiter
+
+    @staticmethod
+    def _request_timeout(deadline :Deadline,
+                         params :dict) -> dict:
+        """Return request params with timeout bounded by remaining time of deadline"""
+        if deadline.remaining is None:
+            return params
+        return {**params, "timeout": deadline.timeout()}
+
+    @staticmethod
+    def _given(value :Any) -> Any:
+        """Return value, or NOT_GIVEN sentinel of client when argument was left at its default (NotGiven class)"""
+        return NOT_GIVEN if value is NotGiven or isinstance(value, NotGiven) else value
+
+    @staticmethod
+    def _backoff_within(deadline :Deadline,
+                        delay :float,
+                        error :Exception) -> float:
+        """Return backoff delay, raise DeadlineExceeded when retry would start after deadline"""
+        remaining = deadline.remaining
+        if remaining is not None and delay >= remaining:
+            raise DeadlineExceeded(f"Deadline exceeded before retry ({error})") from error
+        return delay
+
+    def _create(self,
+                deadline :Deadline,
+                **params):
+        """Synchronously create transcription, with rate limit and retry when limiter is enabled"""
+        if self.__limiter is None:
+            try:
+                return self._transcription.create(**self._request_timeout(deadline, params))
+            except groq.APITimeoutError:
+                deadline.check(step = "response")
+                raise
+
+        attempt = 0
+        while True:
+            retry_after = None
+            if not self.__limiter.acquire(timeout = deadline.remaining):
+                raise DeadlineExceeded("Deadline exceeded while waiting for rate limit")
+            try:
+                transcription = self._transcription.create(**self._request_timeout(deadline, params))
+                self.__limiter.on_success()
+                return transcription
+            except (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError) as e:
+                # Timed out by deadline
+                if isinstance(e, groq.APITimeoutError):
+                    deadline.check(step = "response")
+                # Out of retries
+                if attempt >= self.__max_retries:
+                    raise
+                # Back off
+                if isinstance(e, groq.RateLimitError):
+                    retry_after = self.__limiter.parse_retry_after(e.response.headers)
+                    self.__limiter.on_rate_limited(retry_after = retry_after)
+                error = e
+            finally:
+                self.__limiter.release()
+            deadline.sleep(self._backoff_within(deadline,
+                                                self.__limiter.backoff_delay(attempt = attempt, retry_after = retry_after),
+                                                error))
+            attempt += 1
+
+    async def _acreate(self,
+                       deadline :Deadline,
+                       **params):
+        """Asynchronously create transcription, with rate limit and retry when limiter is enabled"""
+        if self.__limiter is None:
+            return await self._async_transcription.create(**params)
+
+        attempt = 0
+        while True:
+            retry_after = None
+            await self.__limiter.aacquire()
+            try:
+                transcription = await self._async_transcription.create(**params)
+                self.__limiter.on_success()
+                return transcription
+            except (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError) as e:
+                # Out of retries
+                if attempt >= self.__max_retries:
+                    raise
+                # Back off
+                if isinstance(e, groq.RateLimitError):
+                    retry_after = self.__limiter.parse_retry_after(e.response.headers)
+                    self.__limiter.on_rate_limited(retry_after = retry_after)
+                error = e
+            finally:
+                await self.__limiter.arelease()
+            await asyncio.sleep(self._backoff_within(deadline,
+                                                     self.__limiter.backoff_delay(attempt = attempt,
+                                                                                  retry_after = retry_after),
+                                                     error))
+            attempt += 1
+
+    async def _aupload(self,
+                       audio_file :Union[str, bytes, AudioBuffer],
+                       deadline :Deadline,
+                       **params):
+        """Asynchronously reserve memory, read audio and create transcription"""
+        # Reserve memory of audio before reading it
+        nbytes = AudioAdmissionController.estimate_audio_bytes(audio_file)
+        reservation = self.__admission.areserve(nbytes) if self.__admission is not None else nullcontext()
+        async with reservation:
+            # Read buffer
+            buffer_data = None
+            if isinstance(audio_file, str):
+                async with aiofiles.open(audio_file, "rb") as audio:
+                    buffer_data = await audio.read()
+            (file_name, buffer_data) = self._get_upload_file(audio_file, buffer_data)
+
+            # Get transcription
+            return await self._acreate(deadline, file = (file_name, buffer_data), **params)
+
     def transcribe(self,
-                   audio_file :str,
+                   audio_file :Union[str, bytes, AudioBuffer],
                    language :Union[str,NotGiven] = NotGiven,
                    prompt : str | NotGiven = NotGiven,
                    temperature :float = 0.0,
+                   deadline :Union[None, float, Deadline] = None,
                    **kwargs) -> str:
         """
         Synchronous function to return transcription from audio
-        :param audio_file: Path to the input file
+        :param audio_file: Path to the input file, bytes or AudioBuffer
         :param language: Specify the language for transcription. Use ISO 639-1 language codes
         (e.g. "en" for English, "fr" for French, etc.). Specifying a language may improve transcription accuracy and speed.
         Default: Not Given.
@@ -91,8 +286,11 @@ class GroqRecognizer(BaseRecognizer):
         Default: Not Given
         :param temperature: Specify a value between 0 and 1 to control the translation output.
         Default: 0.0 (float).
+        :param deadline: Time budget in second or Deadline, shared by rate limit, retries and each request
+        (as request timeout), DeadlineExceeded is raised when exceeded. Default: None
         :return: str
         """
+        deadline = Deadline.coerce(deadline)
         # Check state of sync client
         assert self._transcription, "Please turn on Synchronous mode by enabling use_async = False"
         # Verify conditions
@@ -102,14 +300,19 @@ class GroqRecognizer(BaseRecognizer):
 
         # Read the transcription
         try:
-            with open(audio_file, "rb") as file:
-                # Create a transcription of the audio file
-                transcription = self._transcription.create(
-                    file = (audio_file, file.read()),
-                    prompt = prompt,
-                    model = self.__model_name,
-                    temperature = temperature,
-                )
+            # Read buffer
+            buffer_data = None
+            if isinstance(audio_file, str):
+                with open(audio_file, "rb") as file:
+                    buffer_data = file.read()
+            (file_name, buffer_data) = self._get_upload_file(audio_file, buffer_data)
+            # Create a transcription of the audio file
+            transcription = self._create(deadline,
+                                         file = (file_name, buffer_data),
+                                         language = self._given(language),
+                                         prompt = self._given(prompt),
+                                         model = self.__model_name,
+                                         temperature = temperature)
             return transcription.text
 
         # Catch exceptions
@@ -124,21 +327,23 @@ class GroqRecognizer(BaseRecognizer):
         except groq.UnprocessableEntityError as e:
             raise Exception(e.message)
         except groq.RateLimitError as e:
-            raise Exception("A 429 status code was received; we should back off a bit.")
+            raise RateLimitExceeded("A 429 status code was received; we should back off a bit.",
+                                    retry_after = AdaptiveRateLimiter.parse_retry_after(e.response.headers)) from e
         except groq.InternalServerError as e:
             raise Exception(e.message)
         except groq.APIConnectionError as e:
             raise Exception("The server could not be reached")
 
     async def atranscribe(self,
-                          audio_file: str,
+                          audio_file: Union[str, bytes, AudioBuffer],
                           language: Union[str, NotGiven] = NotGiven,
                           prompt: str | NotGiven = NotGiven,
                           temperature: float = 0.0,
+                          deadline :Union[None, float, Deadline] = None,
                           **kwargs) -> str:
         """
         Asynchronous function to return transcription from audio
-        :param audio_file: Path to the input file
+        :param audio_file: Path to the input file, bytes or AudioBuffer
         :param language: Specify the language for transcription. Use ISO 639-1 language codes
         (e.g. "en" for English, "fr" for French, etc.). Specifying a language may improve transcription accuracy and speed.
         Default: Not Given.
@@ -146,8 +351,11 @@ class GroqRecognizer(BaseRecognizer):
         Default: Not Given
         :param temperature: Specify a value between 0 and 1 to control the translation output.
         Default: 0.0 (float).
+        :param deadline: Time budget in second or Deadline, shared by admission, rate limit and retries. Request is
+        cancelled (connection closed) at expiry, DeadlineExceeded is raised. Default: None
         :return: str
         """
+        deadline = Deadline.coerce(deadline)
         # Check state of sync client
         assert self._async_transcription, "Please turn on Asynchronous mode by enabling use_async = True"
         # Verify conditions
@@ -157,17 +365,12 @@ class GroqRecognizer(BaseRecognizer):
 
         # Read the transcription
         try:
-            # Read buffer
-            async with aiofiles.open(audio_file, "rb") as audio:
-                buffer_data = await audio.read()
-
-            # Get transcription
-            transcription = await self._async_transcription.create(
-                file = (audio_file, buffer_data),
-                prompt = prompt,
-                model = self.__model_name,
-                temperature = temperature
-            )
+            transcription = await deadline.run(self._aupload(audio_file,
+                                                             deadline,
+                                                             language = self._given(language),
+                                                             prompt = self._given(prompt),
+                                                             model = self.__model_name,
+                                                             temperature = temperature))
             return transcription.text
         # Catch exceptions
         except groq.BadRequestError as e:
@@ -181,7 +384,8 @@ class GroqRecognizer(BaseRecognizer):
         except groq.UnprocessableEntityError as e:
             raise Exception(e.message)
         except groq.RateLimitError as e:
-            raise Exception("A 429 status code was received; we should back off a bit.")
+            raise RateLimitExceeded("A 429 status code was received; we should back off a bit.",
+                                    retry_after = AdaptiveRateLimiter.parse_retry_after(e.response.headers)) from e
         except groq.InternalServerError as e:
             raise Exception(e.message)
         except groq.APIConnectionError as e:
@@ -0,0 +1,277 @@
+from ..utils.types import CompositeRecognizer, BaseRecognizer, StatusCode, TranscriptionResponse
+from ..utils.metrics import LatencyTracker
+from ..utils.deadline import DeadlineExceeded
+from typing import List, Dict, Union, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED
+import concurrent.futures, asyncio, time
+
+class RouterRecognizer(CompositeRecognizer):
+    def __init__(self,
+                 recognizers :Union[List[BaseRecognizer], Dict[str, BaseRecognizer]],
+                 hedge :bool = False,
+                 hedge_percentile :float = 95.0,
+                 hedge_delay :float = 2.0,
+                 min_hedge_delay :float = 0.05,
+                 max_hedges :int = 1,
+                 min_samples :int = 10,
+                 alpha :float = 0.3,
+                 window :int = 100,
+                 failure_penalty :float = 5.0):
+        """
+        Route each request to the recognizer having the best recent latency (EWMA), fail over to the next one
+        on StatusCode.FAILED or exception, and optionally send a hedged duplicate request.
+        Recognizers without any latency sample are tried first (in given order) to collect measurement.
+        :param recognizers: List of recognizers (GroqRecognizer, DeepGramRecognizer, AssemblyRecognizer,
+        FasterWhisperRecognizer, ...) or a dictionary of name and recognizer.
+        :param hedge: Enable hedged requests. Default is False.
+        :param hedge_percentile: Percentile of primary recognizer latency waited before hedging. Default: 95.0
+        :param hedge_delay: Hedge delay in second used while there are not enough samples. Default: 2.0
+        :param min_hedge_delay: Lower bound of hedge delay in second. Default: 0.05
+        :param max_hedges: Maximum number of duplicated requests sent for one call. Default: 1
+        :param min_samples: Number of samples needed before percentile based hedge delay is used. Default: 10
+        :param alpha: Smoothing factor of EWMA latency. Default: 0.3
+        :param window: Number of recent samples kept for each recognizer. Default: 100
+        :param failure_penalty: Latency in second added to a failed attempt before recording it. Default: 5.0
+        """
+        super().__init__()
+        # Convert list to named recognizers
+        if isinstance(recognizers, dict):
+            named_recognizers = list(recognizers.items())
+        else:
+            named_recognizers = [(f"{index}:{self._recognizer_name(recognizer)}", recognizer)
+                                 for (index, recognizer) in enumerate(recognizers)]
+        # When empty
+        if len(named_recognizers) == 0:
+            raise ValueError("Recognizers cant be empty")
+        # Check hedge
+        if max_hedges < 0:
+            raise ValueError("Max hedges must be positive")
+
+        # Define params
+        self.__recognizers = named_recognizers
+        self.__trackers = {name: LatencyTracker(alpha = alpha, window = window)
+                           for (name, _) in named_recognizers}
+        self.__hedge = hedge
+        self.__hedge_percentile = hedge_percentile
+        self.__hedge_delay = hedge_delay
+        self.__min_hedge_delay = min_hedge_delay
+        self.__max_hedges = max_hedges
+        self.__min_samples = min_samples
+        self.__failure_penalty = failure_penalty
+        # Worker pool for synchronous hedging
+        self.__executor = None
+
+    @property
+    def latency_stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Return EWMA and p95 latency of each recognizer"""
+        return {name: {"ewma": tracker.ewma,
+                       "p95": tracker.percentile(95),
+                       "count": tracker.count}
+                for (name, tracker) in self.__trackers.items()}
+
+    def close(self) -> None:
+        """Shut down worker pool of synchronous hedging, losing hedged requests are not waited for"""
+        if self.__executor is not None:
+            self.__executor.shutdown(wait = False, cancel_futures = True)
+            self.__executor = None
+
+    def _rank(self) -> List[Tuple[str, BaseRecognizer]]:
+        """Return recognizers ordered by recent latency (unmeasured recognizers first)"""
+        def key(item):
+            (index, (name, _)) = item
+            ewma = self.__trackers[name].ewma
+            return (0, index) if ewma is None else (1, ewma)
+        return [item for (_, item) in sorted(enumerate(self.__recognizers), key = key)]
+
+    def _hedge_delay(self, name :str) -> float:
+        """Return waiting time before sending a hedged request, based on primary latency percentile"""
+        tracker = self.__trackers[name]
+        # Not enough samples
+        if tracker.count < self.__min_samples:
+            return self.__hedge_delay
+        return max(tracker.percentile(self.__hedge_percentile), self.__min_hedge_delay)
+
+    def _record(self,
+                name :str,
+                latency :float,
+                response :Optional[TranscriptionResponse]) -> None:
+        """Record latency of an attempt. Failed attempt is penalized in EWMA only, not in hedge delay percentile"""
+        if response is None or response.status_code == StatusCode.FAILED:
+            self.__trackers[name].record(latency + self.__failure_penalty, in_window = False)
+            return
+        self.__trackers[name].record(latency)
+
+    def _timed_run(self,
+                   name :str,
+                   recognizer :BaseRecognizer,
+                   audio,
+                   **kwargs) -> TranscriptionResponse:
+        """Synchronously run a recognizer, record its latency and convert exception into failed response"""
+        start = time.perf_counter()
+        try:
+            response = self._run_recognizer(recognizer, audio, **kwargs)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            response = TranscriptionResponse(status_code = StatusCode.FAILED,
+                                             description = f"{name}: {e}")
+        self._record(name = name, latency = time.perf_counter() - start, response = response)
+        # Set provider
+        response.provider = name
+        return response
+
+    async def _atimed_run(self,
+                          name :str,
+                          recognizer :BaseRecognizer,
+                          audio,
+                          **kwargs) -> TranscriptionResponse:
+        """Asynchronously run a recognizer, record its latency and convert exception into failed response"""
+        start = time.perf_counter()
+        try:
+            response = await self._arun_recognizer(recognizer, audio, **kwargs)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            response = TranscriptionResponse(status_code = StatusCode.FAILED,
+                                             description = f"{name}: {e}")
+        self._record(name = name, latency = time.perf_counter() - start, response = response)
+        # Set provider
+        response.provider = name
+        return response
+
+    def transcribe(self,
+                   audio,
+                   **kwargs) -> TranscriptionResponse:
+        """
+        Synchronous function to return transcription from the fastest available recognizer.
+        Note: Without deadline, a hedged request already running in a worker thread cant be interrupted, its result
+        is discarded. With a deadline, losing request is asked to stop (local models stop at next segment).
+        :param audio: Audio object, passed as it is to inner recognizers
+        :param kwargs: Keyword arguments passed to inner recognizers (deadline is shared by all of them)
+        :return: TranscriptionResponse
+        """
+        deadline = self._bind_deadline(kwargs)
+        candidates = self._rank()
+
+        # Simple failover
+        if not self.__hedge:
+            response = None
+            for (name, recognizer) in candidates:
+                response = self._timed_run(name, recognizer, audio, **kwargs)
+                if response.status_code == StatusCode.SUCCESS:
+                    return response
+            return response
+
+        # Define worker pool
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers = len(self.__recognizers) * (self.__max_hedges + 1))
+
+        # Hedged requests
+        pending = {}
+        response = None
+        index = 0
+        hedges = 0
+        failover = True
+
+        def submit(name :str, recognizer :BaseRecognizer) -> None:
+            # Own deadline per request, so that losers can be stopped
+            options = dict(kwargs, deadline = deadline.child()) if deadline is not None else kwargs
+            future = self.__executor.submit(self._timed_run, name, recognizer, audio, **options)
+            pending[future] = options.get("deadline")
+
+        try:
+            while index < len(candidates) or pending:
+                # Start next candidate (first attempt or failover)
+                if failover and index < len(candidates):
+                    submit(*candidates[index])
+                    index += 1
+                failover = False
+
+                # Wait for first result or hedge deadline
+                can_hedge = hedges < self.__max_hedges and index < len(candidates)
+                hedge_delay = self._hedge_delay(candidates[index - 1][0]) if can_hedge else None
+                timeout = deadline.timeout(hedge_delay) if deadline is not None else hedge_delay
+                done, _ = concurrent.futures.wait(pending.keys(), timeout = timeout, return_when = FIRST_COMPLETED)
+
+                # Hedge deadline passed
+                if len(done) == 0:
+                    # Waiting was bounded by call deadline (expired, raised by next wait)
+                    if not can_hedge or timeout < hedge_delay:
+                        continue
+                    submit(*candidates[index])
+                    index += 1
+                    hedges += 1
+                    continue
+
+                for future in done:
+                    pending.pop(future)
+                    response = future.result()
+                    # First success wins
+                    if response.status_code == StatusCode.SUCCESS:
+                        return response
+                    failover = True
+            return response
+        finally:
+            # Stop losers
+            for (loser, loser_deadline) in pending.items():
+                loser.cancel()
+                if loser_deadline is not None:
+                    loser_deadline.cancel()
+
+    async def atranscribe(self,
+                          audio,
+                          **kwargs) -> TranscriptionResponse:
+        """
+        Asynchronous function to return transcription from the fastest available recognizer.
+        Losing hedged request is cancelled.
+        :param audio: Audio object, passed as it is to inner recognizers
+        :param kwargs: Keyword arguments passed to inner recognizers (deadline is shared by all of them)
+        :return: TranscriptionResponse
+        """
+        deadline = self._bind_deadline(kwargs)
+        candidates = self._rank()
+        pending = {}
+        response = None
+        index = 0
+        hedges = 0
+        failover = True
+        try:
+            while index < len(candidates) or pending:
+                # Start next candidate (first attempt or failover)
+                if failover and index < len(candidates):
+                    (name, recognizer) = candidates[index]
+                    task = asyncio.create_task(self._atimed_run(name, recognizer, audio, **kwargs))
+                    pending[task] = name
+                    index += 1
+                failover = False
+
+                # Wait for first result or hedge deadline
+                can_hedge = self.__hedge and hedges < self.__max_hedges and index < len(candidates)
+                hedge_delay = self._hedge_delay(candidates[index - 1][0]) if can_hedge else None
+                timeout = deadline.timeout(hedge_delay) if deadline is not None else hedge_delay
+                done, _ = await asyncio.wait(pending.keys(), timeout = timeout, return_when = asyncio.FIRST_COMPLETED)
+
+                # Hedge deadline passed
+                if len(done) == 0:
+                    # Waiting was bounded by call deadline (expired, raised by next wait)
+                    if not can_hedge or timeout < hedge_delay:
+                        continue
+                    (name, recognizer) = candidates[index]
+                    task = asyncio.create_task(self._atimed_run(name, recognizer, audio, **kwargs))
+                    pending[task] = name
+                    index += 1
+                    hedges += 1
+                    continue
+
+                for task in done:
+                    pending.pop(task)
+                    response = task.result()
+                    # First success wins
+                    if response.status_code == StatusCode.SUCCESS:
+                        return response
+                    failover = True
+            return response
+        finally:
+            # Cancel losers
+            for task in pending.keys():
+                task.cancel()
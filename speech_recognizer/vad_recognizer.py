@@ -0,0 +1,138 @@
+from ..utils.types import CompositeRecognizer, BaseRecognizer, AudioType, StatusCode, TranscriptionResponse
+from ..utils.audio import AudioBuffer, VoiceActivityDetector, SpeechRegion
+from ..utils.metrics import MetricCounter
+from typing import Union, BinaryIO, List, Optional, Tuple
+import asyncio
+
+class VadRecognizer(CompositeRecognizer):
+    def __init__(self,
+                 recognizer :BaseRecognizer,
+                 detector :Optional[VoiceActivityDetector] = None,
+                 trim :bool = True):
+        """
+        Voice activity gate in front of a recognizer. Clips without speech return an empty response right away,
+        without decoding by model or paid API call. Detected speech regions are returned in the response.
+        :param recognizer: Inner recognizer (GroqRecognizer, DeepGramRecognizer, FasterWhisperRecognizer, ...)
+        :param detector: Voice activity detector. Default: None (VoiceActivityDetector with default settings)
+        :param trim: Send only audio between first and last speech region. Word timestamps are shifted back
+        to original time. Default: True
+        """
+        super().__init__()
+        # Define params
+        self.__recognizer = recognizer
+        self.__detector = detector if detector is not None else VoiceActivityDetector()
+        self.__trim = trim
+        self.__name = self._recognizer_name(recognizer)
+        # Define stats
+        self.__stats = MetricCounter(name = "vad")
+
+    @property
+    def model_name(self) -> Optional[str]:
+        """Return name of inner recognizer with its model, None when inner model is unknown"""
+        return self.__name if getattr(self.__recognizer, "model_name", None) else None
+
+    @property
+    def stats(self) -> MetricCounter:
+        """Return counters: clips, skipped_clips, audio_seconds, skipped_seconds, trimmed_seconds"""
+        return self.__stats
+
+    def _gate(self, audio) -> Tuple[Optional[AudioBuffer], Optional[List[SpeechRegion]]]:
+        """Decode audio once and detect speech. Return (audio to send, regions); regions is None when not gated."""
+        # Links are not downloaded
+        if self._get_audio_type(audio) == AudioType.LINK:
+            return (None, None)
+
+        buffer = AudioBuffer.load(audio)
+        regions = self.__detector.detect(buffer)
+        self.__stats.increment("clips")
+        self.__stats.increment("audio_seconds", buffer.duration)
+
+        # No speech
+        if len(regions) == 0:
+            self.__stats.increment("skipped_clips")
+            self.__stats.increment("skipped_seconds", buffer.duration)
+            return (None, regions)
+
+        # Keep only speech span
+        if self.__trim:
+            trimmed = buffer.slice(start = regions[0].start, end = regions[-1].end)
+            self.__stats.increment("trimmed_seconds", buffer.duration - trimmed.duration)
+            buffer = trimmed
+        return (buffer, regions)
+
+    def _empty_response(self, regions :List[SpeechRegion]) -> TranscriptionResponse:
+        """Return response of a clip without speech"""
+        return TranscriptionResponse(status_code = StatusCode.SUCCESS,
+                                     text = "",
+                                     segments = [],
+                                     provider = self.__name,
+                                     speech_regions = regions)
+
+    def _finalize(self,
+                  response :TranscriptionResponse,
+                  regions :List[SpeechRegion],
+                  in_milliseconds :bool) -> TranscriptionResponse:
+        """Attach speech regions and shift word timestamps back to original time"""
+        response.speech_regions = regions
+        offset = regions[0].start if self.__trim else 0.0
+        if offset > 0 and response.segments:
+            shift = self._convert_to_millisecond(offset) if in_milliseconds else offset
+            for word in response.segments:
+                word.start += shift
+                word.end += shift
+        return response
+
+    def transcribe(self,
+                   audio :Union[str, bytes, BinaryIO, AudioBuffer],
+                   in_milliseconds :bool = True,
+                   **kwargs) -> TranscriptionResponse:
+        """
+        Synchronous function to return transcription, skipping clips without speech
+        :param audio: Audio object ( Accepted types: str (file path or link), bytes, BinaryIO and AudioBuffer)
+        :param in_milliseconds: Whether return time under second or millisecond type
+        :param kwargs: Keyword arguments passed to inner recognizer (deadline included)
+        :return: TranscriptionResponse
+        """
+        self._bind_deadline(kwargs)
+        try:
+            (buffer, regions) = self._gate(audio)
+        except FileNotFoundError as e:
+            return TranscriptionResponse(status_code = StatusCode.FAILED,
+                                         description = str(e))
+        # Not gated
+        if regions is None:
+            return self._run_recognizer(self.__recognizer, audio, in_milliseconds = in_milliseconds, **kwargs)
+        # No speech
+        if buffer is None:
+            return self._empty_response(regions)
+
+        response = self._run_recognizer(self.__recognizer, buffer, in_milliseconds = in_milliseconds, **kwargs)
+        return self._finalize(response = response, regions = regions, in_milliseconds = in_milliseconds)
+
+    async def atranscribe(self,
+                          audio :Union[str, bytes, BinaryIO, AudioBuffer],
+                          in_milliseconds :bool = True,
+                          **kwargs) -> TranscriptionResponse:
+        """
+        Asynchronous function to return transcription, skipping clips without speech
+        :param audio: Audio object ( Accepted types: str (file path or link), bytes, BinaryIO and AudioBuffer)
+        :param in_milliseconds: Whether return time under second or millisecond type
+        :param kwargs: Keyword arguments passed to inner recognizer (deadline included)
+        :return: TranscriptionResponse
+        """
+        self._bind_deadline(kwargs)
+        # Decode and detect in worker thread
+        try:
+            (buffer, regions) = await asyncio.to_thread(self._gate, audio)
+        except FileNotFoundError as e:
+            return TranscriptionResponse(status_code = StatusCode.FAILED,
+                                         description = str(e))
+        # Not gated
+        if regions is None:
+            return await self._arun_recognizer(self.__recognizer, audio, in_milliseconds = in_milliseconds, **kwargs)
+        # No speech
+        if buffer is None:
+            return self._empty_response(regions)
+
+        response = await self._arun_recognizer(self.__recognizer, buffer, in_milliseconds = in_milliseconds, **kwargs)
+        return self._finalize(response = response, regions = regions, in_milliseconds = in_milliseconds)
@@ -0,0 +1,78 @@
+from typing import Any, Dict, Optional
+import datetime, json, os, platform, tempfile
+
+# Default profile file, shared by all models of this user
+DEFAULT_PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "eve_agent", "faster_whisper_profiles.json")
+# Recognizer arguments stored in profile
+PROFILE_SETTINGS = ("compute_type", "cpu_threads", "num_workers", "use_batch")
+
+def host_id() -> str:
+    """
+    Return identifier of host hardware: CPU model, usable cores and architecture.
+    Hosts of same CPU generation and size share their profile.
+    """
+    cpu = platform.processor() or "unknown"
+    # Linux reports CPU model in cpuinfo
+    if os.path.exists("/proc/cpuinfo"):
+        with open("/proc/cpuinfo", "r") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    return f"{platform.machine()}|{cpu}|{cores} cores"
+
+def _read_profiles(path :str) -> Dict[str, Any]:
+    """Return all profiles of file"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as file:
+        return json.load(file)
+
+def load_profile(model_name :str,
+                 path :Optional[str] = None,
+                 device :str = "cpu") -> Optional[Dict[str, Any]]:
+    """
+    Return calibrated profile of model for this host
+    :param model_name: Model name
+    :param path: Profile file. Default: None (DEFAULT_PROFILE_PATH)
+    :param device: Device of profile. Default: cpu
+    :return: Profile {"settings", "transcribe", "metrics", ...} or None when host was not calibrated
+    """
+    profiles = _read_profiles(path or DEFAULT_PROFILE_PATH)
+    return profiles.get(f"{host_id()}|{device}|{model_name}")
+
+def save_profile(model_name :str,
+                 settings :Dict[str, Any],
+                 transcribe :Dict[str, Any],
+                 metrics :Dict[str, Any],
+                 path :Optional[str] = None,
+                 device :str = "cpu") -> str:
+    """
+    Save profile of model for this host, profiles of other hosts and models in file are kept
+    :param model_name: Model name
+    :param settings: Recognizer arguments (compute_type, cpu_threads, num_workers, use_batch)
+    :param transcribe: Default transcribe arguments (beam_size)
+    :param metrics: Measured metrics
+    :param path: Profile file. Default: None (DEFAULT_PROFILE_PATH)
+    :param device: Device of profile. Default: cpu
+    :return: Profile key
+    """
+    path = path or DEFAULT_PROFILE_PATH
+    key = f"{host_id()}|{device}|{model_name}"
+    profiles = _read_profiles(path)
+    profiles[key] = {"host": host_id(),
+                     "device": device,
+                     "model": model_name,
+                     "settings": {name: settings[name] for name in PROFILE_SETTINGS if name in settings},
+                     "transcribe": transcribe,
+                     "metrics": metrics,
+                     "created": datetime.datetime.now(datetime.timezone.utc).isoformat()}
+    # Write atomically, file may be shared between hosts
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok = True)
+    (descriptor, temporary) = tempfile.mkstemp(dir = directory, suffix = ".tmp")
+    with os.fdopen(descriptor, "w") as file:
+        json.dump(profiles, file, indent = 2)
+    os.replace(temporary, path)
+    return key
@@ -0,0 +1,380 @@
+from ..utils.types import BaseRecognizer, TranscriptionResponse, StatusCode, ReadinessMixin
+from ..utils.audio import AudioBuffer
+from ..utils.metrics import MetricCounter
+from ..utils.deadline import Deadline, DeadlineExceeded
+from concurrent.futures import Future
+from multiprocessing import shared_memory, resource_tracker
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+import multiprocessing as mp
+import numpy as np
+import asyncio, itertools, os, queue, sys, threading, time
+
+def _worker_main(index :int,
+                 model_kwargs :Dict[str, Any],
+                 cpus :Optional[List[int]],
+                 tasks :List[Any],
+                 results :Any,
+                 stop :Any) -> None:
+    """Worker process: load model, then transcribe tasks of own queue, stealing from other queues when idle"""
+    from .faster_whisper_recognizer import FasterWhisperRecognizer
+
+    # Pin worker to its cores
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+    try:
+        recognizer = FasterWhisperRecognizer(**model_kwargs)
+    except Exception as e:
+        results.put(("failed", index, str(e)))
+        return
+    results.put(("ready", index, None))
+
+    own = tasks[index]
+    others = tasks[index + 1:] + tasks[:index]
+    while not stop.is_set():
+        task = None
+        stolen = False
+        try:
+            task = own.get(timeout = 0.05)
+        except queue.Empty:
+            # Steal from peers
+            for other in others:
+                try:
+                    task = other.get_nowait()
+                    stolen = True
+                    break
+                except queue.Empty:
+                    continue
+        if task is None:
+            continue
+
+        (task_id, memory_name, num_samples, kwargs, expiry) = task
+        # Deadline passed while queued, caller is gone
+        if expiry is not None and time.monotonic() >= expiry:
+            response = TranscriptionResponse(status_code = StatusCode.FAILED,
+                                             description = "Deadline exceeded before start")
+            results.put(("done", index, (task_id, response, stolen)))
+            continue
+        results.put(("started", index, task_id))
+        memory = shared_memory.SharedMemory(name = memory_name)
+        samples = np.ndarray((num_samples,), dtype = np.float32, buffer = memory.buf)
+        try:
+            # Monotonic clock is shared by processes, decoding stops at next segment after expiry
+            deadline = Deadline(timeout = max(expiry - time.monotonic(), 0.0)) if expiry is not None else None
+            response = recognizer.transcribe(samples, deadline = deadline, **kwargs)
+        except Exception as e:
+            response = TranscriptionResponse(status_code = StatusCode.FAILED,
+                                             description = str(e))
+        finally:
+            # Release view before closing shared memory
+            del samples
+            memory.close()
+        results.put(("done", index, (task_id, response, stolen)))
+
+class WhisperWorkerPool(BaseRecognizer, ReadinessMixin):
+    def __init__(self,
+                 model_name :str = "small.en",
+                 num_processes :Optional[int] = None,
+                 cpu_threads :int = 1,
+                 compute_type :str = "int8",
+                 pin_cpus :bool = True,
+                 download_root :Optional[str] = None,
+                 start_timeout :float = 600.0,
+                 **kwargs):
+        """
+        Multi-process CPU pool of FasterWhisperRecognizer for batch jobs. Model is downloaded and read into
+        page cache once before workers are forked, each worker runs cpu_threads threads on its own cores.
+        Decoded audio is handed to workers through shared memory instead of pickling. Each worker has its own
+        queue and steals tasks from other queues when idle.
+        :param model_name: Model size, model id or path (see FasterWhisperRecognizer). Default: small.en
+        :param num_processes: Number of worker processes. Default: None (available cores / cpu_threads)
+        :param cpu_threads: Threads per worker. Default: 1
+        :param compute_type: Compute type of workers. Default: int8
+        :param pin_cpus: Pin each worker to its own cores (Linux only). Default: True
+        :param download_root: Directory where the models should be saved. Default: None (Hugging Face cache)
+        :param start_timeout: Maximum waiting time for workers to load model in second. Default: 600
+        :param kwargs: Keyword arguments passed to FasterWhisperRecognizer of workers
+        (e.g. warmup = True, so pool is ready only once every worker is warm)
+        """
+        super().__init__()
+        # Define params
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        self.__cores = cores
+        self.__cpu_threads = max(cpu_threads, 1)
+        self.__num_processes = num_processes or max(len(cores) // self.__cpu_threads, 1)
+        self.__pin_cpus = pin_cpus
+        self.__start_timeout = start_timeout
+        self.__model_name = model_name
+        self.__download_root = download_root
+        self.__model_kwargs = dict(kwargs,
+                                   device = "cpu",
+                                   compute_type = compute_type,
+                                   cpu_threads = self.__cpu_threads,
+                                   num_workers = 1)
+        # Define state
+        self.__context = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+        self.__processes :List[Any] = []
+        self.__tasks :List[Any] = []
+        self.__results = None
+        self.__stop = None
+        self.__collector :Optional[threading.Thread] = None
+        self.__lock = threading.Lock()
+        # Serialize start and close (reentrant, failed start closes)
+        self.__start_lock = threading.RLock()
+        self.__pending :Dict[int, Future] = {}
+        self.__memories :Dict[int, shared_memory.SharedMemory] = {}
+        self.__started_by :Dict[int, int] = {}
+        self.__queue_sizes :List[int] = []
+        self.__task_ids = itertools.count()
+        self.__ready = threading.Event()
+        self.__start_error :Optional[str] = None
+        # Define stats
+        self.__stats = MetricCounter(name = "whisper_worker_pool")
+
+    @property
+    def model_name(self) -> str:
+        """Return model name property"""
+        return self.__model_name
+
+    @property
+    def num_processes(self) -> int:
+        """Return number of worker processes"""
+        return self.__num_processes
+
+    @property
+    def stats(self) -> MetricCounter:
+        """Return counters: submitted, completed, stolen, audio_seconds"""
+        return self.__stats
+
+    @property
+    def is_running(self) -> bool:
+        """Return True when workers are started"""
+        return len(self.__processes) > 0
+
+    def _preload(self) -> str:
+        """Download model once and read weights into page cache, return model path"""
+        if os.path.isdir(self.__model_name):
+            path = self.__model_name
+        else:
+            from faster_whisper.utils import download_model
+            path = download_model(self.__model_name, cache_dir = self.__download_root)
+        # Warm page cache, so workers load from memory
+        for name in os.listdir(path):
+            file_path = os.path.join(path, name)
+            if os.path.isfile(file_path):
+                with open(file_path, "rb") as file:
+                    while file.read(16 * 1024 * 1024):
+                        pass
+        return path
+
+    def start(self) -> None:
+        """Preload model, fork workers and wait until they are ready"""
+        with self.__start_lock:
+            if self.is_running:
+                return
+            model_kwargs = dict(self.__model_kwargs, model_name = self._preload())
+            # Workers must share tracker of shared memory, otherwise a worker's own tracker unlinks audio on exit
+            resource_tracker.ensure_running()
+
+            self.__stop = self.__context.Event()
+            self.__results = self.__context.Queue()
+            self.__tasks = [self.__context.Queue() for _ in range(self.__num_processes)]
+            self.__queue_sizes = [0] * self.__num_processes
+            for index in range(self.__num_processes):
+                # Cores of worker
+                cpus = None
+                if self.__pin_cpus:
+                    first = index * self.__cpu_threads
+                    cpus = [self.__cores[(first + offset) % len(self.__cores)] for offset in range(self.__cpu_threads)]
+                process = self.__context.Process(target = _worker_main,
+                                                 args = (index, model_kwargs, cpus, self.__tasks, self.__results, self.__stop),
+                                                 daemon = True)
+                process.start()
+                self.__processes.append(process)
+
+            # Collect results in background
+            self.__collector = threading.Thread(target = self._collect, daemon = True)
+            self.__collector.start()
+            if not self.__ready.wait(self.__start_timeout) or self.__start_error is not None:
+                error = self.__start_error or "Workers did not start in time"
+                self.close()
+                raise RuntimeError(error)
+            self._set_ready()
+
+    def close(self) -> None:
+        """Stop workers, pending tasks fail"""
+        with self.__start_lock:
+            if not self.is_running:
+                return
+            self.__stop.set()
+            for process in self.__processes:
+                process.join(timeout = 5)
+                if process.is_alive():
+                    process.terminate()
+            self.__processes = []
+            if self.__collector is not None:
+                self.__collector.join(timeout = 1)
+                self.__collector = None
+            # Fail pending tasks
+            with self.__lock:
+                for task_id in list(self.__pending.keys()):
+                    self._finish(task_id, TranscriptionResponse(status_code = StatusCode.FAILED,
+                                                                description = "Worker pool closed"))
+            self.__ready.clear()
+            self._set_ready(False)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _finish(self,
+                task_id :int,
+                response :TranscriptionResponse) -> None:
+        """Resolve future and free shared memory of a task (lock held)"""
+        future = self.__pending.pop(task_id, None)
+        memory = self.__memories.pop(task_id, None)
+        self.__started_by.pop(task_id, None)
+        if memory is not None:
+            memory.close()
+            try:
+                memory.unlink()
+            except FileNotFoundError:
+                pass
+        if future is not None and not future.done():
+            future.set_result(response)
+
+    def _collect(self) -> None:
+        """Collector thread: receive worker messages and detect dead workers"""
+        ready = set()
+        while not self.__stop.is_set():
+            try:
+                (kind, index, payload) = self.__results.get(timeout = 0.2)
+            except queue.Empty:
+                self._check_workers()
+                continue
+
+            if kind == "ready":
+                ready.add(index)
+                if len(ready) == self.__num_processes:
+                    self.__ready.set()
+            elif kind == "failed":
+                self.__start_error = payload
+                self.__ready.set()
+            elif kind == "started":
+                with self.__lock:
+                    self.__started_by[payload] = index
+            elif kind == "done":
+                (task_id, response, stolen) = payload
+                with self.__lock:
+                    self._finish(task_id, response)
+                    self.__queue_sizes[index] = max(self.__queue_sizes[index] - 1, 0)
+                self.__stats.increment("completed")
+                if stolen:
+                    self.__stats.increment("stolen")
+
+    def _check_workers(self) -> None:
+        """Fail tasks started by dead workers"""
+        dead = {index for (index, process) in enumerate(self.__processes) if not process.is_alive()}
+        if len(dead) == 0:
+            return
+        with self.__lock:
+            # No more tasks for dead workers, their queued tasks are stolen by others
+            for index in dead:
+                self.__queue_sizes[index] = sys.maxsize
+            for (task_id, index) in list(self.__started_by.items()):
+                if index in dead:
+                    self._finish(task_id, TranscriptionResponse(status_code = StatusCode.FAILED,
+                                                                description = f"Worker {index} died"))
+
+    def submit(self,
+               audio :Union[str, bytes, BinaryIO, AudioBuffer, np.ndarray],
+               deadline :Union[None, float, Deadline] = None,
+               **kwargs) -> Future:
+        """
+        Queue a transcription
+        :param audio: Audio object (file path, bytes, BinaryIO, AudioBuffer or 16 kHz float32 waveform)
+        :param deadline: Time budget in second or Deadline. Task is skipped when it expires in queue, and worker
+        stops decoding at next segment after expiry. Cancellation is not sent to workers. Default: None
+        :param kwargs: Keyword arguments of FasterWhisperRecognizer.transcribe (detect_words, in_milliseconds, ...)
+        :return: Future of TranscriptionResponse
+        """
+        expiry = Deadline.coerce(deadline).expiry
+        self.start()
+        future = Future()
+        # Decode in caller thread
+        try:
+            if isinstance(audio, np.ndarray):
+                samples = audio.astype(np.float32, copy = False)
+            else:
+                samples = AudioBuffer.load(audio).to_speech().samples
+        except Exception as e:
+            future.set_result(TranscriptionResponse(status_code = StatusCode.FAILED,
+                                                    description = str(e)))
+            return future
+
+        # Copy samples into shared memory
+        memory = shared_memory.SharedMemory(create = True, size = max(samples.nbytes, 1))
+        np.ndarray(samples.shape, dtype = np.float32, buffer = memory.buf)[:] = samples
+
+        with self.__lock:
+            task_id = next(self.__task_ids)
+            self.__pending[task_id] = future
+            self.__memories[task_id] = memory
+            # Least loaded queue
+            index = int(np.argmin(self.__queue_sizes))
+            self.__queue_sizes[index] += 1
+        self.__tasks[index].put((task_id, memory.name, len(samples), kwargs, expiry))
+        self.__stats.increment("submitted")
+        self.__stats.increment("audio_seconds", len(samples) / 16000)
+        return future
+
+    def map(self,
+            audios :List[Union[str, bytes, BinaryIO, AudioBuffer, np.ndarray]],
+            **kwargs) -> List[TranscriptionResponse]:
+        """
+        Transcribe audios in parallel
+        :param audios: List of audio objects
+        :param kwargs: Keyword arguments of FasterWhisperRecognizer.transcribe
+        :return: List of TranscriptionResponse, in order of audios
+        """
+        futures = [self.submit(audio, **kwargs) for audio in audios]
+        return [future.result() for future in futures]
+
+    def transcribe(self,
+                   audio :Union[str, bytes, BinaryIO, AudioBuffer, np.ndarray],
+                   deadline :Union[None, float, Deadline] = None,
+                   **kwargs) -> TranscriptionResponse:
+        """
+        Synchronous function to return transcription from a worker
+        :param audio: Audio object (file path, bytes, BinaryIO, AudioBuffer or 16 kHz float32 waveform)
+        :param deadline: Time budget in second or Deadline, DeadlineExceeded is raised at expiry. Default: None
+        :param kwargs: Keyword arguments of FasterWhisperRecognizer.transcribe
+        :return: TranscriptionResponse
+        """
+        if deadline is None:
+            return self.submit(audio, **kwargs).result()
+        deadline = Deadline.coerce(deadline)
+        future = self.submit(audio, deadline = deadline, **kwargs)
+        try:
+            return deadline.wait_result(future)
+        except DeadlineExceeded:
+            future.cancel()
+            raise
+
+    async def atranscribe(self,
+                          audio :Union[str, bytes, BinaryIO, AudioBuffer, np.ndarray],
+                          deadline :Union[None, float, Deadline] = None,
+                          **kwargs) -> TranscriptionResponse:
+        """
+        Asynchronous function to return transcription from a worker
+        :param audio: Audio object (file path, bytes, BinaryIO, AudioBuffer or 16 kHz float32 waveform)
+        :param deadline: Time budget in second or Deadline, DeadlineExceeded is raised at expiry. Default: None
+        :param kwargs: Keyword arguments of FasterWhisperRecognizer.transcribe
+        :return: TranscriptionResponse
+        """
+        deadline = Deadline.coerce(deadline)
+        future = await asyncio.to_thread(self.submit, audio, deadline = deadline, **kwargs)
+        # Future is cancelled with the call, result of worker is then discarded
+        return await deadline.run(asyncio.wrap_future(future))
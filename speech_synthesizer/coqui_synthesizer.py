@@ -1,21 +1,27 @@
-from ..utils.types import BaseSynthesizer
-from typing import Literal
+from ..utils.types import BaseSynthesizer, ReadinessMixin
+from ..utils.audio import OutputFormat
+from ..utils.deadline import Deadline
+from typing import Literal, List, Optional, Union
 from TTS.api import TTS
-import torch, os
+import torch, os, tempfile, time
 
-class CoquiSynthesizer(BaseSynthesizer):
+class CoquiSynthesizer(BaseSynthesizer, ReadinessMixin):
     def __init__(self,
                  model :str = "tts_models/en/ljspeech/tacotron2-DDC",
                  device :Literal["cpu","cuda","auto"] = "auto",
-                 progress_bar :bool = False):
+                 progress_bar :bool = False,
+                 warmup :bool = False,
+                 output_format :Optional[OutputFormat] = None):
         """
         Initialize Coqui Synthesizer service.
         :param model: To gel all supported model, type: tts-server --list_models.
         Default (tts_models/en/ljspeech/tacotron2-DDC)
         :param device: Enable GPU acceleration (cuda) or only CPU (cpu). Default is auto.
         :param progress_bar: Print progression statement or not. Default False.
+        :param warmup: Run warmup before returning, instance is ready afterwards. Default: False
+        :param output_format: Convert WAV output in process (e.g. OutputFormat.telephony()). Default: None
         """
-        super().__init__()
+        super().__init__(output_format = output_format)
         # Enable
         if device == "auto":
             # Auto mode
@@ -28,6 +34,50 @@ class CoquiSynthesizer(BaseSynthesizer):
         self.__model_name = model
         self.__model = TTS(model_name = self.__model_name,
                            progress_bar = progress_bar).to(device = self.__device)
+        # Warm up
+        if warmup:
+            self.warmup()
+
+    @classmethod
+    def prefetch(cls,
+                 model :str = "tts_models/en/ljspeech/tacotron2-DDC",
+                 progress_bar :bool = True) -> str:
+        """
+        Download model (and its vocoder) ahead of time into Coqui model directory
+        :param model: Model name, see tts-server --list_models. Default: tts_models/en/ljspeech/tacotron2-DDC
+        :param progress_bar: Show download progress. Default: True
+        :return: Local model path
+        """
+        from TTS.utils.manage import ModelManager
+        manager = ModelManager(models_file = TTS.get_models_file_path(), progress_bar = progress_bar)
+        (model_path, _, model_item) = manager.download_model(model)
+        # Default vocoder of model
+        vocoder = model_item.get("default_vocoder") if isinstance(model_item, dict) else None
+        if vocoder:
+            manager.download_model(vocoder)
+        return model_path
+
+    def warmup(self,
+               rounds :int = 2,
+               text :str = "Hello, this is a warmup sentence. How are you doing today?",
+               **kwargs) -> List[float]:
+        """
+        Run dummy syntheses so kernels are initialized and allocator has grown before real traffic,
+        then mark instance as ready
+        :param rounds: Number of warmup rounds. Default: 2
+        :param text: Representative text. Default: two short sentences
+        :param kwargs: Keyword arguments of generate (e.g. lang, voice required by multi-speaker models)
+        :return: Duration of each round in second
+        """
+        timings = []
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "warmup.wav")
+            for _ in range(max(rounds, 1)):
+                start = time.perf_counter()
+                self.generate(text = text, generated_path = path, **kwargs)
+                timings.append(time.perf_counter() - start)
+        self._set_ready()
+        return timings
 
     def generate(self,
                  text :str,
@@ -35,6 +85,7 @@ class CoquiSynthesizer(BaseSynthesizer):
                  lang :str = "en",
                  voice = None,
                  speed :float = 1.0,
+                 deadline :Union[None, float, Deadline] = None,
                  **kwargs) -> None:
         """
         Synchronously generate synthesis audio
@@ -43,6 +94,8 @@ class CoquiSynthesizer(BaseSynthesizer):
         :param lang: Language destination. Default: en
         :param voice: Speaker voice. Default: None.
         :param speed: Describe how fast of speech is. Floating point value between 0.00 (slow) and 2.0 (fast).
+        :param deadline: Time budget in second or Deadline. When given, text is synthesized sentence by sentence
+        and DeadlineExceeded is raised between sentences once it expired (or was cancelled). Default: None
         :param kwargs:
         :return: None
         """
@@ -62,11 +115,44 @@ class CoquiSynthesizer(BaseSynthesizer):
             destination_lang = lang
 
         # Run TTS
-        self.__model.tts_to_file(text = text,
-                                 file_path = generated_path,
-                                 language = destination_lang,
-                                 speaker_wav = voice,
-                                 speed = speed)
+        if deadline is None:
+            self.__model.tts_to_file(text = text,
+                                     file_path = generated_path,
+                                     language = destination_lang,
+                                     speaker_wav = voice,
+                                     speed = speed)
+        else:
+            deadline = Deadline.coerce(deadline)
+            wav = []
+            # Stop between sentences when deadline expired
+            for sentence in self.__model.synthesizer.split_into_sentences(text):
+                deadline.check(step = "sentence")
+                wav += list(self.__model.tts(text = sentence,
+                                             language = destination_lang,
+                                             speaker_wav = voice,
+                                             speed = speed,
+                                             split_sentences = False))
+            self.__model.synthesizer.save_wav(wav = wav, path = generated_path)
+        self._finalize_output(generated_path)
+
+    async def agenerate(self,
+                        text :str,
+                        generated_path :str,
+                        deadline :Union[None, float, Deadline] = None,
+                        **kwargs) -> None:
+        """
+        Asynchronously generate synthesis audio in worker thread
+        :param text: Text for generation
+        :param generated_path: Local file path of generated audio
+        :param deadline: Time budget in second or Deadline. At expiry (or cancellation of caller) DeadlineExceeded
+        is raised and worker thread stops at next sentence. Default: None
+        :param kwargs: Keyword arguments of generate (lang, voice, speed)
+        :return: None
+        """
+        await Deadline.coerce(deadline).run_in_thread(self.generate,
+                                                      text = text,
+                                                      generated_path = generated_path,
+                                                      **kwargs)
 
     def clone(self,
               text: str,
@@ -128,4 +214,5 @@ class CoquiSynthesizer(BaseSynthesizer):
         # Converting
         self.__model.voice_conversion_to_file(source_wav = source_path,
                                               target_wav = target_path,
-                                              file_path = generated_path)
\ No newline at end of file
+                                              file_path = generated_path)
+        self._finalize_output(generated_path)
\ No newline at end of file
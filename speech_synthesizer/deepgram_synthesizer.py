@@ -1,10 +1,15 @@
 from ..utils.types import BaseSynthesizer
-from typing import Union
+from typing import Union, Optional, Dict, Tuple, Iterator, AsyncIterator
 from ..utils.encoding import DeepGramEncoding
+from ..utils.audio import OutputFormat, StreamTranscoder
+from ..utils.deadline import Deadline
+from ..utils.transport import SharedTransport
 from strenum import StrEnum
 from deepgram import (DeepgramClient,
+                      DeepgramClientOptions,
                       SpeakOptions)
 from ..config import DEEPGRAM_KEY
+import httpx
 
 class VoiceSetting(StrEnum):
     ASTERIA_FEMALE = "aura-asteria-en"
@@ -24,43 +29,211 @@ class DeepGramSynthesizer(BaseSynthesizer):
     def __init__(self,
                  api_key :str = DEEPGRAM_KEY,
                  encoding :Union[str,DeepGramEncoding] = DeepGramEncoding.LINEAR16,
+                 sample_rate :Optional[int] = None,
+                 output_format :Optional[OutputFormat] = None,
+                 base_url :Optional[str] = None,
+                 transport :Optional[SharedTransport] = None,
                  **kwargs):
         """
         Initialize DeepGram Synthesizer service
         :param model: Supports various voice types. For more information,
         visit (https://developers.deepgram.com/docs/tts-models)
         :param api_key: DeepGram key
+        :param encoding: Audio encoding. Default: linear16
+        :param sample_rate: Output sample rate for linear16, mulaw and alaw (e.g. 8000 for telephony).
+        Default: None (Deepgram default)
+        :param output_format: Convert output in process, files and streams (streams require linear16, mulaw
+        or alaw encoding). Default: None (Deepgram format)
+        :param base_url: Override API url (e.g. local stand-in server). Default: None (Deepgram API)
+        :param transport: Shared connection pool reused by all requests. Default: None (new connection per request)
         """
-        super().__init__()
+        super().__init__(output_format = output_format)
         self._encoding = encoding
+        self._sample_rate = sample_rate
         # Set API key
-        self.__client = DeepgramClient(api_key)
+        self.__client = DeepgramClient(api_key,
+                                       config = DeepgramClientOptions(url = base_url) if base_url else None)
+        # Deepgram opens a client per request, shared transport keeps connections open between them
+        self.__transport = {"transport": transport.transport()} if transport is not None else {}
+        self.__async_transport = {"transport": transport.async_transport()} if transport is not None else {}
+        # Precomputed options per (voice, streaming)
+        self.__options :Dict[Tuple[str, bool], SpeakOptions] = {}
+
+    def _get_options(self,
+                     voice :Union[VoiceSetting,str],
+                     streaming :bool = False) -> SpeakOptions:
+        """
+        Return options of a voice (computed once)
+        :param voice: Voice model
+        :param streaming: Request headerless stream (container none, or ogg for opus) instead of WAV file
+        :return: SpeakOptions
+        """
+        key = (str(voice), streaming)
+        if key not in self.__options:
+            # Define container
+            if self._encoding in (DeepGramEncoding.LINEAR16, DeepGramEncoding.MULAW, DeepGramEncoding.ALAW):
+                container = "none" if streaming else "wav"
+            elif self._encoding == DeepGramEncoding.OPUS:
+                container = "ogg"
+            else:
+                # Container is not applicable (mp3, flac, aac)
+                container = None
+            # Sample rate only applies to raw encodings
+            sample_rate = self._sample_rate if container in ("none", "wav") else None
+            self.__options[key] = SpeakOptions(model = str(voice),
+                                               encoding = str(self._encoding),
+                                               container = container,
+                                               sample_rate = sample_rate)
+        return self.__options[key]
+
+    @staticmethod
+    def _request_timeout(deadline :Deadline) -> Optional[httpx.Timeout]:
+        """Return HTTP timeout of remaining time (None when deadline has no expiry)"""
+        timeout = deadline.timeout()
+        return httpx.Timeout(timeout = timeout) if timeout is not None else None
 
     def generate(self,
                  text :str,
                  generated_path :str,
                  voice :Union[VoiceSetting,str] = VoiceSetting.ASTERIA_FEMALE,
+                 deadline :Union[None, float, Deadline] = None,
                  **kwargs):
         """
         Synchronously generate synthesis audio
         :param text: Text for generation
         :param generated_path: Local file path of generated audio
+        :param deadline: Time budget in second or Deadline, bounds timeout of each network operation.
+        DeadlineExceeded is raised when request failed after expiry. Default: None
         :return:
         """
         # Check generation condition
         self._check_generation_condition(text = text,
                                          file_path = generated_path)
-
-        # Define option
-        self.__options = SpeakOptions(
-            model = voice,
-            encoding = self._encoding,
-            container = "wav"
-        )
+        deadline = Deadline.coerce(deadline)
 
         # Define text
         speak_options = {"text": text}
         # Get response
-        response = self.__client.speak.v("1").save(filename = generated_path,
-                                                   source = speak_options,
-                                                   options = self.__options)
\ No newline at end of file
+        try:
+            response = self.__client.speak.v("1").save(filename = generated_path,
+                                                       source = speak_options,
+                                                       options = self._get_options(voice = voice),
+                                                       timeout = self._request_timeout(deadline),
+                                                       **self.__transport)
+        except Exception:
+            deadline.check(step = "response")
+            raise
+        self._finalize_output(generated_path)
+
+    async def agenerate(self,
+                        text :str,
+                        generated_path :str,
+                        voice :Union[VoiceSetting,str] = VoiceSetting.ASTERIA_FEMALE,
+                        deadline :Union[None, float, Deadline] = None,
+                        **kwargs):
+        """
+        Asynchronously generate synthesis audio
+        :param text: Text for generation
+        :param generated_path: Local file path of generated audio
+        :param voice: Voice model
+        :param deadline: Time budget in second or Deadline, request is cancelled (connection closed) at expiry
+        and DeadlineExceeded is raised. Default: None
+        :return:
+        """
+        # Check generation condition
+        self._check_generation_condition(text = text,
+                                         file_path = generated_path)
+
+        # Get response
+        response = await Deadline.coerce(deadline).run(
+            self.__client.speak.asyncrest.v("1").save(filename = generated_path,
+                                                      source = {"text": text},
+                                                      options = self._get_options(voice = voice),
+                                                      **self.__async_transport))
+        self._finalize_output(generated_path)
+
+    def _transcoder(self) -> Optional[StreamTranscoder]:
+        """Return transcoder of stream into output format (None when Deepgram format is kept)"""
+        if self._output_format is None:
+            return None
+        if self._encoding not in (DeepGramEncoding.LINEAR16, DeepGramEncoding.MULAW, DeepGramEncoding.ALAW):
+            raise ValueError("Output format conversion of stream requires linear16, mulaw or alaw encoding")
+        # Deepgram default rates
+        sample_rate = self._sample_rate or (24000 if self._encoding == DeepGramEncoding.LINEAR16 else 8000)
+        return self._stream_transcoder(input_encoding = str(self._encoding), input_sample_rate = sample_rate)
+
+    def stream(self,
+               text :str,
+               voice :Union[VoiceSetting,str] = VoiceSetting.ASTERIA_FEMALE,
+               chunk_size :Optional[int] = None,
+               deadline :Union[None, float, Deadline] = None,
+               **kwargs) -> Iterator[bytes]:
+        """
+        Synchronously stream headerless audio in configured encoding, chunks are yielded as they arrive
+        :param text: Text for generation
+        :param voice: Voice model
+        :param chunk_size: Chunk size in bytes. Default: None (As received from network)
+        :param deadline: Time budget in second or Deadline of whole stream, checked before each chunk and
+        bounding timeout of each network operation. Default: None
+        :return: Iterator of audio bytes
+        """
+        assert text, "Text cant be empty"
+        deadline = Deadline.coerce(deadline)
+        transcoder = self._transcoder()
+        response = self.__client.speak.rest.v("1").stream_raw(source = {"text": text},
+                                                              options = self._get_options(voice = voice,
+                                                                                          streaming = True),
+                                                              timeout = self._request_timeout(deadline),
+                                                              **self.__transport)
+        try:
+            # Check status
+            if response.status_code != 200:
+                response.read()
+                raise Exception(f"DeepGram speak failed ({response.status_code}): {response.text}")
+            chunks = deadline.iterate(response.iter_bytes(chunk_size = chunk_size))
+            if transcoder is None:
+                yield from chunks
+            else:
+                yield from transcoder.transcode_stream(chunks)
+        finally:
+            response.close()
+
+    async def astream(self,
+                      text :str,
+                      voice :Union[VoiceSetting,str] = VoiceSetting.ASTERIA_FEMALE,
+                      chunk_size :Optional[int] = None,
+                      deadline :Union[None, float, Deadline] = None,
+                      **kwargs) -> AsyncIterator[bytes]:
+        """
+        Asynchronously stream headerless audio in configured encoding, chunks are yielded as they arrive
+        :param text: Text for generation
+        :param voice: Voice model
+        :param chunk_size: Chunk size in bytes. Default: None (As received from network)
+        :param deadline: Time budget in second or Deadline of whole stream. Waiting for response or next chunk
+        is cancelled (connection closed) at expiry and DeadlineExceeded is raised. Default: None
+        :return: Async iterator of audio bytes
+        """
+        assert text, "Text cant be empty"
+        transcoder = self._transcoder()
+        request = self.__client.speak.asyncrest.v("1").stream_raw(source = {"text": text},
+                                                                  options = self._get_options(voice = voice,
+                                                                                              streaming = True),
+                                                                  **self.__async_transport)
+        if deadline is not None:
+            deadline = Deadline.coerce(deadline)
+            request = deadline.run(request)
+        response = await request
+        try:
+            # Check status
+            if response.status_code != 200:
+                await response.aread()
+                raise Exception(f"DeepGram speak failed ({response.status_code}): {response.text}")
+            chunks = response.aiter_bytes(chunk_size = chunk_size)
+            if deadline is not None:
+                chunks = deadline.aiterate(chunks)
+            if transcoder is not None:
+                chunks = transcoder.atranscode_stream(chunks)
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await response.aclose()
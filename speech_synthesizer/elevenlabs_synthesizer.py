@@ -1,17 +1,30 @@
-from ..utils.types import BaseSynthesizer
-from typing import Optional, List, Literal
-from elevenlabs.client import ElevenLabs, AsyncElevenLabs, DEFAULT_VOICE
-from elevenlabs import save
+from ..utils.types import BaseSynthesizer, Word
+from typing import Optional, List, Literal, Dict, Union
+from elevenlabs.client import ElevenLabs, AsyncElevenLabs, DEFAULT_VOICE, is_voice_id
+from elevenlabs.core import ApiError, RequestOptions
 from elevenlabs.types import Voice, VoiceSettings
-from ..config import ELEVEN_API_KEY
-import httpx
+from ..utils.admission import AudioAdmissionController
+from ..utils.deadline import Deadline
+from ..utils.transport import SharedTransport
+from ..utils.audio import OutputFormat
+from ..config import ELEVEN_API_KEY, AUDIO_MEMORY_BUDGET, AUDIO_ADMISSION_MODE
+from contextlib import nullcontext
+import httpx, base64
+
+# Reserved bytes of generated audio per text character (about 2 KB, mp3 at 128 kbps)
+BYTES_PER_CHARACTER = 2048
 
 class ElevenLabsSynthesizer(BaseSynthesizer):
     def __init__(self,
                  model :Literal["eleven_multilingual_v2","eleven_monolingual_v1"] = "eleven_monolingual_v1",
                  api_key :str = ELEVEN_API_KEY,
                  use_async :bool = False,
-                 timeout : Optional[float] = 60):
+                 timeout : Optional[float] = 60,
+                 use_admission :bool = True,
+                 admission :Optional[AudioAdmissionController] = None,
+                 output_format :Optional[OutputFormat] = None,
+                 base_url :Optional[str] = None,
+                 transport :Optional[SharedTransport] = None):
         """
         Initialize ElevenLabs Synthesizer service
         :param model: Currently supported 2 model: eleven_multilingual_v2 and eleven_monolingual_v1.
@@ -20,31 +33,65 @@ class ElevenLabsSynthesizer(BaseSynthesizer):
         :param api_key: Eleven Labs API Key (Required)
         :param use_async: Enable async mode (Default :False)
         :param timeout: Timeout in float type
+        :param use_admission: Account audio held by async generation in memory budget (Default: True)
+        :param admission: Admission controller (Default: None, process-wide controller, see AUDIO_MEMORY_BUDGET_MB)
+        :param output_format: Convert mp3 output in process, e.g. OutputFormat.telephony() (Default: None)
+        :param base_url: Override API url, e.g. local stand-in server (Default: None, ElevenLabs API)
+        :param transport: Shared connection pool, e.g. SharedTransport.default() (Default: None, own pool of each client)
         """
-        super().__init__()
+        super().__init__(output_format = output_format)
+        # Define admission controller
+        self.__admission = None
+        if use_admission:
+            self.__admission = admission or AudioAdmissionController.default(max_bytes = AUDIO_MEMORY_BUDGET,
+                                                                             mode = AUDIO_ADMISSION_MODE)
         # Define ElevenLab client
         self.__client = ElevenLabs(api_key = api_key,
-                                   timeout = timeout)
+                                   base_url = base_url,
+                                   timeout = timeout,
+                                   httpx_client = transport.client(timeout = timeout) if transport is not None else None)
         # Default no async client
         self.__async_client = None
         # Async ElevenLab
         if use_async: self.__async_client = AsyncElevenLabs(api_key = api_key,
+                                                            base_url = base_url,
                                                             timeout = timeout,
-                                                            httpx_client = httpx.AsyncClient())
+                                                            httpx_client = transport.async_client(timeout = timeout)
+                                                            if transport is not None else httpx.AsyncClient())
         # Define model
         self.__model_name = model
+        self.__timeout = timeout
+        # Voice ids by name
+        self.__voice_ids :Dict[str, str] = {}
+
+    @property
+    def supports_async(self) -> bool:
+        """Return True when async client is enabled (use_async = True)"""
+        return self.__async_client is not None
+
+    @property
+    def admission(self) -> Optional[AudioAdmissionController]:
+        """Return admission controller (None when disabled)"""
+        return self.__admission
 
     @property
     def supported_voice(self) -> List[Voice]:
         """Return list of supported voice"""
         return self.__client.voices.get_all().voices
 
+    def _request_options(self, deadline :Deadline) -> Optional[RequestOptions]:
+        """Return request options with timeout bounded by remaining time (None when deadline has no expiry)"""
+        if deadline.remaining is None:
+            return None
+        return RequestOptions(timeout_in_seconds = deadline.timeout(self.__timeout))
+
     def generate(self,
                  text :str,
                  generated_path :str,
                  voice :str | Voice = DEFAULT_VOICE,
                  voice_settings: VoiceSettings | None = DEFAULT_VOICE.settings,
                  stream: bool = False,
+                 deadline :Union[None, float, Deadline] = None,
                  **kwargs) -> None:
         """
         Synchronously generate synthesis audio
@@ -53,20 +100,24 @@ class ElevenLabsSynthesizer(BaseSynthesizer):
         :param voice: Selected voice for generation ( Default: DEFAULT_VOICE)
         :param voice_settings: Selected voice for generation ( Default: DEFAULT_VOICE.settings)
         :param stream: Enable stream mode or not
+        :param deadline: Time budget in second or Deadline, bounds request timeout and is checked before each
+        audio chunk ( Default: None)
         :param kwargs:
         :return: None
         """
         # Check generation condition
         self._check_generation_condition(text = text,
                                          file_path = generated_path)
+        deadline = Deadline.coerce(deadline)
 
         # Generate audio
         audio = self.__client.generate(text = text,
                                        voice = voice,
                                        voice_settings = voice_settings,
-                                       stream = stream)
+                                       stream = stream,
+                                       request_options = self._request_options(deadline))
         # Save audio
-        save(audio = audio, filename = generated_path)
+        self._write_output(generated_path, b"".join(deadline.iterate(audio)))
 
     async def agenerate(self,
                         text :str,
@@ -74,6 +125,7 @@ class ElevenLabsSynthesizer(BaseSynthesizer):
                         voice :str | Voice = DEFAULT_VOICE,
                         voice_settings: VoiceSettings | None = DEFAULT_VOICE.settings,
                         stream: bool = False,
+                        deadline :Union[None, float, Deadline] = None,
                         **kwargs) -> None:
         """
         Asynchronously generate synthesis audio
@@ -82,6 +134,8 @@ class ElevenLabsSynthesizer(BaseSynthesizer):
         :param voice: Selected voice for generation ( Default: DEFAULT_VOICE)
         :param voice_settings: Selected voice for generation ( Default: DEFAULT_VOICE.settings)
         :param stream: Enable stream mode or not
+        :param deadline: Time budget in second or Deadline, shared by admission and request. Request is cancelled
+        (connection closed) at expiry and DeadlineExceeded is raised ( Default: None)
         :param kwargs:
         :return: None
         """
@@ -91,14 +145,140 @@ class ElevenLabsSynthesizer(BaseSynthesizer):
 
         # When async doesnt turn on
         assert self.__async_client, "Please enable use_async"
+        # Reserve memory of generated audio, estimated from text length
+        nbytes = len(text) * BYTES_PER_CHARACTER
+        reservation = self.__admission.areserve(nbytes) if self.__admission is not None else nullcontext()
+
+        async def synthesize() -> None:
+            async with reservation:
+                # Generate audio
+                audio = await self.__async_client.generate(text = text,
+                                                           voice = voice,
+                                                           voice_settings = voice_settings,
+                                                           stream = stream)
+                # Add bytes
+                chunks = []
+                async for value in audio:
+                    chunks.append(value)
+                # Save audio
+                self._write_output(generated_path, b"".join(chunks))
+
+        await Deadline.coerce(deadline).run(synthesize())
+
+    def _find_voice_id(self, voice :str | Voice, voices :Optional[List[Voice]] = None) -> Optional[str]:
+        """Return voice id of voice (id, name or Voice), None when name must be looked up in voices"""
+        if isinstance(voice, Voice):
+            return voice.voice_id
+        if is_voice_id(voice):
+            return voice
+        if voice not in self.__voice_ids and voices is not None:
+            self.__voice_ids.update({item.name: item.voice_id for item in voices})
+        return self.__voice_ids.get(voice)
+
+    @staticmethod
+    def _alignment_to_words(alignment :Optional[dict]) -> List[Word]:
+        """Group character alignment of ElevenLabs into words (in second)"""
+        words = []
+        if not alignment:
+            return words
+        text = ""
+        for (character, start, end) in zip(alignment["characters"],
+                                           alignment["character_start_times_seconds"],
+                                           alignment["character_end_times_seconds"]):
+            # End of word
+            if character.isspace():
+                if text:
+                    words.append(Word(text = text, start = word_start, end = word_end, confidence = 1.0))
+                text = ""
+                continue
+            if not text:
+                word_start = start
+            text += character
+            word_end = end
+        if text:
+            words.append(Word(text = text, start = word_start, end = word_end, confidence = 1.0))
+        return words
+
+    def generate_with_timestamps(self,
+                                 text :str,
+                                 generated_path :str,
+                                 voice :str | Voice = DEFAULT_VOICE,
+                                 voice_settings: VoiceSettings | None = DEFAULT_VOICE.settings,
+                                 deadline :Union[None, float, Deadline] = None,
+                                 **kwargs) -> List[Word]:
+        """
+        Synchronously generate synthesis audio (mp3) with word timings from provider alignment
+        :param text: Text for generation
+        :param generated_path: Local file path of generated audio
+        :param voice: Selected voice for generation ( Default: DEFAULT_VOICE)
+        :param voice_settings: Selected voice for generation ( Default: DEFAULT_VOICE.settings)
+        :param deadline: Time budget in second or Deadline, bounds timeout of voice lookup and request
+        ( Default: None)
+        :param kwargs:
+        :return: List of Word (in second)
+        """
+        # Check generation condition
+        self._check_generation_condition(text = text,
+                                         file_path = generated_path)
+        deadline = Deadline.coerce(deadline)
+
+        # Define voice id
+        voice_id = self._find_voice_id(voice)
+        if voice_id is None:
+            voices = self.__client.voices.get_all(show_legacy = True, request_options = self._request_options(deadline))
+            voice_id = self._find_voice_id(voice, voices = voices.voices)
+        if voice_id is None:
+            raise ApiError(body = f"Voice {voice} not found.")
+
+        # Generate audio
+        response = self.__client.text_to_speech.convert_with_timestamps(voice_id = voice_id,
+                                                                        text = text,
+                                                                        model_id = self.__model_name,
+                                                                        voice_settings = voice_settings,
+                                                                        request_options = self._request_options(deadline))
+        # Save audio
+        self._write_output(generated_path, base64.b64decode(response["audio_base64"]))
+        return self._alignment_to_words(response.get("alignment"))
+
+    async def agenerate_with_timestamps(self,
+                                        text :str,
+                                        generated_path :str,
+                                        voice :str | Voice = DEFAULT_VOICE,
+                                        voice_settings: VoiceSettings | None = DEFAULT_VOICE.settings,
+                                        deadline :Union[None, float, Deadline] = None,
+                                        **kwargs) -> List[Word]:
+        """
+        Asynchronously generate synthesis audio (mp3) with word timings from provider alignment
+        :param text: Text for generation
+        :param generated_path: Local file path of generated audio
+        :param voice: Selected voice for generation ( Default: DEFAULT_VOICE)
+        :param voice_settings: Selected voice for generation ( Default: DEFAULT_VOICE.settings)
+        :param deadline: Time budget in second or Deadline, shared by voice lookup and request. Request is cancelled
+        (connection closed) at expiry and DeadlineExceeded is raised ( Default: None)
+        :param kwargs:
+        :return: List of Word (in second)
+        """
+        # Check generation condition
+        self._check_generation_condition(text = text,
+                                         file_path = generated_path)
+        deadline = Deadline.coerce(deadline)
+
+        # When async doesnt turn on
+        assert self.__async_client, "Please enable use_async"
+        # Define voice id
+        voice_id = self._find_voice_id(voice)
+        if voice_id is None:
+            voices = await deadline.run(self.__async_client.voices.get_all(show_legacy = True))
+            voice_id = self._find_voice_id(voice, voices = voices.voices)
+        if voice_id is None:
+            raise ApiError(body = f"Voice {voice} not found.")
+
         # Generate audio
-        audio = await self.__async_client.generate(text = text,
-                                                   voice = voice,
-                                                   voice_settings = voice_settings,
-                                                   stream = stream)
-        # Add bytes
-        out = b''
-        async for value in audio:
-            out += value
+        response = await deadline.run(
+            self.__async_client.text_to_speech.convert_with_timestamps(voice_id = voice_id,
+                                                                       text = text,
+                                                                       model_id = self.__model_name,
+                                                                       voice_settings = voice_settings))
         # Save audio
-        save(audio = out, filename = generated_path)
+        self._write_output(generated_path, base64.b64decode(response["audio_base64"]))
+        return self._alignment_to_words(response.get("alignment"))
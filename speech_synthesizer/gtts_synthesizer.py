@@ -1,14 +1,19 @@
 from ..utils.types import BaseSynthesizer
-from typing import Tuple, List, Dict
+from ..utils.audio import OutputFormat
+from ..utils.deadline import Deadline
+from typing import Tuple, List, Dict, Optional, Union
 from gtts import gTTS
 from gtts.lang import tts_langs
+import os
 
 class GoogleTTSSynthesizer(BaseSynthesizer):
-    def __init__(self):
+    def __init__(self,
+                 output_format :Optional[OutputFormat] = None):
         """
         Initialize GTTS Synthesizer service.
+        :param output_format: Convert mp3 output in process (e.g. OutputFormat.telephony()). Default: None
         """
-        super().__init__()
+        super().__init__(output_format = output_format)
 
     @property
     def language_supported(self) -> Tuple[List[str],Dict[str,str]]:
@@ -22,12 +27,15 @@ class GoogleTTSSynthesizer(BaseSynthesizer):
                  text :str,
                  generated_path :str,
                  lang :str = "en",
+                 deadline :Union[None, float, Deadline] = None,
                  **kwargs):
         """
         Synchronously generate synthesis audio
         :param text: Text for generation
         :param generated_path: Local file path of generated audio
         :param lang: Language destination (Check language supported function first).
+        :param deadline: Time budget in second or Deadline. Long text is requested part by part, each request
+        is bounded by remaining time and DeadlineExceeded is raised between parts (partial file removed).
         :param kwargs:
         :return:
         """
@@ -39,4 +47,20 @@ class GoogleTTSSynthesizer(BaseSynthesizer):
         tts = gTTS(text = text,
                    lang = lang)
         # Save file
-        tts.save(generated_path)
\ No newline at end of file
+        if deadline is None:
+            tts.save(generated_path)
+        else:
+            deadline = Deadline.coerce(deadline)
+            tts.timeout = deadline.timeout()
+            try:
+                with open(generated_path, "wb") as file:
+                    for part in tts.stream():
+                        file.write(part)
+                        # Bound request of next part
+                        tts.timeout = deadline.timeout()
+            except Exception:
+                # Remove partial file, request timed out at expiry is reported as DeadlineExceeded
+                os.remove(generated_path)
+                deadline.check(step = "part")
+                raise
+        self._finalize_output(generated_path)
\ No newline at end of file
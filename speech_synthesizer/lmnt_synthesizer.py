@@ -1,19 +1,41 @@
-from ..utils.types import BaseSynthesizer
-from typing import List, Literal, Optional,Dict
+from ..utils.types import BaseSynthesizer, Word
+from ..utils.audio import OutputFormat
+from ..utils.deadline import Deadline
+from ..utils.transport import SharedTransport
+from typing import List, Literal, Optional,Dict, Union, AsyncIterator
 from ..config import LMNT_KEY
 from lmnt.api import Speech
-import os
+import asyncio, os
 
 class LmntSynthesizer(BaseSynthesizer):
     def __init__(self,
-                 api_key: str = LMNT_KEY):
+                 api_key: str = LMNT_KEY,
+                 base_url :Optional[str] = None,
+                 output_format :Optional[OutputFormat] = None,
+                 transport :Optional[SharedTransport] = None):
         """
         Initialize LMNT Synthesizer service.
         :param api_key: LMNT Key
+        :param base_url: Override API url (e.g. local stand-in server). Default: None (LMNT API)
+        :param output_format: Convert output in process, files and raw/ulaw streams
+        (e.g. OutputFormat.telephony()). Default: None (LMNT format)
+        :param transport: Shared connection pool, keeps connections open between sessions. Default: None
+        (new connections per session)
         """
-        super().__init__()
+        super().__init__(output_format = output_format)
         # Define key
         self.__api_key = api_key
+        self.__base_url = base_url
+        self.__transport = transport
+
+    def _speech(self) -> Speech:
+        """Return new LMNT speech session (inside running event loop)"""
+        options = {}
+        if self.__base_url is not None:
+            options["base_url"] = self.__base_url
+        if self.__transport is not None:
+            options["connector"] = self.__transport.aiohttp_connector()
+        return Speech(self.__api_key, **options)
 
     async def list_voices(self,
                           owner :Literal["system","me","all"] = "all") -> List[dict]:
@@ -22,7 +44,7 @@ class LmntSynthesizer(BaseSynthesizer):
         :param owner: Specify which voices to return. Choose from system, me, or all
         :return:
         """
-        async with Speech(self.__api_key) as speech:
+        async with self._speech() as speech:
             return await speech.list_voices(owner = owner)
 
     async def voice_info(self,
@@ -32,7 +54,7 @@ class LmntSynthesizer(BaseSynthesizer):
         :param voice_id: The id of the voice to update. If you don’t know the id, you can get it from list_voices()
         :return:
         """
-        async with Speech(self.__api_key) as speech:
+        async with self._speech() as speech:
             return await speech.voice_info(voice_id = voice_id)
 
     async def create_voice(self,
@@ -65,7 +87,7 @@ class LmntSynthesizer(BaseSynthesizer):
             raise Exception("Some path not existed!")
 
         # Create voice with params
-        async with Speech(self.__api_key) as speech:
+        async with self._speech() as speech:
             voice = await speech.create_voice(name = name,
                                               enhance = enhance,
                                               filenames = reference_voice,
@@ -100,7 +122,7 @@ class LmntSynthesizer(BaseSynthesizer):
             raise Exception(f"Voice: {voice_id} not existed! Please create_voice first")
 
         # Update voice with params
-        async with Speech(self.__api_key) as speech:
+        async with self._speech() as speech:
             voice = await speech.update_voice(voice_id = voice_id,
                                               name = name,
                                               starred = starred,
@@ -115,6 +137,7 @@ class LmntSynthesizer(BaseSynthesizer):
                         language :Literal["de","en","es","fr","pt","zh"] = "en",
                         sample_rate :Literal[8000,16000,24000] = 24000,
                         speed :float = 1.0,
+                        deadline :Union[None, float, Deadline] = None,
                         **kwargs) -> None:
         """
         Asynchronously generate synthesis audio
@@ -127,9 +150,66 @@ class LmntSynthesizer(BaseSynthesizer):
         :param sample_rate: The desired output sample rate in Hz, one of: 8000, 16000, 24000.
         Defaults to 24000 for all formats except mulaw which defaults to 8000.
         :param speed: Floating point value between 0.25 (slow) and 2.0 (fast).
+        :param deadline: Time budget in second or Deadline, shared by voice check and synthesis. Session is closed
+        at expiry and DeadlineExceeded is raised.
         :param kwargs:
         :return:
         """
+        await Deadline.coerce(deadline).run(self._asynthesize(text = text,
+                                                              generated_path = generated_path,
+                                                              voice = voice,
+                                                              format = format,
+                                                              language = language,
+                                                              sample_rate = sample_rate,
+                                                              speed = speed))
+
+    async def agenerate_with_timestamps(self,
+                                        text :str,
+                                        generated_path :str,
+                                        voice :str = "ava",
+                                        format :Literal["acc","mp3","wav"] = "mp3",
+                                        language :Literal["de","en","es","fr","pt","zh"] = "en",
+                                        sample_rate :Literal[8000,16000,24000] = 24000,
+                                        speed :float = 1.0,
+                                        deadline :Union[None, float, Deadline] = None,
+                                        **kwargs) -> List[Word]:
+        """
+        Asynchronously generate synthesis audio with word timings returned by LMNT
+        :param text: Text for generation
+        :param generated_path: Local file path of generated audio
+        :param voice: Which voice to render, id is found using the list_voices call
+        :param format: aac, mp3, wav. Defaults to mp3 (24kHz 16-bit mono).
+        :param language: The desired language of the synthesized speech. Two letter ISO 639-1 code.
+        :param sample_rate: The desired output sample rate in Hz, one of: 8000, 16000, 24000.
+        :param speed: Floating point value between 0.25 (slow) and 2.0 (fast).
+        :param deadline: Time budget in second or Deadline, see agenerate.
+        :param kwargs:
+        :return: List of Word (in second)
+        """
+        synthesis = await Deadline.coerce(deadline).run(self._asynthesize(text = text,
+                                                                          generated_path = generated_path,
+                                                                          voice = voice,
+                                                                          format = format,
+                                                                          language = language,
+                                                                          sample_rate = sample_rate,
+                                                                          speed = speed,
+                                                                          return_durations = True))
+        return [Word(text = item["text"],
+                     start = item["start"],
+                     end = item["start"] + item["duration"],
+                     confidence = 1.0)
+                for item in synthesis.get("durations", []) if item["text"].strip()]
+
+    async def _asynthesize(self,
+                           text :str,
+                           generated_path :str,
+                           voice :str,
+                           format :str,
+                           language :str,
+                           sample_rate :int,
+                           speed :float,
+                           return_durations :bool = False) -> dict:
+        """Synthesize audio, save it and return LMNT synthesis result"""
         # Check generation condition
         self._check_generation_condition(text = text,
                                          file_path = generated_path)
@@ -145,16 +225,98 @@ class LmntSynthesizer(BaseSynthesizer):
             raise ValueError("Speed value must be in range from 0.25 to 2.0")
 
         # Synthesize audio
-        async with Speech(self.__api_key) as speech:
+        async with self._speech() as speech:
             synthesis = await speech.synthesize(text = text,
                                                 voice = voice,
                                                 format = format,
                                                 language = language,
                                                 sample_rate = sample_rate,
-                                                speed = speed)
+                                                speed = speed,
+                                                return_durations = return_durations)
         # Save audio file
-        with open(generated_path, 'wb') as f:
-            f.write(synthesis['audio'])
+        self._write_output(generated_path, synthesis['audio'])
+        return synthesis
+
+    async def astream(self,
+                      text :Union[str, AsyncIterator[str]],
+                      voice :str = "ava",
+                      format :Literal["raw","ulaw","mp3"] = "raw",
+                      language :Literal["de","en","es","fr","pt","zh"] = "en",
+                      sample_rate :Literal[8000,16000,24000] = 24000,
+                      speed :float = 1.0,
+                      deadline :Union[None, float, Deadline] = None,
+                      **kwargs) -> AsyncIterator[bytes]:
+        """
+        Asynchronously stream synthesis audio over LMNT websocket. Text is sent while it arrives
+        (e.g. LLM tokens) and audio chunks are yielded while they are synthesized.
+        :param text: Text or async iterator of text fragments
+        :param voice: Which voice to render, id is found using the list_voices call
+        :param format: raw (16-bit PCM mono), ulaw or mp3. Defaults to raw.
+        :param language: The desired language of the synthesized speech. Two letter ISO 639-1 code.
+        One of de, en, es, fr, pt, zh.
+        :param sample_rate: The desired output sample rate in Hz, one of: 8000, 16000, 24000.
+        :param speed: Floating point value between 0.25 (slow) and 2.0 (fast).
+        :param deadline: Time budget in second or Deadline of whole stream. Waiting for connection or next chunk
+        is cancelled (websocket closed) at expiry and DeadlineExceeded is raised.
+        :param kwargs:
+        :return: Async iterator of audio bytes
+        """
+        # Validate speed infor
+        if speed < 0.25 or speed > 2.0:
+            raise ValueError("Speed value must be in range from 0.25 to 2.0")
+        # Define transcoder of output format
+        transcoder = None
+        if self._output_format is not None:
+            if format not in ("raw", "ulaw"):
+                raise ValueError("Output format conversion of stream requires raw or ulaw format")
+            transcoder = self._stream_transcoder(input_encoding = "linear16" if format == "raw" else "mulaw",
+                                                 input_sample_rate = sample_rate)
+
+        async def send(connection) -> None:
+            """Send text fragments then end of input"""
+            try:
+                if isinstance(text, str):
+                    await connection.append_text(text)
+                else:
+                    async for fragment in text:
+                        if fragment:
+                            await connection.append_text(fragment)
+                await connection.finish()
+            except BaseException:
+                # Unblock receiver
+                await connection.socket.close()
+                raise
+
+        deadline = Deadline.coerce(deadline) if deadline is not None else None
+        async with self._speech() as speech:
+            connection = speech.synthesize_streaming(voice = voice,
+                                                     format = format,
+                                                     language = language,
+                                                     sample_rate = sample_rate,
+                                                     speed = speed)
+            connection = await (deadline.run(connection) if deadline is not None else connection)
+            sender = asyncio.create_task(send(connection))
+            try:
+                async for message in (deadline.aiterate(connection) if deadline is not None else connection):
+                    # Connection closed by server
+                    if message is None:
+                        break
+                    if transcoder is None:
+                        yield message["audio"]
+                        continue
+                    audio = transcoder.feed(message["audio"])
+                    if audio:
+                        yield audio
+                # Raise error of text iterator
+                await sender
+                if transcoder is not None:
+                    audio = transcoder.flush()
+                    if audio:
+                        yield audio
+            finally:
+                if not sender.done():
+                    sender.cancel()
+                await connection.socket.close()
 
     async def aclone(self,
                      text: str,
@@ -164,6 +326,7 @@ class LmntSynthesizer(BaseSynthesizer):
                      language: Literal["de", "en", "es", "fr", "pt", "zh"] = "en",
                      sample_rate: Literal[8000, 16000, 24000] = 24000,
                      speed: float = 1.0,
+                     deadline :Union[None, float, Deadline] = None,
                      **kwargs) -> None:
         """
         Asynchronously clone voice from specified id
@@ -176,14 +339,16 @@ class LmntSynthesizer(BaseSynthesizer):
         :param sample_rate: The desired output sample rate in Hz, one of: 8000, 16000, 24000.
         Defaults to 24000 for all formats except mulaw which defaults to 8000.
         :param speed: Describe how fast of speech is. Floating point value between 0.25 (slow) and 2.0 (fast).
+        :param deadline: Time budget in second or Deadline, shared by voice lookup and generation.
         :param kwargs:
         :return: None
         """
         # Check empty
         assert voice_id, "Voice cant be empty"
+        deadline = Deadline.coerce(deadline)
 
         # Get all supported voice
-        user_voices = await self.list_voices(owner = "me")
+        user_voices = await deadline.run(self.list_voices(owner = "me"))
         # Voice ids
         voice_ids = [voice["id"] for voice in user_voices]
         # Check id
@@ -199,4 +364,5 @@ class LmntSynthesizer(BaseSynthesizer):
                              format = format,
                              language = language,
                              sample_rate = sample_rate,
-                             speed = speed)
\ No newline at end of file
+                             speed = speed,
+                             deadline = deadline)
\ No newline at end of file
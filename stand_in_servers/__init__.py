@@ -0,0 +1,6 @@
+from .base_server import BaseStandInServer, FaultProfile, synthetic_speech, synthetic_words
+from .lmnt_server import LmntStandInServer
+from .deepgram_server import DeepgramStandInServer
+from .groq_server import GroqStandInServer
+from .assemblyai_server import AssemblyStandInServer
+from .elevenlabs_server import ElevenLabsStandInServer
\ No newline at end of file
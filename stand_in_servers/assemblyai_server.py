@@ -0,0 +1,90 @@
+from .base_server import BaseStandInServer, FaultProfile, synthetic_words
+from aiohttp import web
+from typing import Dict, List, Optional
+import time, uuid
+
+class AssemblyStandInServer(BaseStandInServer):
+    def __init__(self,
+                 api_key :Optional[str] = None,
+                 host :str = "127.0.0.1",
+                 port :int = 0,
+                 transcript :str = "this is a stand-in transcription",
+                 processing_time :float = 0.5,
+                 words_per_second :float = 3.0,
+                 faults :Optional[FaultProfile] = None):
+        """
+        Local stand-in of AssemblyAI API (upload, submit and poll transcripts) returning a fixed transcript.
+        Jobs stay queued/processing for processing_time, then complete. Uploaded audio is counted, not kept.
+        Use AssemblyRecognizer(base_url = server.base_url).
+        :param api_key: Accepted API key. Default: None (any key)
+        :param host: Host to bind. Default: 127.0.0.1
+        :param port: Port to bind. Default: 0 (random free port)
+        :param transcript: Transcript of every audio. Default: "this is a stand-in transcription"
+        :param processing_time: Time from submission to completion of a job in second. Default: 0.5
+        :param words_per_second: Speaking rate of word timings. Default: 3.0
+        :param faults: Injected latency and errors. Default: None (no fault)
+        """
+        super().__init__(host = host, port = port, faults = faults)
+        # Define params
+        self.__api_key = api_key
+        self.__transcript = transcript
+        self.__processing_time = processing_time
+        self.__words_per_second = words_per_second
+        # Submitted jobs {id: (audio url, submission time)}
+        self.__jobs :Dict[str, tuple] = {}
+
+    def _routes(self) -> List[web.RouteDef]:
+        """Return routes of AssemblyAI API"""
+        return [web.post("/v2/upload", self._upload),
+                web.post("/v2/transcript", self._submit),
+                web.get("/v2/transcript/{id}", self._transcript)]
+
+    def _is_authorized(self, request :web.Request) -> bool:
+        """Check API key of authorization header"""
+        return self.__api_key is None or request.headers.get("authorization") == self.__api_key
+
+    async def _upload(self, request :web.Request) -> web.Response:
+        if not self._is_authorized(request):
+            return self._error_response(401, "Authentication error, API token missing/invalid")
+        size = 0
+        async for chunk in request.content.iter_any():
+            size += len(chunk)
+        if size == 0:
+            return self._error_response(400, "Upload is empty")
+        return web.json_response({"upload_url": f"https://cdn.stand-in.local/upload/{uuid.uuid4()}"})
+
+    async def _submit(self, request :web.Request) -> web.Response:
+        if not self._is_authorized(request):
+            return self._error_response(401, "Authentication error, API token missing/invalid")
+        body = await request.json()
+        if not body.get("audio_url"):
+            return self._error_response(400, "audio_url is required")
+        transcript_id = str(uuid.uuid4())
+        self.__jobs[transcript_id] = (body["audio_url"], time.monotonic())
+        return web.json_response({"id": transcript_id, "status": "queued", "audio_url": body["audio_url"]})
+
+    async def _transcript(self, request :web.Request) -> web.Response:
+        if not self._is_authorized(request):
+            return self._error_response(401, "Authentication error, API token missing/invalid")
+        transcript_id = request.match_info["id"]
+        if transcript_id not in self.__jobs:
+            return self._error_response(404, "Transcript ID not found")
+
+        (audio_url, submitted) = self.__jobs[transcript_id]
+        elapsed = time.monotonic() - submitted
+        if elapsed < self.__processing_time:
+            status = "queued" if elapsed < self.__processing_time / 2 else "processing"
+            return web.json_response({"id": transcript_id, "status": status, "audio_url": audio_url})
+
+        # Completed jobs are kept, they can be fetched again
+        words = synthetic_words(self.__transcript, words_per_second = self.__words_per_second)
+        return web.json_response({"id": transcript_id,
+                                  "status": "completed",
+                                  "audio_url": audio_url,
+                                  "text": self.__transcript,
+                                  "confidence": 0.98,
+                                  "audio_duration": words[-1]["end"] if len(words) > 0 else 0.0,
+                                  "words": [{"text": word["text"],
+                                             "start": int(word["start"] * 1000),
+                                             "end": int(word["end"] * 1000),
+                                             "confidence": 0.98} for word in words]})
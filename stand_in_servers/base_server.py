@@ -0,0 +1,248 @@
+from ..utils.audio import AudioBuffer
+from ..utils.metrics import LatencyTracker, MetricCounter
+from pydantic import BaseModel
+from aiohttp import web
+from typing import Any, Dict, List, Literal, Optional, Tuple
+import numpy as np
+import regex as re
+import asyncio, random, time
+
+# Prefix of control routes (stats, faults), never delayed nor failed
+CONTROL_PREFIX = "/__stand_in__"
+
+class FaultProfile(BaseModel):
+    """
+    Injected behaviour of a stand-in server, applied to every API request before it is handled
+    :param latency: Mean added latency in second. Default: 0.0
+    :param jitter: Spread of latency in second (uniform: half range, normal: deviation, lognormal: deviation of
+    underlying normal in second). Ignored by fixed and exponential. Default: 0.0
+    :param distribution: Latency distribution. Default: fixed
+    :param error_rate: Share of requests failed with error_status, from 0 to 1. Default: 0.0
+    :param error_status: Status of injected errors. Default: 500
+    :param rate_limit_rate: Share of requests rejected with 429, from 0 to 1. Default: 0.0
+    :param retry_after: Retry-After header of 429 in second. Default: 1.0 (None to omit)
+    :param seed: Seed of random draws. Default: None
+    """
+    latency :float = 0.0
+    jitter :float = 0.0
+    distribution :Literal["fixed","uniform","normal","exponential","lognormal"] = "fixed"
+    error_rate :float = 0.0
+    error_status :int = 500
+    rate_limit_rate :float = 0.0
+    retry_after :Optional[float] = 1.0
+    seed :Optional[int] = None
+
+    def sample_latency(self, generator :random.Random) -> float:
+        """Draw latency in second"""
+        if self.latency <= 0 and self.jitter <= 0:
+            return 0.0
+        match self.distribution:
+            case "uniform":
+                value = generator.uniform(self.latency - self.jitter, self.latency + self.jitter)
+            case "normal":
+                value = generator.gauss(self.latency, self.jitter)
+            case "exponential":
+                value = generator.expovariate(1 / self.latency) if self.latency > 0 else 0.0
+            case "lognormal":
+                # Parameters of underlying normal giving requested mean and deviation
+                if self.latency <= 0:
+                    return 0.0
+                sigma = float(np.sqrt(np.log(1 + (self.jitter / self.latency) ** 2)))
+                value = generator.lognormvariate(float(np.log(self.latency)) - sigma ** 2 / 2, sigma)
+            case _:
+                value = self.latency
+        return max(value, 0.0)
+
+class BaseStandInServer():
+    def __init__(self,
+                 host :str = "127.0.0.1",
+                 port :int = 0,
+                 faults :Optional[FaultProfile] = None):
+        """
+        Local aiohttp server standing in for a provider API, so clients can run offline.
+        Latency, errors and 429 are injected by fault profile. Control routes under /__stand_in__:
+        GET stats, POST reset (clears stats) and POST faults (replaces fault profile with JSON body).
+        :param host: Host to bind. Default: 127.0.0.1
+        :param port: Port to bind. Default: 0 (random free port)
+        :param faults: Injected latency and errors. Default: None (no fault)
+        """
+        # Define params
+        self.__host = host
+        self.__port = port
+        self.__faults = faults or FaultProfile()
+        self.__random = random.Random(self.__faults.seed)
+        # Define state
+        self.__runner :Optional[web.AppRunner] = None
+        self.__bound_port :Optional[int] = None
+        # Define stats
+        self.__counter = MetricCounter(name = type(self).__name__)
+        self.__service_time = LatencyTracker(window = 100000)
+        self.__total_service_time = 0.0
+
+    @property
+    def base_url(self) -> str:
+        """Return base URL of running server"""
+        assert self.__runner is not None, "Server is not running"
+        return f"http://{self.__host}:{self.__bound_port}"
+
+    @property
+    def is_running(self) -> bool:
+        """Return True when server is serving"""
+        return self.__runner is not None
+
+    @property
+    def faults(self) -> FaultProfile:
+        """Return fault profile"""
+        return self.__faults
+
+    @faults.setter
+    def faults(self, faults :FaultProfile) -> None:
+        """Replace fault profile, applied to next requests"""
+        self.__faults = faults
+        self.__random = random.Random(faults.seed)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return served requests: counts by outcome (ok, error, rate_limited, injected_error) and
+        server-side time in second (injected latency included), total and percentiles
+        """
+        return {**self.__counter.snapshot(),
+                "service_time_total": self.__total_service_time,
+                "service_time_p50": self.__service_time.percentile(50),
+                "service_time_p95": self.__service_time.percentile(95),
+                "service_time_p99": self.__service_time.percentile(99)}
+
+    def reset_stats(self) -> None:
+        """Clear stats"""
+        self.__counter.reset()
+        self.__service_time = LatencyTracker(window = 100000)
+        self.__total_service_time = 0.0
+
+    def _routes(self) -> List[web.RouteDef]:
+        """Return routes of provider API"""
+        raise NotImplementedError
+
+    def _error_response(self,
+                        status :int,
+                        message :str) -> web.Response:
+        """Return error in provider format"""
+        return web.json_response({"error": message}, status = status)
+
+    @web.middleware
+    async def _inject_faults(self, request :web.Request, handler) -> web.StreamResponse:
+        """Delay request, fail it or reject it with 429 as set by fault profile, then record outcome"""
+        if request.path.startswith(CONTROL_PREFIX):
+            return await handler(request)
+        start = time.perf_counter()
+        faults = self.__faults
+        try:
+            delay = faults.sample_latency(self.__random)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            draw = self.__random.random()
+            if draw < faults.rate_limit_rate:
+                self.__counter.increment("rate_limited")
+                response = self._error_response(429, "Too many requests")
+                if faults.retry_after is not None:
+                    response.headers["Retry-After"] = f"{faults.retry_after:g}"
+                return response
+            if draw < faults.rate_limit_rate + faults.error_rate:
+                self.__counter.increment("injected_error")
+                return self._error_response(faults.error_status, "Injected error")
+            response = await handler(request)
+            self.__counter.increment("ok" if response.status < 400 else "error")
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            self.__counter.increment("requests")
+            self.__service_time.record(elapsed)
+            self.__total_service_time += elapsed
+
+    async def _control_stats(self, request :web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    async def _control_reset(self, request :web.Request) -> web.Response:
+        self.reset_stats()
+        return web.json_response({"reset": True})
+
+    async def _control_faults(self, request :web.Request) -> web.Response:
+        self.faults = FaultProfile(**(await request.json()))
+        return web.json_response(self.__faults.model_dump())
+
+    async def start(self) -> None:
+        """Start serving"""
+        if self.__runner is not None:
+            return
+        app = web.Application(middlewares = [self._inject_faults], client_max_size = 1024 ** 3)
+        app.add_routes(self._routes())
+        app.add_routes([web.get(f"{CONTROL_PREFIX}/stats", self._control_stats),
+                        web.post(f"{CONTROL_PREFIX}/reset", self._control_reset),
+                        web.post(f"{CONTROL_PREFIX}/faults", self._control_faults)])
+        self.__runner = web.AppRunner(app)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, host = self.__host, port = self.__port)
+        await site.start()
+        # Find bound port
+        self.__bound_port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop serving"""
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+def synthetic_speech(text :str,
+                     sample_rate :int = 24000,
+                     words_per_second :float = 3.0,
+                     gap_ms :int = 60) -> Tuple[AudioBuffer, List[dict]]:
+    """
+    Return deterministic speech-like audio for text: one tone per word, separated by short silence
+    :param text: Text
+    :param sample_rate: Sample rate in Hz. Default: 24000
+    :param words_per_second: Speaking rate. Default: 3.0
+    :param gap_ms: Silence between words in millisecond. Default: 60
+    :return: (AudioBuffer, word durations [{"text", "start", "duration"}] in second)
+    """
+    words = re.findall(r"\S+", text)
+    gap = np.zeros(int(sample_rate * gap_ms / 1000), dtype = np.float32)
+    chunks = []
+    durations = []
+    position = 0
+    for (index, word) in enumerate(words):
+        # Longer words last longer
+        duration = max(len(word), 2) / (6.0 * words_per_second)
+        time = np.arange(int(sample_rate * duration), dtype = np.float32) / sample_rate
+        envelope = np.sin(np.pi * time / duration)
+        tone = 0.3 * envelope * np.sin(2 * np.pi * (160 + 20 * (index % 5)) * time)
+        durations.append({"text": word,
+                          "start": round(position / sample_rate, 3),
+                          "duration": round(len(tone) / sample_rate, 3)})
+        chunks.extend((tone.astype(np.float32), gap))
+        position += len(tone) + len(gap)
+    samples = np.concatenate(chunks) if len(chunks) > 0 else np.zeros(0, dtype = np.float32)
+    return (AudioBuffer(samples = samples, sample_rate = sample_rate), durations)
+
+def synthetic_words(text :str,
+                    words_per_second :float = 3.0,
+                    gap_ms :int = 60) -> List[dict]:
+    """
+    Return word timings of text spoken at a constant rate, as recognizers would report them
+    :param text: Transcript
+    :param words_per_second: Speaking rate. Default: 3.0
+    :param gap_ms: Silence between words in millisecond. Default: 60
+    :return: Word timings [{"text", "start", "end"}] in second
+    """
+    words = []
+    position = 0.0
+    for word in re.findall(r"\S+", text):
+        duration = max(len(word), 2) / (6.0 * words_per_second)
+        words.append({"text": word, "start": round(position, 3), "end": round(position + duration, 3)})
+        position += duration + gap_ms / 1000
+    return words
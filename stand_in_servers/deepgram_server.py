@@ -0,0 +1,101 @@
+from .base_server import BaseStandInServer, FaultProfile, synthetic_speech, synthetic_words
+from ..utils.audio.transcoder import encode_samples, wav_header
+from aiohttp import web
+from typing import List, Optional
+import datetime, uuid
+
+class DeepgramStandInServer(BaseStandInServer):
+    def __init__(self,
+                 api_key :Optional[str] = None,
+                 host :str = "127.0.0.1",
+                 port :int = 0,
+                 transcript :str = "this is a stand-in transcription",
+                 words_per_second :float = 3.0,
+                 faults :Optional[FaultProfile] = None):
+        """
+        Local stand-in of Deepgram API (prerecorded listen and speak) returning a fixed transcript and synthetic audio.
+        Use DeepGramRecognizer(base_url = server.base_url) or DeepGramSynthesizer(base_url = server.base_url).
+        Compressed encodings (mp3, opus, flac, aac) are served as WAV.
+        :param api_key: Accepted API key. Default: None (any key)
+        :param host: Host to bind. Default: 127.0.0.1
+        :param port: Port to bind. Default: 0 (random free port)
+        :param transcript: Transcript of every audio. Default: "this is a stand-in transcription"
+        :param words_per_second: Speaking rate of word timings and synthetic audio. Default: 3.0
+        :param faults: Injected latency and errors. Default: None (no fault)
+        """
+        super().__init__(host = host, port = port, faults = faults)
+        # Define params
+        self.__api_key = api_key
+        self.__transcript = transcript
+        self.__words_per_second = words_per_second
+
+    def _routes(self) -> List[web.RouteDef]:
+        """Return routes of Deepgram API"""
+        return [web.post("/v1/listen", self._listen),
+                web.post("/v1/speak", self._speak)]
+
+    def _error_response(self,
+                        status :int,
+                        message :str) -> web.Response:
+        return web.json_response({"err_code": "STAND_IN_ERROR", "err_msg": message, "request_id": str(uuid.uuid4())},
+                                 status = status)
+
+    def _is_authorized(self, request :web.Request) -> bool:
+        """Check API key of Authorization header (Token <key>)"""
+        return self.__api_key is None or request.headers.get("Authorization") == f"Token {self.__api_key}"
+
+    async def _listen(self, request :web.Request) -> web.Response:
+        if not self._is_authorized(request):
+            return self._error_response(401, "Invalid credentials")
+        # Body is JSON {"url"} or audio
+        body = await request.read()
+        if len(body) == 0:
+            return self._error_response(400, "Empty audio")
+
+        words = synthetic_words(self.__transcript, words_per_second = self.__words_per_second)
+        duration = words[-1]["end"] if len(words) > 0 else 0.0
+        alternative = {"transcript": self.__transcript,
+                       "confidence": 0.98,
+                       "words": [{"word": word["text"].lower(),
+                                  "start": word["start"],
+                                  "end": word["end"],
+                                  "confidence": 0.98,
+                                  "punctuated_word": word["text"]} for word in words]}
+        return web.json_response({"metadata": {"request_id": str(uuid.uuid4()),
+                                               "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                                               "duration": duration,
+                                               "channels": 1,
+                                               "models": [request.query.get("model", "nova-2")]},
+                                  "results": {"channels": [{"alternatives": [alternative]}]}})
+
+    async def _speak(self, request :web.Request) -> web.Response:
+        if not self._is_authorized(request):
+            return self._error_response(401, "Invalid credentials")
+        text = (await request.json()).get("text")
+        if not text:
+            return self._error_response(400, "Text is required")
+
+        encoding = request.query.get("encoding", "mp3")
+        container = request.query.get("container", "wav" if encoding in ("linear16", "mulaw", "alaw") else "none")
+        # Deepgram default rates
+        sample_rate = int(request.query.get("sample_rate", 24000 if encoding == "linear16" else 8000))
+        (buffer, _) = synthetic_speech(text = text,
+                                       sample_rate = sample_rate,
+                                       words_per_second = self.__words_per_second)
+        if encoding not in ("linear16", "mulaw", "alaw"):
+            (audio, content_type) = (buffer.to_wav_bytes(), "audio/wav")
+        else:
+            audio = encode_samples(buffer.samples, encoding)
+            if container == "wav":
+                audio = wav_header(encoding, sample_rate, num_frames = buffer.num_frames) + audio
+            content_type = "audio/wav" if container == "wav" else "application/octet-stream"
+
+        # Clients read metadata from headers, audio is sent chunked
+        response = web.Response(body = audio,
+                                content_type = content_type,
+                                headers = {"request-id": str(uuid.uuid4()),
+                                           "model-uuid": str(uuid.uuid5(uuid.NAMESPACE_DNS, request.query.get("model", ""))),
+                                           "model-name": request.query.get("model", "aura-asteria-en"),
+                                           "char-count": str(len(text))})
+        response.enable_chunked_encoding()
+        return response
@@ -0,0 +1,136 @@
+from .base_server import BaseStandInServer, FaultProfile, synthetic_speech
+from ..utils.audio.transcoder import encode_samples
+from aiohttp import web
+from typing import List, Optional
+import asyncio, base64
+
+# Premade voices {voice_id: name}, first one is default voice of ElevenLabs client
+PREMADE_VOICES = {"EXAVITQu4vr4xnSDxMaL": "Rachel",
+                  "21m00Tcm4TlvDq8ikWAM": "Adam",
+                  "AZnzlk1XvdvUeBnXmlld": "Domi"}
+
+class ElevenLabsStandInServer(BaseStandInServer):
+    def __init__(self,
+                 api_key :Optional[str] = None,
+                 host :str = "127.0.0.1",
+                 port :int = 0,
+                 words_per_second :float = 3.0,
+                 chunk_size :int = 4096,
+                 chunk_delay :float = 0.0,
+                 faults :Optional[FaultProfile] = None):
+        """
+        Local stand-in of ElevenLabs API (voices and text to speech, streamed or with timestamps) returning
+        synthetic audio. Use ElevenLabsSynthesizer(base_url = server.base_url). mp3 output is served as WAV,
+        pcm_<rate> and ulaw_8000 are served as requested.
+        :param api_key: Accepted API key. Default: None (any key)
+        :param host: Host to bind. Default: 127.0.0.1
+        :param port: Port to bind. Default: 0 (random free port)
+        :param words_per_second: Speaking rate of synthetic audio. Default: 3.0
+        :param chunk_size: Chunk size of streamed audio in bytes. Default: 4096
+        :param chunk_delay: Delay before each streamed audio chunk in second, emulating synthesis time. Default: 0.0
+        :param faults: Injected latency and errors. Default: None (no fault)
+        """
+        super().__init__(host = host, port = port, faults = faults)
+        # Define params
+        self.__api_key = api_key
+        self.__words_per_second = words_per_second
+        self.__chunk_size = chunk_size
+        self.__chunk_delay = chunk_delay
+
+    def _routes(self) -> List[web.RouteDef]:
+        """Return routes of ElevenLabs API"""
+        return [web.get("/v1/voices", self._list_voices),
+                web.post("/v1/text-to-speech/{voice_id}", self._convert),
+                web.post("/v1/text-to-speech/{voice_id}/stream", self._convert_stream),
+                web.post("/v1/text-to-speech/{voice_id}/with-timestamps", self._convert_with_timestamps)]
+
+    def _error_response(self,
+                        status :int,
+                        message :str) -> web.Response:
+        return web.json_response({"detail": {"status": "too_many_concurrent_requests" if status == 429 else "error",
+                                             "message": message}},
+                                 status = status)
+
+    def _is_authorized(self, request :web.Request) -> bool:
+        """Check API key of xi-api-key header"""
+        return self.__api_key is None or request.headers.get("xi-api-key") == self.__api_key
+
+    def _encode(self,
+                text :str,
+                output_format :str) -> tuple:
+        """Return (audio bytes, word durations) of text in requested output format (e.g. mp3_44100_128, pcm_16000)"""
+        (name, rate) = (output_format.split("_") + ["", ""])[:2]
+        sample_rate = int(rate) if rate.isdigit() else 44100
+        (buffer, durations) = synthetic_speech(text = text,
+                                               sample_rate = sample_rate,
+                                               words_per_second = self.__words_per_second)
+        if name == "pcm":
+            return (encode_samples(buffer.samples, "linear16"), durations)
+        if name == "ulaw":
+            return (encode_samples(buffer.samples, "mulaw"), durations)
+        return (buffer.to_wav_bytes(), durations)
+
+    async def _read_request(self, request :web.Request) -> Optional[dict]:
+        """Return JSON body of a valid synthesis request, None otherwise"""
+        if request.match_info["voice_id"] not in PREMADE_VOICES:
+            return None
+        body = await request.json()
+        return body if body.get("text") else None
+
+    async def _list_voices(self, request :web.Request) -> web.Response:
+        if not self._is_authorized(request):
+            return self._error_response(401, "Invalid API key")
+        return web.json_response({"voices": [{"voice_id": voice_id, "name": name, "category": "premade"}
+                                             for (voice_id, name) in PREMADE_VOICES.items()]})
+
+    async def _convert(self, request :web.Request) -> web.Response:
+        if not self._is_authorized(request):
+            return self._error_response(401, "Invalid API key")
+        body = await self._read_request(request)
+        if body is None:
+            return self._error_response(400, "Invalid text or voice")
+        (audio, _) = self._encode(body["text"], request.query.get("output_format", "mp3_44100_128"))
+        return web.Response(body = audio, content_type = "audio/mpeg")
+
+    async def _convert_stream(self, request :web.Request) -> web.StreamResponse:
+        if not self._is_authorized(request):
+            return self._error_response(401, "Invalid API key")
+        body = await self._read_request(request)
+        if body is None:
+            return self._error_response(400, "Invalid text or voice")
+        (audio, _) = self._encode(body["text"], request.query.get("output_format", "mp3_44100_128"))
+
+        response = web.StreamResponse(headers = {"Content-Type": "audio/mpeg"})
+        await response.prepare(request)
+        for start in range(0, len(audio), self.__chunk_size):
+            if self.__chunk_delay > 0:
+                await asyncio.sleep(self.__chunk_delay)
+            await response.write(audio[start:start + self.__chunk_size])
+        await response.write_eof()
+        return response
+
+    async def _convert_with_timestamps(self, request :web.Request) -> web.Response:
+        if not self._is_authorized(request):
+            return self._error_response(401, "Invalid API key")
+        body = await self._read_request(request)
+        if body is None:
+            return self._error_response(400, "Invalid text or voice")
+        (audio, durations) = self._encode(body["text"], request.query.get("output_format", "mp3_44100_128"))
+
+        # Spread characters of each word over its duration, separators take the gap
+        characters, starts, ends = [], [], []
+        for (index, word) in enumerate(durations):
+            if index > 0:
+                previous = durations[index - 1]
+                characters.append(" ")
+                starts.append(round(previous["start"] + previous["duration"], 3))
+                ends.append(word["start"])
+            step = word["duration"] / len(word["text"])
+            for (position, character) in enumerate(word["text"]):
+                characters.append(character)
+                starts.append(round(word["start"] + position * step, 3))
+                ends.append(round(word["start"] + (position + 1) * step, 3))
+        return web.json_response({"audio_base64": base64.b64encode(audio).decode(),
+                                  "alignment": {"characters": characters,
+                                                "character_start_times_seconds": starts,
+                                                "character_end_times_seconds": ends}})
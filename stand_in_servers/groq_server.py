@@ -0,0 +1,44 @@
+from .base_server import BaseStandInServer, FaultProfile
+from aiohttp import web
+from typing import List, Optional
+import uuid
+
+class GroqStandInServer(BaseStandInServer):
+    def __init__(self,
+                 api_key :Optional[str] = None,
+                 host :str = "127.0.0.1",
+                 port :int = 0,
+                 transcript :str = "this is a stand-in transcription",
+                 faults :Optional[FaultProfile] = None):
+        """
+        Local stand-in of Groq audio transcription API returning a fixed transcript.
+        Use GroqRecognizer(base_url = server.base_url).
+        :param api_key: Accepted API key. Default: None (any key)
+        :param host: Host to bind. Default: 127.0.0.1
+        :param port: Port to bind. Default: 0 (random free port)
+        :param transcript: Transcript of every audio. Default: "this is a stand-in transcription"
+        :param faults: Injected latency and errors. Default: None (no fault)
+        """
+        super().__init__(host = host, port = port, faults = faults)
+        # Define params
+        self.__api_key = api_key
+        self.__transcript = transcript
+
+    def _routes(self) -> List[web.RouteDef]:
+        """Return routes of Groq API"""
+        return [web.post("/openai/v1/audio/transcriptions", self._transcribe)]
+
+    def _error_response(self,
+                        status :int,
+                        message :str) -> web.Response:
+        error_type = "rate_limit_exceeded" if status == 429 else "invalid_request_error"
+        return web.json_response({"error": {"message": message, "type": error_type}}, status = status)
+
+    async def _transcribe(self, request :web.Request) -> web.Response:
+        if self.__api_key is not None and request.headers.get("Authorization") != f"Bearer {self.__api_key}":
+            return self._error_response(401, "Invalid API Key")
+        form = await request.post()
+        if "file" not in form or not form.get("model"):
+            return self._error_response(400, "file and model are required")
+        return web.json_response({"text": self.__transcript,
+                                  "x_groq": {"id": f"req_{uuid.uuid4().hex}"}})
@@ -0,0 +1,131 @@
+from .base_server import BaseStandInServer, FaultProfile, synthetic_speech
+from ..utils.audio import encode_mulaw
+from aiohttp import web, WSMsgType
+from typing import List, Optional
+import regex as re
+import asyncio, base64, json
+
+SYSTEM_VOICES = ["ava", "brandon", "lily", "morgan"]
+
+class LmntStandInServer(BaseStandInServer):
+    def __init__(self,
+                 api_key :Optional[str] = None,
+                 host :str = "127.0.0.1",
+                 port :int = 0,
+                 words_per_second :float = 3.0,
+                 chunk_delay :float = 0.0,
+                 faults :Optional[FaultProfile] = None):
+        """
+        Local stand-in of LMNT API (voice list/info, speech and websocket streaming) returning synthetic audio.
+        Use LmntSynthesizer(base_url = server.base_url). Compressed formats (mp3, aac) are served as WAV.
+        :param api_key: Accepted API key. Default: None (any key)
+        :param host: Host to bind. Default: 127.0.0.1
+        :param port: Port to bind. Default: 0 (random free port)
+        :param words_per_second: Speaking rate of synthetic audio. Default: 3.0
+        :param chunk_delay: Delay before each streamed audio chunk in second, emulating synthesis time. Default: 0.0
+        :param faults: Injected latency and errors. Default: None (no fault)
+        """
+        super().__init__(host = host, port = port, faults = faults)
+        # Define params
+        self.__api_key = api_key
+        self.__words_per_second = words_per_second
+        self.__chunk_delay = chunk_delay
+
+    def _routes(self) -> List[web.RouteDef]:
+        """Return routes of LMNT API"""
+        return [web.get("/v1/ai/voice/list", self._list_voices),
+                web.get("/v1/ai/voice/{id}", self._voice_info),
+                web.post("/v1/ai/speech", self._synthesize),
+                web.get("/v1/ai/speech/stream", self._stream)]
+
+    def _is_authorized(self, api_key :Optional[str]) -> bool:
+        """Check API key"""
+        return self.__api_key is None or api_key == self.__api_key
+
+    def _encode(self,
+                text :str,
+                format :str,
+                sample_rate :int) -> tuple:
+        """Return (audio bytes, durations) of text in requested format"""
+        (buffer, durations) = synthetic_speech(text = text,
+                                               sample_rate = sample_rate,
+                                               words_per_second = self.__words_per_second)
+        if format == "raw":
+            return (buffer.to_int16().tobytes(), durations)
+        if format == "ulaw":
+            return (encode_mulaw(buffer.to_int16()).tobytes(), durations)
+        return (buffer.to_wav_bytes(), durations)
+
+    async def _list_voices(self, request :web.Request) -> web.Response:
+        if not self._is_authorized(request.headers.get("X-API-Key")):
+            return web.json_response({"error": "Invalid API key"}, status = 401)
+        return web.json_response([{"id": voice, "name": voice.capitalize(), "owner": "system", "state": "ready"}
+                                  for voice in SYSTEM_VOICES])
+
+    async def _voice_info(self, request :web.Request) -> web.Response:
+        if not self._is_authorized(request.headers.get("X-API-Key")):
+            return web.json_response({"error": "Invalid API key"}, status = 401)
+        voice = request.match_info["id"]
+        if voice not in SYSTEM_VOICES:
+            return web.json_response({"error": f"Voice {voice} not found"}, status = 404)
+        return web.json_response({"id": voice, "name": voice.capitalize(), "owner": "system", "state": "ready"})
+
+    async def _synthesize(self, request :web.Request) -> web.Response:
+        if not self._is_authorized(request.headers.get("X-API-Key")):
+            return web.json_response({"error": "Invalid API key"}, status = 401)
+        form = await request.post()
+        if not form.get("text") or form.get("voice") not in SYSTEM_VOICES:
+            return web.json_response({"error": "Invalid text or voice"}, status = 400)
+
+        (audio, durations) = self._encode(text = form["text"],
+                                          format = form.get("format", "mp3"),
+                                          sample_rate = int(form.get("sample_rate", 24000)))
+        response = {"audio": base64.b64encode(audio).decode(), "seed": 0}
+        if form.get("return_durations") == "true":
+            response["durations"] = durations
+        return web.json_response(response)
+
+    async def _stream(self, request :web.Request) -> web.WebSocketResponse:
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+
+        # First message holds settings
+        message = await socket.receive()
+        settings = json.loads(message.data) if message.type == WSMsgType.TEXT else {}
+        if not self._is_authorized(settings.get("X-API-Key")) or settings.get("voice") not in SYSTEM_VOICES:
+            await socket.send_str(json.dumps({"error": "Invalid API key or voice"}))
+            await socket.close()
+            return socket
+
+        async def send(text :str) -> None:
+            """Synthesize text and send it"""
+            if not text.strip():
+                return
+            if self.__chunk_delay > 0:
+                await asyncio.sleep(self.__chunk_delay)
+            (audio, durations) = self._encode(text = text,
+                                              format = settings.get("format", "mp3"),
+                                              sample_rate = int(settings.get("sample_rate", 24000)))
+            if settings.get("send_extras"):
+                await socket.send_str(json.dumps({"durations": durations, "buffer_empty": True}))
+            await socket.send_bytes(audio)
+
+        # Synthesize complete sentences as they arrive, the rest on flush or end of input
+        text = ""
+        async for message in socket:
+            if message.type != WSMsgType.TEXT:
+                break
+            data = json.loads(message.data)
+            text += data.get("text", "")
+            if data.get("flush") or data.get("eof"):
+                await send(text)
+                text = ""
+            else:
+                parts = re.split(r"(?<=[.!?;:])\s+", text)
+                for sentence in parts[:-1]:
+                    await send(sentence)
+                text = parts[-1]
+            if data.get("eof"):
+                break
+        await socket.close()
+        return socket
@@ -0,0 +1 @@
+from .audio_admission_controller import AudioAdmissionController, AdmissionRejected
\ No newline at end of file
@@ -0,0 +1,256 @@
+from ..metrics import MetricCounter
+from ..audio import AudioBuffer
+from contextlib import contextmanager, asynccontextmanager
+from collections import deque
+from typing import Any, Dict, Iterator, AsyncIterator, Literal, Optional
+import asyncio, io, os, threading
+
+class AdmissionRejected(Exception):
+    """Raised when a request does not fit in the memory budget (reject mode or waiting timeout)"""
+
+class AudioAdmissionController():
+    _default :Optional["AudioAdmissionController"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self,
+                 max_bytes :int = 512 * 1024 * 1024,
+                 mode :Literal["wait","reject"] = "wait",
+                 timeout :Optional[float] = None,
+                 name :str = "audio_admission"):
+        """
+        Process-wide budget of audio bytes held in memory by in-flight requests, shared by recognizers and
+        synthesizers of all providers (thread-safe, usable from several threads and event loops).
+        When budget is exhausted, new requests wait in arrival order (wait mode) or fail fast (reject mode).
+        A request larger than the whole budget is admitted alone.
+        :param max_bytes: Memory budget in bytes. Default: 512 MB
+        :param mode: wait or reject. Default: wait
+        :param timeout: Maximum waiting time in second in wait mode, AdmissionRejected afterwards. Default: None
+        :param name: Name used in stats. Default: audio_admission
+        """
+        if max_bytes <= 0:
+            raise ValueError("Max bytes must be positive")
+        if mode not in ("wait", "reject"):
+            raise ValueError("Mode must be wait or reject")
+
+        # Define params
+        self.__max_bytes = int(max_bytes)
+        self.__mode = mode
+        self.__timeout = timeout
+        # Define state
+        self.__lock = threading.Lock()
+        self.__in_use = 0
+        self.__in_flight = 0
+        self.__peak = 0
+        self.__waiters :deque = deque()
+        # Define stats
+        self.__stats = MetricCounter(name = name)
+
+    @classmethod
+    def default(cls,
+                max_bytes :int = 512 * 1024 * 1024,
+                mode :Literal["wait","reject"] = "wait") -> "AudioAdmissionController":
+        """Return process-wide controller, arguments only apply when it is created"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(max_bytes = max_bytes, mode = mode)
+            return cls._default
+
+    @property
+    def max_bytes(self) -> int:
+        """Return memory budget in bytes"""
+        return self.__max_bytes
+
+    @property
+    def in_use_bytes(self) -> int:
+        """Return bytes held by admitted requests"""
+        return self.__in_use
+
+    @property
+    def available_bytes(self) -> int:
+        """Return remaining budget in bytes"""
+        return max(self.__max_bytes - self.__in_use, 0)
+
+    @property
+    def in_flight(self) -> int:
+        """Return number of admitted requests"""
+        return self.__in_flight
+
+    @property
+    def waiting(self) -> int:
+        """Return number of requests waiting for budget"""
+        return len(self.__waiters)
+
+    @property
+    def stats(self) -> MetricCounter:
+        """Return counters: admitted, admitted_bytes, waited, rejected, timed_out"""
+        return self.__stats
+
+    def gauges(self) -> Dict[str, float]:
+        """Return current usage: in_use_bytes, peak_bytes, max_bytes, utilization, in_flight, waiting"""
+        with self.__lock:
+            return {"in_use_bytes": self.__in_use,
+                    "peak_bytes": self.__peak,
+                    "max_bytes": self.__max_bytes,
+                    "utilization": self.__in_use / self.__max_bytes,
+                    "in_flight": self.__in_flight,
+                    "waiting": len(self.__waiters)}
+
+    @staticmethod
+    def estimate_audio_bytes(audio :Any) -> int:
+        """
+        Return bytes held in memory while a request with this audio is in flight
+        :param audio: File path, bytes, file-like object or AudioBuffer (links are not buffered)
+        :return: Number of bytes
+        """
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            return len(audio)
+        if isinstance(audio, AudioBuffer):
+            # Decoded samples and their 16-bit upload copy
+            return audio.samples.nbytes + audio.samples.size * 2
+        if isinstance(audio, str):
+            return os.path.getsize(audio) if os.path.exists(audio) else 0
+        if isinstance(audio, io.IOBase) and audio.seekable():
+            position = audio.tell()
+            size = audio.seek(0, io.SEEK_END) - position
+            audio.seek(position)
+            return size
+        return 0
+
+    def _fits(self, nbytes :int) -> bool:
+        """Return True when request fits in remaining budget (lock held)"""
+        return self.__in_use + nbytes <= self.__max_bytes or self.__in_flight == 0
+
+    def _admit(self, nbytes :int) -> None:
+        """Account admitted request (lock held)"""
+        self.__in_use += nbytes
+        self.__in_flight += 1
+        self.__peak = max(self.__peak, self.__in_use)
+        self.__stats.increment("admitted")
+        self.__stats.increment("admitted_bytes", nbytes)
+
+    def _grant_waiters(self) -> None:
+        """Admit waiters in arrival order while they fit (lock held)"""
+        while len(self.__waiters) > 0 and self._fits(self.__waiters[0]["nbytes"]):
+            waiter = self.__waiters.popleft()
+            self._admit(waiter["nbytes"])
+            waiter["granted"] = True
+            waiter["notify"]()
+
+    def _try_admit(self, nbytes :int) -> Optional[Dict[str, Any]]:
+        """Admit request immediately, or return its waiter (lock held)"""
+        # Earlier waiters go first
+        if len(self.__waiters) == 0 and self._fits(nbytes):
+            self._admit(nbytes)
+            return None
+        if self.__mode == "reject":
+            self.__stats.increment("rejected")
+            raise AdmissionRejected(f"Audio budget exhausted ({self.__in_use} of {self.__max_bytes} bytes in use, "
+                                    f"{nbytes} requested)")
+        self.__stats.increment("waited")
+        waiter = {"nbytes": nbytes, "granted": False, "notify": None}
+        self.__waiters.append(waiter)
+        return waiter
+
+    def _abandon(self, waiter :Dict[str, Any]) -> bool:
+        """Remove waiter, return True when it was granted in the meantime (lock held)"""
+        if waiter["granted"]:
+            return True
+        self.__waiters.remove(waiter)
+        # Smaller waiters behind may fit now
+        self._grant_waiters()
+        return False
+
+    def acquire(self,
+                nbytes :int,
+                timeout :Optional[float] = None) -> None:
+        """
+        Synchronously reserve bytes, waiting or raising AdmissionRejected when budget is exhausted
+        :param nbytes: Number of bytes
+        :param timeout: Maximum waiting time in second. Default: None (controller timeout)
+        :return: None
+        """
+        event = threading.Event()
+        with self.__lock:
+            waiter = self._try_admit(nbytes)
+            if waiter is None:
+                return
+            waiter["notify"] = event.set
+        timeout = timeout if timeout is not None else self.__timeout
+        if event.wait(timeout):
+            return
+        with self.__lock:
+            if self._abandon(waiter):
+                return
+            self.__stats.increment("timed_out")
+        raise AdmissionRejected(f"Audio budget not available within {timeout} seconds")
+
+    async def aacquire(self,
+                       nbytes :int,
+                       timeout :Optional[float] = None) -> None:
+        """
+        Asynchronously reserve bytes, waiting or raising AdmissionRejected when budget is exhausted
+        :param nbytes: Number of bytes
+        :param timeout: Maximum waiting time in second. Default: None (controller timeout)
+        :return: None
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake() -> None:
+            if not future.done():
+                future.set_result(True)
+
+        with self.__lock:
+            waiter = self._try_admit(nbytes)
+            if waiter is None:
+                return
+            # Waiter may be granted from another thread
+            waiter["notify"] = lambda: loop.call_soon_threadsafe(wake)
+        timeout = timeout if timeout is not None else self.__timeout
+        try:
+            await asyncio.wait_for(future, timeout = timeout)
+        except asyncio.TimeoutError:
+            with self.__lock:
+                if self._abandon(waiter):
+                    return
+                self.__stats.increment("timed_out")
+            raise AdmissionRejected(f"Audio budget not available within {timeout} seconds")
+        except asyncio.CancelledError:
+            with self.__lock:
+                granted = self._abandon(waiter)
+            if granted:
+                self.release(nbytes)
+            raise
+
+    def release(self, nbytes :int) -> None:
+        """
+        Return reserved bytes to budget
+        :param nbytes: Number of bytes
+        :return: None
+        """
+        with self.__lock:
+            self.__in_use = max(self.__in_use - nbytes, 0)
+            self.__in_flight = max(self.__in_flight - 1, 0)
+            self._grant_waiters()
+
+    @contextmanager
+    def reserve(self,
+                nbytes :int,
+                timeout :Optional[float] = None) -> Iterator[None]:
+        """Synchronously hold bytes for the duration of block"""
+        self.acquire(nbytes, timeout = timeout)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
+
+    @asynccontextmanager
+    async def areserve(self,
+                       nbytes :int,
+                       timeout :Optional[float] = None) -> AsyncIterator[None]:
+        """Asynchronously hold bytes for the duration of block"""
+        await self.aacquire(nbytes, timeout = timeout)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
@@ -0,0 +1,4 @@
+from .audio_buffer import AudioBuffer, SPEECH_SAMPLE_RATE, frame_levels, resample, probe_duration
+from .upload_encoder import UploadEncoder, CompressionPolicy
+from .voice_activity import VoiceActivityDetector, SpeechRegion
+from .transcoder import OutputFormat, StreamTranscoder, transcode, transcode_file, encode_mulaw, encode_alaw
\ No newline at end of file
@@ -0,0 +1,338 @@
+from typing import Union, BinaryIO, Optional
+import numpy as np
+import io, os, wave
+
+# Default sample rate of speech models
+SPEECH_SAMPLE_RATE = 16000
+
+class AudioBuffer():
+    def __init__(self,
+                 samples :np.ndarray,
+                 sample_rate :int):
+        """
+        Decoded audio kept in memory, so that it is decoded only once and reused by every recognizer.
+        :param samples: Float32 samples in range [-1, 1], shape (frames,) for mono or (frames, channels)
+        :param sample_rate: Sample rate in Hz
+        """
+        # Check samples
+        if samples.ndim not in (1, 2):
+            raise ValueError("Samples must have shape (frames,) or (frames, channels)")
+        if sample_rate <= 0:
+            raise ValueError("Sample rate must be positive")
+
+        # Define params
+        self.__samples = np.ascontiguousarray(samples, dtype = np.float32)
+        self.__sample_rate = int(sample_rate)
+        # Cache of derived outputs
+        self.__wav_bytes = None
+        self.__speech_buffer = None
+
+    @property
+    def samples(self) -> np.ndarray:
+        """Return float32 samples"""
+        return self.__samples
+
+    @property
+    def sample_rate(self) -> int:
+        """Return sample rate in Hz"""
+        return self.__sample_rate
+
+    @property
+    def channels(self) -> int:
+        """Return number of channels"""
+        return 1 if self.__samples.ndim == 1 else self.__samples.shape[1]
+
+    @property
+    def num_frames(self) -> int:
+        """Return number of frames"""
+        return self.__samples.shape[0]
+
+    @property
+    def duration(self) -> float:
+        """Return duration in second"""
+        return self.num_frames / self.__sample_rate
+
+    @property
+    def nbytes(self) -> int:
+        """Return memory size of samples in bytes"""
+        return self.__samples.nbytes
+
+    @classmethod
+    def load(cls,
+             audio :Union[str, bytes, BinaryIO, "AudioBuffer", np.ndarray],
+             sample_rate :Optional[int] = SPEECH_SAMPLE_RATE,
+             mono :bool = True,
+             trim_silence :bool = False,
+             **kwargs) -> "AudioBuffer":
+        """
+        Decode audio once and convert it to speech format (16 kHz mono by default)
+        :param audio: Local file path, bytes, file-like object, AudioBuffer or float32 array (assumed at sample_rate)
+        :param sample_rate: Target sample rate. None keeps original rate. Default: 16000
+        :param mono: Mix down to mono. Default: True
+        :param trim_silence: Remove leading and trailing silence. Default: False
+        :param kwargs: Keyword arguments of trim_silence function
+        :return: AudioBuffer
+        """
+        if isinstance(audio, AudioBuffer):
+            buffer = audio
+        elif isinstance(audio, np.ndarray):
+            buffer = cls(samples = audio, sample_rate = sample_rate or SPEECH_SAMPLE_RATE)
+        elif isinstance(audio, str):
+            if not os.path.exists(audio):
+                raise FileNotFoundError(f"File {audio} not found")
+            with open(audio, "rb") as file:
+                buffer = cls.from_bytes(file.read())
+        elif isinstance(audio, (bytes, bytearray, memoryview)):
+            buffer = cls.from_bytes(bytes(audio))
+        else:
+            buffer = cls.from_bytes(audio.read())
+
+        # Convert
+        if mono:
+            buffer = buffer.to_mono()
+        if sample_rate is not None:
+            buffer = buffer.resample(sample_rate)
+        if trim_silence:
+            buffer = buffer.trim_silence(**kwargs)
+        return buffer
+
+    @classmethod
+    def from_bytes(cls, data :bytes) -> "AudioBuffer":
+        """
+        Decode encoded audio. PCM WAV is decoded with standard library, other formats require PyAV (pip install av).
+        :param data: Encoded audio
+        :return: AudioBuffer at original sample rate and channels
+        """
+        # PCM WAV
+        if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+            try:
+                return cls._decode_wav(data)
+            except wave.Error:
+                # Not PCM (e.g. float or compressed WAV)
+                pass
+        return cls._decode_av(data)
+
+    @classmethod
+    def _decode_wav(cls, data :bytes) -> "AudioBuffer":
+        """Decode PCM WAV with vectorized sample conversion"""
+        with wave.open(io.BytesIO(data), "rb") as file:
+            channels = file.getnchannels()
+            sample_width = file.getsampwidth()
+            sample_rate = file.getframerate()
+            frames = file.readframes(file.getnframes())
+
+        # Convert to float32
+        if sample_width == 1:
+            samples = (np.frombuffer(frames, dtype = np.uint8).astype(np.float32) - 128) / 128
+        elif sample_width == 2:
+            samples = np.frombuffer(frames, dtype = "<i2").astype(np.float32) / 32768
+        elif sample_width == 3:
+            raw = np.frombuffer(frames, dtype = np.uint8).reshape(-1, 3).astype(np.int32)
+            values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+            values = np.where(values >= 1 << 23, values - (1 << 24), values)
+            samples = values.astype(np.float32) / (1 << 23)
+        elif sample_width == 4:
+            samples = np.frombuffer(frames, dtype = "<i4").astype(np.float32) / (1 << 31)
+        else:
+            raise wave.Error(f"Unsupported sample width: {sample_width}")
+
+        # Split channels
+        if channels > 1:
+            samples = samples.reshape(-1, channels)
+        return cls(samples = samples, sample_rate = sample_rate)
+
+    @classmethod
+    def _decode_av(cls, data :bytes) -> "AudioBuffer":
+        """Decode any format supported by FFmpeg libraries through PyAV"""
+        try:
+            import av
+        except ImportError:
+            raise ImportError("Decoding compressed audio requires PyAV. Please install: pip install av")
+
+        chunks = []
+        sample_rate = None
+        with av.open(io.BytesIO(data), mode = "r", metadata_errors = "ignore") as container:
+            stream = container.streams.audio[0]
+            sample_rate = stream.rate
+            channels = stream.channels
+            # Convert to packed float32 at original rate
+            resampler = av.AudioResampler(format = "flt", layout = stream.layout.name, rate = sample_rate)
+            for frame in container.decode(stream):
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+
+        samples = np.concatenate(chunks) if chunks else np.zeros(0, dtype = np.float32)
+        # Split channels
+        if channels > 1:
+            samples = samples.reshape(-1, channels)
+        return cls(samples = samples, sample_rate = sample_rate)
+
+    def to_mono(self) -> "AudioBuffer":
+        """Return mono buffer (average of channels)"""
+        if self.channels == 1:
+            return self
+        return AudioBuffer(samples = self.__samples.mean(axis = 1), sample_rate = self.__sample_rate)
+
+    def resample(self, sample_rate :int) -> "AudioBuffer":
+        """
+        Return buffer at another sample rate. A windowed-sinc low-pass filter is applied before downsampling
+        to prevent aliasing, then samples are linearly interpolated.
+        :param sample_rate: Target sample rate in Hz
+        :return: AudioBuffer
+        """
+        if sample_rate == self.__sample_rate:
+            return self
+        return AudioBuffer(samples = resample(samples = self.__samples,
+                                              source_rate = self.__sample_rate,
+                                              target_rate = sample_rate),
+                           sample_rate = sample_rate)
+
+    def trim_silence(self,
+                     threshold_db :float = -45.0,
+                     frame_ms :int = 20,
+                     padding_ms :int = 100) -> "AudioBuffer":
+        """
+        Return buffer without leading and trailing silence
+        :param threshold_db: Frame whose RMS level (dBFS) is below threshold is considered silent. Default: -45.0
+        :param frame_ms: Analysis frame length in millisecond. Default: 20
+        :param padding_ms: Silence kept around speech in millisecond. Default: 100
+        :return: AudioBuffer (empty when whole audio is silent)
+        """
+        levels = frame_levels(samples = self.__samples,
+                              sample_rate = self.__sample_rate,
+                              frame_ms = frame_ms)
+        voiced = np.flatnonzero(levels >= threshold_db)
+        # Whole audio is silent
+        if len(voiced) == 0:
+            return AudioBuffer(samples = self.__samples[:0], sample_rate = self.__sample_rate)
+
+        # Define boundaries
+        frame_length = max(int(self.__sample_rate * frame_ms / 1000), 1)
+        padding = int(self.__sample_rate * padding_ms / 1000)
+        start = max(voiced[0] * frame_length - padding, 0)
+        end = min((voiced[-1] + 1) * frame_length + padding, self.num_frames)
+        # Nothing to trim
+        if start == 0 and end == self.num_frames:
+            return self
+        return AudioBuffer(samples = self.__samples[start:end], sample_rate = self.__sample_rate)
+
+    def slice(self,
+              start :float,
+              end :Optional[float] = None) -> "AudioBuffer":
+        """
+        Return a part of buffer
+        :param start: Start time in second
+        :param end: End time in second (Default: None, end of audio)
+        :return: AudioBuffer
+        """
+        start_frame = max(int(start * self.__sample_rate), 0)
+        end_frame = self.num_frames if end is None else min(int(end * self.__sample_rate), self.num_frames)
+        return AudioBuffer(samples = self.__samples[start_frame:end_frame], sample_rate = self.__sample_rate)
+
+    def to_int16(self) -> np.ndarray:
+        """Return samples as int16 PCM"""
+        return (np.clip(self.__samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+    def to_speech(self) -> "AudioBuffer":
+        """Return 16 kHz mono buffer expected by speech models (computed once)"""
+        if self.__speech_buffer is None:
+            self.__speech_buffer = self.to_mono().resample(SPEECH_SAMPLE_RATE)
+        return self.__speech_buffer
+
+    def to_wav_bytes(self) -> bytes:
+        """Return 16-bit PCM WAV bytes (computed once)"""
+        if self.__wav_bytes is None:
+            output = io.BytesIO()
+            with wave.open(output, "wb") as file:
+                file.setnchannels(self.channels)
+                file.setsampwidth(2)
+                file.setframerate(self.__sample_rate)
+                file.writeframes(self.to_int16().tobytes())
+            self.__wav_bytes = output.getvalue()
+        return self.__wav_bytes
+
+def frame_levels(samples :np.ndarray,
+                 sample_rate :int,
+                 frame_ms :int = 20) -> np.ndarray:
+    """
+    Return RMS level (dBFS) of each non-overlapping frame
+    :param samples: Float32 samples, mono or (frames, channels)
+    :param sample_rate: Sample rate in Hz
+    :param frame_ms: Frame length in millisecond. Default: 20
+    :return: Array of levels, one per frame
+    """
+    # Mix down
+    if samples.ndim == 2:
+        samples = samples.mean(axis = 1)
+    frame_length = max(int(sample_rate * frame_ms / 1000), 1)
+    num_frames = int(np.ceil(len(samples) / frame_length))
+    if num_frames == 0:
+        return np.zeros(0, dtype = np.float32)
+
+    # Pad last frame and reshape into frames
+    padded = np.zeros(num_frames * frame_length, dtype = np.float32)
+    padded[:len(samples)] = samples
+    frames = padded.reshape(num_frames, frame_length)
+    rms = np.sqrt(np.mean(frames * frames, axis = 1))
+    return 20 * np.log10(rms + 1e-10)
+
+def resample(samples :np.ndarray,
+             source_rate :int,
+             target_rate :int,
+             num_taps :int = 63) -> np.ndarray:
+    """
+    Vectorized resampling: windowed-sinc low-pass filter (when downsampling) then linear interpolation
+    :param samples: Float32 samples, mono or (frames, channels)
+    :param source_rate: Original sample rate in Hz
+    :param target_rate: Target sample rate in Hz
+    :param num_taps: Length of low-pass filter. Default: 63
+    :return: Resampled float32 samples
+    """
+    if source_rate == target_rate or len(samples) == 0:
+        return samples.astype(np.float32, copy = False)
+
+    # Anti-aliasing filter
+    if target_rate < source_rate:
+        cutoff = target_rate / source_rate / 2
+        taps = np.arange(num_taps) - (num_taps - 1) / 2
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(num_taps)
+        kernel = (kernel / kernel.sum()).astype(np.float32)
+        if samples.ndim == 1:
+            samples = np.convolve(samples, kernel, mode = "same")
+        else:
+            samples = np.stack([np.convolve(samples[:, channel], kernel, mode = "same")
+                                for channel in range(samples.shape[1])], axis = 1)
+
+    # Interpolate
+    num_frames = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(num_frames) * (source_rate / target_rate)
+    indexes = np.arange(len(samples))
+    if samples.ndim == 1:
+        return np.interp(positions, indexes, samples).astype(np.float32)
+    return np.stack([np.interp(positions, indexes, samples[:, channel])
+                     for channel in range(samples.shape[1])], axis = 1).astype(np.float32)
+
+def probe_duration(path :str) -> Optional[float]:
+    """
+    Return duration of an audio file in second without decoding it (header of PCM WAV, container of other formats)
+    :param path: Local file path
+    :return: Duration, None when unknown
+    """
+    try:
+        with wave.open(path, "rb") as file:
+            return file.getnframes() / file.getframerate()
+    except (wave.Error, EOFError, OSError):
+        pass
+    try:
+        import av
+        with av.open(path, mode = "r", metadata_errors = "ignore") as container:
+            if container.duration is not None:
+                return container.duration / av.time_base
+            stream = container.streams.audio[0]
+            if stream.duration is not None:
+                return float(stream.duration * stream.time_base)
+    except Exception:
+        pass
+    return None
@@ -0,0 +1,266 @@
+from .audio_buffer import AudioBuffer
+from pydantic import BaseModel
+from typing import AsyncIterator, Iterator, Literal, Optional, Union
+import numpy as np
+import struct
+
+# WAV format tags
+WAV_FORMAT_TAGS = {"linear16": 1, "alaw": 6, "mulaw": 7}
+# Upper bounds of mu-law segments (14-bit magnitude)
+MULAW_SEGMENT_ENDS = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF], dtype = np.int32)
+# Upper bounds of A-law segments (13-bit magnitude)
+ALAW_SEGMENT_ENDS = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF], dtype = np.int32)
+
+class OutputFormat(BaseModel):
+    # Same names as DeepGramEncoding
+    encoding :Literal["linear16", "mulaw", "alaw"] = "linear16"
+    # None keeps sample rate of synthesizer
+    sample_rate :Optional[int] = None
+    # wav: WAV header, none: headerless samples
+    container :Literal["wav", "none"] = "wav"
+
+    @classmethod
+    def telephony(cls, container :Literal["wav", "none"] = "none") -> "OutputFormat":
+        """Return 8 kHz mu-law format used by telephony (G.711)"""
+        return cls(encoding = "mulaw", sample_rate = 8000, container = container)
+
+def encode_mulaw(samples :np.ndarray) -> np.ndarray:
+    """Encode 16-bit PCM samples into G.711 mu-law bytes"""
+    # 14-bit magnitude with bias
+    values = samples.astype(np.int32) >> 2
+    mask = np.where(values < 0, 0x7F, 0xFF)
+    values = np.minimum(np.abs(values), 8159) + 0x21
+    segment = np.searchsorted(MULAW_SEGMENT_ENDS, values)
+    encoded = (np.minimum(segment, 7) << 4) | ((values >> (segment + 1)) & 0x0F)
+    # Clip overflowing magnitudes
+    encoded = np.where(segment >= 8, 0x7F, encoded)
+    return ((encoded ^ mask) & 0xFF).astype(np.uint8)
+
+def encode_alaw(samples :np.ndarray) -> np.ndarray:
+    """Encode 16-bit PCM samples into G.711 A-law bytes"""
+    values = samples.astype(np.int32) >> 3
+    mask = np.where(values >= 0, 0xD5, 0x55)
+    values = np.where(values >= 0, values, -values - 1)
+    segment = np.searchsorted(ALAW_SEGMENT_ENDS, values)
+    shift = np.where(segment < 2, 1, segment)
+    encoded = (np.minimum(segment, 7) << 4) | ((values >> shift) & 0x0F)
+    # Clip overflowing magnitudes
+    encoded = np.where(segment >= 8, 0x7F, encoded)
+    return ((encoded ^ mask) & 0xFF).astype(np.uint8)
+
+def _mulaw_table() -> np.ndarray:
+    """Return 16-bit value of each mu-law byte"""
+    values = ~np.arange(256, dtype = np.int32) & 0xFF
+    exponent = (values >> 4) & 0x07
+    magnitude = ((((values & 0x0F) << 3) + 0x84) << exponent) - 0x84
+    return np.where(values & 0x80, -magnitude, magnitude).astype(np.int16)
+
+def _alaw_table() -> np.ndarray:
+    """Return 16-bit value of each A-law byte"""
+    values = np.arange(256, dtype = np.int32) ^ 0x55
+    segment = (values & 0x70) >> 4
+    magnitude = ((values & 0x0F) << 4) + np.where(segment == 0, 8, 0x108)
+    magnitude = np.where(segment > 1, magnitude << np.maximum(segment - 1, 0), magnitude)
+    return np.where(values & 0x80, magnitude, -magnitude).astype(np.int16)
+
+MULAW_TABLE = _mulaw_table()
+ALAW_TABLE = _alaw_table()
+
+def encode_samples(samples :np.ndarray, encoding :str) -> bytes:
+    """
+    Encode float32 samples
+    :param samples: Float32 samples in range [-1, 1]
+    :param encoding: linear16, mulaw or alaw
+    :return: Encoded bytes
+    """
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    if encoding == "linear16":
+        return pcm.astype("<i2").tobytes()
+    if encoding == "mulaw":
+        return encode_mulaw(pcm).tobytes()
+    if encoding == "alaw":
+        return encode_alaw(pcm).tobytes()
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+def decode_samples(data :bytes, encoding :str) -> np.ndarray:
+    """
+    Decode headerless samples into float32
+    :param data: Encoded bytes (whole samples)
+    :param encoding: linear16, mulaw or alaw
+    :return: Float32 samples
+    """
+    if encoding == "linear16":
+        pcm = np.frombuffer(data, dtype = "<i2")
+    elif encoding == "mulaw":
+        pcm = MULAW_TABLE[np.frombuffer(data, dtype = np.uint8)]
+    elif encoding == "alaw":
+        pcm = ALAW_TABLE[np.frombuffer(data, dtype = np.uint8)]
+    else:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+    return pcm.astype(np.float32) / 32768
+
+def wav_header(encoding :str,
+               sample_rate :int,
+               num_frames :Optional[int] = None,
+               channels :int = 1) -> bytes:
+    """
+    Return WAV header of PCM16, mu-law or A-law samples
+    :param encoding: linear16, mulaw or alaw
+    :param sample_rate: Sample rate in Hz
+    :param num_frames: Number of frames. Default: None (unknown length, for streaming)
+    :param channels: Number of channels. Default: 1
+    :return: Header bytes
+    """
+    sample_width = 2 if encoding == "linear16" else 1
+    data_size = 0xFFFFFFFF if num_frames is None else num_frames * channels * sample_width
+    fmt = struct.pack("<HHIIHH", WAV_FORMAT_TAGS[encoding], channels, sample_rate,
+                      sample_rate * channels * sample_width, channels * sample_width, sample_width * 8)
+    chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    # Non-PCM formats carry extension size and frame count
+    if encoding != "linear16":
+        fmt = fmt + struct.pack("<H", 0)
+        chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        chunks += b"fact" + struct.pack("<I", 4) + struct.pack("<I", 0xFFFFFFFF if num_frames is None else num_frames)
+    riff_size = 0xFFFFFFFF if num_frames is None else 4 + len(chunks) + 8 + data_size
+    return b"RIFF" + struct.pack("<I", riff_size) + b"WAVE" + chunks + b"data" + struct.pack("<I", data_size)
+
+def transcode(audio :Union[bytes, AudioBuffer],
+              output_format :OutputFormat) -> bytes:
+    """
+    Convert encoded audio (any format readable by AudioBuffer) into output format, in process
+    :param audio: Encoded audio or AudioBuffer
+    :param output_format: Output format (mono)
+    :return: Encoded bytes
+    """
+    buffer = (audio if isinstance(audio, AudioBuffer) else AudioBuffer.from_bytes(audio)).to_mono()
+    if output_format.sample_rate is not None:
+        buffer = buffer.resample(output_format.sample_rate)
+    data = encode_samples(buffer.samples, output_format.encoding)
+    if output_format.container == "wav":
+        return wav_header(output_format.encoding, buffer.sample_rate, num_frames = buffer.num_frames) + data
+    return data
+
+def transcode_file(path :str, output_format :OutputFormat) -> None:
+    """Convert audio file into output format in place"""
+    with open(path, "rb") as file:
+        data = transcode(file.read(), output_format)
+    with open(path, "wb") as file:
+        file.write(data)
+
+class StreamTranscoder():
+    def __init__(self,
+                 output_format :OutputFormat,
+                 input_encoding :str = "linear16",
+                 input_sample_rate :int = 24000,
+                 num_taps :int = 63):
+        """
+        Incremental transcoder of headerless mono stream. Chunks may split samples, resampling state
+        (anti-aliasing filter and interpolation phase) is kept between chunks so there is no click at boundaries.
+        :param output_format: Output format. WAV container emits a header of unknown length first
+        :param input_encoding: linear16, mulaw or alaw. Default: linear16
+        :param input_sample_rate: Input sample rate in Hz. Default: 24000
+        :param num_taps: Length of anti-aliasing filter. Default: 63
+        """
+        if input_encoding not in WAV_FORMAT_TAGS:
+            raise ValueError(f"Stream transcoding requires linear16, mulaw or alaw input, got {input_encoding}")
+
+        # Define params
+        self.__output_format = output_format
+        self.__input_encoding = input_encoding
+        self.__input_rate = input_sample_rate
+        self.__output_rate = output_format.sample_rate or input_sample_rate
+        self.__step = self.__input_rate / self.__output_rate
+        self.__sample_width = 2 if input_encoding == "linear16" else 1
+        # Anti-aliasing filter
+        self.__kernel = None
+        if self.__output_rate < self.__input_rate:
+            cutoff = self.__output_rate / self.__input_rate / 2
+            taps = np.arange(num_taps) - (num_taps - 1) / 2
+            kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(num_taps)
+            self.__kernel = (kernel / kernel.sum()).astype(np.float32)
+        # Define state
+        self.__remainder = b""
+        self.__raw_tail = np.zeros(0 if self.__kernel is None else num_taps - 1, dtype = np.float32)
+        self.__history = np.zeros(0, dtype = np.float32)
+        self.__offset = 0
+        # Skip filter delay
+        self.__position = 0.0 if self.__kernel is None else (num_taps - 1) / 2
+        self.__header_sent = False
+
+    @property
+    def output_sample_rate(self) -> int:
+        """Return output sample rate in Hz"""
+        return self.__output_rate
+
+    def _header(self) -> bytes:
+        """Return WAV header once"""
+        if self.__header_sent or self.__output_format.container != "wav":
+            return b""
+        self.__header_sent = True
+        return wav_header(self.__output_format.encoding, self.__output_rate)
+
+    def _emit(self, samples :np.ndarray, final :bool = False) -> bytes:
+        """Resample new samples and encode available output"""
+        if self.__output_rate == self.__input_rate:
+            return encode_samples(samples, self.__output_format.encoding)
+
+        # Filter with history of previous chunk
+        if self.__kernel is not None:
+            raw = np.concatenate([self.__raw_tail, samples])
+            self.__raw_tail = raw[len(raw) - len(self.__raw_tail):]
+            samples = np.convolve(raw, self.__kernel, mode = "valid").astype(np.float32)
+        self.__history = np.concatenate([self.__history, samples])
+
+        # Interpolate output positions covered by history
+        end = self.__offset + len(self.__history) - 1
+        # Last output positions hold last sample
+        if final:
+            end += 1
+        count = max(int(np.ceil((end - self.__position) / self.__step)), 0)
+        if len(self.__history) == 0 or count == 0:
+            return b""
+        positions = self.__position + np.arange(count) * self.__step - self.__offset
+        output = np.interp(positions, np.arange(len(self.__history)), self.__history).astype(np.float32)
+        self.__position += count * self.__step
+        # Drop consumed history
+        keep = min(max(int(np.floor(self.__position)) - self.__offset, 0), len(self.__history))
+        self.__history = self.__history[keep:]
+        self.__offset += keep
+        return encode_samples(output, self.__output_format.encoding)
+
+    def feed(self, chunk :bytes) -> bytes:
+        """
+        Transcode a chunk
+        :param chunk: Input bytes
+        :return: Output bytes available so far (may be empty)
+        """
+        data = self.__remainder + chunk
+        usable = len(data) - len(data) % self.__sample_width
+        self.__remainder = data[usable:]
+        return self._header() + self._emit(decode_samples(data[:usable], self.__input_encoding))
+
+    def flush(self) -> bytes:
+        """Return remaining output at end of stream"""
+        # Push filter delay out
+        padding = np.zeros(len(self.__raw_tail) // 2, dtype = np.float32)
+        return self._header() + self._emit(padding, final = True)
+
+    def transcode_stream(self, chunks :Iterator[bytes]) -> Iterator[bytes]:
+        """Transcode iterator of chunks"""
+        for chunk in chunks:
+            output = self.feed(chunk)
+            if output:
+                yield output
+        output = self.flush()
+        if output:
+            yield output
+
+    async def atranscode_stream(self, chunks :AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Transcode async iterator of chunks"""
+        async for chunk in chunks:
+            output = self.feed(chunk)
+            if output:
+                yield output
+        output = self.flush()
+        if output:
+            yield output
@@ -0,0 +1,131 @@
+from .audio_buffer import AudioBuffer, SPEECH_SAMPLE_RATE
+from ..metrics import MetricCounter
+from typing import Union, Tuple
+from strenum import StrEnum
+import numpy as np
+import io, time
+
+# Sample rates supported by Opus encoder
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+class CompressionPolicy(StrEnum):
+    # Lossless FLAC, lowest CPU usage
+    FAST = "fast"
+    # Lossless FLAC, default compression level
+    BALANCED = "balanced"
+    # Lossy Opus at speech bitrate, smallest upload
+    SMALLEST = "smallest"
+
+class UploadEncoder():
+    def __init__(self,
+                 policy :Union[CompressionPolicy, str] = CompressionPolicy.BALANCED,
+                 min_saving_ratio :float = 0.1,
+                 opus_bitrate :int = 24000,
+                 to_speech :bool = True):
+        """
+        In-process pre-upload encoder (through PyAV, without subprocess) transcoding PCM WAV into FLAC or Opus.
+        Audio is kept as it is when encoding does not reduce size enough or input is already compressed.
+        :param policy: Size/CPU trade-off. fast: FLAC level 0, balanced: FLAC level 5, smallest: Opus. Default: balanced
+        :param min_saving_ratio: Minimum relative size reduction to use encoded audio. Default: 0.1
+        :param opus_bitrate: Bitrate of Opus encoder in bit/s. Default: 24000
+        :param to_speech: Convert to 16 kHz mono before encoding. Default: True
+        """
+        # Check ratio
+        if min_saving_ratio < 0.0 or min_saving_ratio >= 1.0:
+            raise ValueError("Min saving ratio must be in range [0, 1)")
+
+        # Define params
+        self.__policy = CompressionPolicy(policy)
+        self.__min_saving_ratio = min_saving_ratio
+        self.__opus_bitrate = opus_bitrate
+        self.__to_speech = to_speech
+        # Define stats
+        self.__stats = MetricCounter(name = "upload_encoder")
+
+    @property
+    def policy(self) -> CompressionPolicy:
+        """Return compression policy"""
+        return self.__policy
+
+    @property
+    def stats(self) -> MetricCounter:
+        """Return counters: requests, encoded, original_bytes, uploaded_bytes, bytes_saved, encode_seconds"""
+        return self.__stats
+
+    def encode(self, audio :Union[bytes, AudioBuffer]) -> Tuple[bytes, str]:
+        """
+        Return audio to upload with its file extension
+        :param audio: Encoded audio bytes or AudioBuffer
+        :return: (content, extension) such as (b"...", "flac")
+        """
+        # Original upload
+        if isinstance(audio, AudioBuffer):
+            original = audio.to_wav_bytes()
+        else:
+            original = bytes(audio)
+        self.__stats.increment("requests")
+        self.__stats.increment("original_bytes", len(original))
+
+        # Only PCM WAV or decoded audio is transcoded
+        if not isinstance(audio, AudioBuffer) and not (original[:4] == b"RIFF" and original[8:12] == b"WAVE"):
+            self.__stats.increment("uploaded_bytes", len(original))
+            return (original, "")
+
+        start = time.perf_counter()
+        try:
+            buffer = audio if isinstance(audio, AudioBuffer) else AudioBuffer.from_bytes(original)
+            if self.__to_speech:
+                buffer = buffer.to_speech()
+            (encoded, extension) = self._transcode(buffer)
+        except Exception:
+            # Unsupported input or PyAV not installed, upload original
+            encoded = None
+        self.__stats.increment("encode_seconds", time.perf_counter() - start)
+
+        # Not worth it
+        if encoded is None or len(encoded) > len(original) * (1 - self.__min_saving_ratio):
+            self.__stats.increment("uploaded_bytes", len(original))
+            return (original, "wav")
+
+        self.__stats.increment("encoded")
+        self.__stats.increment("uploaded_bytes", len(encoded))
+        self.__stats.increment("bytes_saved", len(original) - len(encoded))
+        return (encoded, extension)
+
+    def _transcode(self, buffer :AudioBuffer) -> Tuple[bytes, str]:
+        """Encode buffer following policy"""
+        import av
+
+        if self.__policy == CompressionPolicy.SMALLEST:
+            # Opus only supports some sample rates
+            if buffer.sample_rate not in OPUS_SAMPLE_RATES:
+                buffer = buffer.resample(SPEECH_SAMPLE_RATE)
+            (container_format, codec, extension) = ("ogg", "libopus", "ogg")
+            options = {}
+        else:
+            (container_format, codec, extension) = ("flac", "flac", "flac")
+            options = {"compression_level": "0" if self.__policy == CompressionPolicy.FAST else "5"}
+
+        # Interleaved 16-bit samples
+        layout = "mono" if buffer.channels == 1 else "stereo"
+        samples = buffer.to_int16().reshape(-1, buffer.channels)
+
+        output = io.BytesIO()
+        with av.open(output, mode = "w", format = container_format) as container:
+            stream = container.add_stream(codec, rate = buffer.sample_rate)
+            stream.layout = layout
+            stream.options = options
+            if codec == "libopus":
+                stream.bit_rate = self.__opus_bitrate
+
+            # Encode frame by frame
+            frame_size = stream.codec_context.frame_size or 4096
+            for index in range(0, len(samples), frame_size):
+                chunk = np.ascontiguousarray(samples[index:index + frame_size]).reshape(1, -1)
+                frame = av.AudioFrame.from_ndarray(chunk, format = "s16", layout = layout)
+                frame.sample_rate = buffer.sample_rate
+                for packet in stream.encode(frame):
+                    container.mux(packet)
+            for packet in stream.encode(None):
+                container.mux(packet)
+        return (output.getvalue(), extension)
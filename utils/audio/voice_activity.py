@@ -0,0 +1,82 @@
+from .audio_buffer import AudioBuffer, frame_levels
+from pydantic import BaseModel
+from typing import List, Union
+import numpy as np
+
+class SpeechRegion(BaseModel):
+    start :float
+    end :float
+
+class VoiceActivityDetector():
+    def __init__(self,
+                 threshold_db :float = -45.0,
+                 noise_margin_db :float = 10.0,
+                 frame_ms :int = 30,
+                 min_speech_ms :int = 150,
+                 min_silence_ms :int = 300,
+                 padding_ms :int = 100):
+        """
+        Fast vectorized energy based voice activity detector. A frame is voiced when its RMS level is above both
+        an absolute threshold and the estimated noise floor (10th percentile of frame levels) plus a margin.
+        The noise floor test is skipped when frame levels barely vary (continuous speech, steady tone), since the
+        10th percentile is then the signal itself rather than background noise.
+        :param threshold_db: Absolute level threshold (dBFS). Default: -45.0
+        :param noise_margin_db: Margin above noise floor (dB). Default: 10.0
+        :param frame_ms: Analysis frame length in millisecond. Default: 30
+        :param min_speech_ms: Shorter voiced runs are dropped (clicks, bursts of noise). Default: 150
+        :param min_silence_ms: Shorter silences between voiced runs are merged. Default: 300
+        :param padding_ms: Padding added around each speech region in millisecond. Default: 100
+        """
+        self.__threshold_db = threshold_db
+        self.__noise_margin_db = noise_margin_db
+        self.__frame_ms = frame_ms
+        self.__min_speech_frames = max(int(round(min_speech_ms / frame_ms)), 1)
+        self.__min_silence_frames = max(int(round(min_silence_ms / frame_ms)), 1)
+        self.__padding = padding_ms / 1000
+
+    def detect(self, audio :Union[AudioBuffer, str, bytes]) -> List[SpeechRegion]:
+        """
+        Return speech regions of audio
+        :param audio: AudioBuffer, local file path or bytes
+        :return: List of SpeechRegion (in second), empty when there is no speech
+        """
+        buffer = AudioBuffer.load(audio, sample_rate = None)
+        levels = frame_levels(samples = buffer.samples,
+                              sample_rate = buffer.sample_rate,
+                              frame_ms = self.__frame_ms)
+        if len(levels) == 0:
+            return []
+
+        # Voiced frames
+        (noise_floor, loud) = np.percentile(levels, [10, 90])
+        threshold = self.__threshold_db
+        # Without quiet frames to estimate it from, the noise floor would reject the whole signal
+        if loud - noise_floor >= self.__noise_margin_db:
+            threshold = max(threshold, noise_floor + self.__noise_margin_db)
+        voiced = (levels >= threshold).astype(np.int8)
+
+        # Runs of voiced frames
+        edges = np.diff(np.concatenate(([0], voiced, [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if len(starts) == 0:
+            return []
+
+        # Merge runs separated by short silence
+        keep = (starts[1:] - ends[:-1]) >= self.__min_silence_frames
+        starts = starts[np.concatenate(([True], keep))]
+        ends = ends[np.concatenate((keep, [True]))]
+        # Drop short runs
+        long_enough = (ends - starts) >= self.__min_speech_frames
+        starts = starts[long_enough]
+        ends = ends[long_enough]
+
+        # Convert to second
+        frame_duration = self.__frame_ms / 1000
+        return [SpeechRegion(start = round(max(start * frame_duration - self.__padding, 0.0), 3),
+                             end = round(min(end * frame_duration + self.__padding, buffer.duration), 3))
+                for (start, end) in zip(starts.tolist(), ends.tolist())]
+
+    def has_speech(self, audio :Union[AudioBuffer, str, bytes]) -> bool:
+        """Return True when audio contains speech"""
+        return len(self.detect(audio)) > 0
@@ -0,0 +1 @@
+from .transcription_cache import TranscriptionCache
\ No newline at end of file
@@ -0,0 +1,161 @@
+from ..types import TranscriptionResponse
+from ..audio import AudioBuffer
+from typing import Optional, Union, BinaryIO, Dict, Any
+import sqlite3, threading, hashlib, json, time, os
+
+class TranscriptionCache():
+    def __init__(self,
+                 directory :str = os.path.join(os.path.expanduser("~"), ".cache", "eve_agent", "transcriptions"),
+                 max_entries :int = 100000,
+                 max_bytes :int = 512 * 1024 * 1024,
+                 ttl :Optional[float] = 7 * 24 * 3600):
+        """
+        Bounded disk store of TranscriptionResponse with LRU eviction and time-to-live (backed by SQLite)
+        :param directory: Cache directory. Default: ~/.cache/eve_agent/transcriptions
+        :param max_entries: Maximum number of entries. Default: 100000
+        :param max_bytes: Maximum total size of stored responses in bytes. Default: 512 MB
+        :param ttl: Time-to-live in second, None means no expiration. Default: 7 days
+        """
+        # Define params
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+        # Define database
+        os.makedirs(directory, exist_ok = True)
+        self.__connection = sqlite3.connect(os.path.join(directory, "cache.sqlite3"),
+                                            check_same_thread = False,
+                                            isolation_level = None)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS entries ("
+                                  "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                                  "created REAL NOT NULL, accessed REAL NOT NULL)")
+        self.__connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self.__connection.execute("CREATE INDEX IF NOT EXISTS entries_created ON entries (created)")
+        # Running totals, kept by triggers in the same transaction as each change (no table scan per set)
+        self.__connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS totals ("
+                                      "id INTEGER PRIMARY KEY CHECK (id = 0), "
+                                      "entries INTEGER NOT NULL, size INTEGER NOT NULL)")
+            self.__connection.execute("INSERT OR IGNORE INTO totals (id, entries, size) "
+                                      "SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+            self.__connection.execute("CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN "
+                                      "UPDATE totals SET entries = entries + 1, size = size + NEW.size; END")
+            self.__connection.execute("CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN "
+                                      "UPDATE totals SET entries = entries - 1, size = size - OLD.size; END")
+            self.__connection.execute("CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN "
+                                      "UPDATE totals SET size = size - OLD.size + NEW.size; END")
+            self.__connection.execute("COMMIT")
+        except BaseException:
+            self.__connection.execute("ROLLBACK")
+            raise
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return hits, misses and number of entries"""
+        with self.__lock:
+            (entries,) = self.__connection.execute("SELECT entries FROM totals").fetchone()
+        return {"hits": self.__hits, "misses": self.__misses, "entries": entries}
+
+    @staticmethod
+    def hash_audio(audio :Union[str, bytes, BinaryIO, AudioBuffer]) -> str:
+        """
+        Return content hash (SHA-256) of audio. Links are hashed by URL.
+        :param audio: Audio object ( Accepted types: str (file path or link), bytes, BinaryIO and AudioBuffer)
+        :return: Hex digest
+        """
+        digest = hashlib.sha256()
+        if isinstance(audio, AudioBuffer):
+            digest.update(f"buffer:{audio.sample_rate}:{audio.channels}:".encode())
+            digest.update(audio.samples.tobytes())
+        elif isinstance(audio, (bytes, bytearray, memoryview)):
+            digest.update(bytes(audio))
+        elif isinstance(audio, str) and audio.strip().lower().startswith("http"):
+            digest.update(f"link:{audio.strip()}".encode())
+        elif isinstance(audio, str):
+            with open(audio, "rb") as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        else:
+            raise TypeError(f"Unsupported audio type: {type(audio).__name__}")
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(audio_hash :str,
+                 model :str,
+                 options :Dict[str, Any]) -> str:
+        """
+        Return cache key from audio hash, recognizer model and transcription options
+        :param audio_hash: Content hash of audio
+        :param model: Recognizer and model name
+        :param options: Transcription options (detect_words, in_milliseconds, language, ...)
+        :return: Key
+        """
+        payload = json.dumps({"audio": audio_hash, "model": model, "options": options},
+                             sort_keys = True, default = str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key :str) -> Optional[TranscriptionResponse]:
+        """Return cached response (None when missing or expired)"""
+        now = time.time()
+        with self.__lock:
+            row = self.__connection.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            # Missing
+            if row is None:
+                self.__misses += 1
+                return None
+            # Expired
+            if self.__ttl is not None and now - row[1] > self.__ttl:
+                self.__connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.__misses += 1
+                return None
+            # Refresh LRU position
+            self.__connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.__hits += 1
+        return TranscriptionResponse.model_validate_json(row[0])
+
+    def set(self,
+            key :str,
+            response :TranscriptionResponse) -> None:
+        """Store response, then evict expired and least recently used entries over limits"""
+        value = response.model_dump_json()
+        now = time.time()
+        with self.__lock:
+            # Upsert (REPLACE would delete without firing delete trigger)
+            self.__connection.execute("INSERT INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?) "
+                                      "ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                                      "created = excluded.created, accessed = excluded.accessed",
+                                      (key, value, len(value), now, now))
+            self._evict(now)
+
+    def _evict(self, now :float) -> None:
+        """Evict expired entries then least recently used entries (Lock must be held)"""
+        if self.__ttl is not None:
+            self.__connection.execute("DELETE FROM entries WHERE created < ?", (now - self.__ttl,))
+        (entries, size) = self.__connection.execute("SELECT entries, size FROM totals").fetchone()
+        if entries <= self.__max_entries and size <= self.__max_bytes:
+            return
+
+        # Walk from least recently used
+        removed = []
+        for (key, entry_size) in self.__connection.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            if entries <= self.__max_entries and size <= self.__max_bytes:
+                break
+            removed.append((key,))
+            entries -= 1
+            size -= entry_size
+        self.__connection.executemany("DELETE FROM entries WHERE key = ?", removed)
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self.__lock:
+            self.__connection.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        """Close database"""
+        with self.__lock:
+            self.__connection.close()
@@ -0,0 +1 @@
+from .deadline import Deadline, DeadlineExceeded
\ No newline at end of file
@@ -0,0 +1,207 @@
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, Union
+import asyncio, concurrent.futures, threading, time
+
+# Longest blocking wait between two checks of cancellation
+CANCEL_POLL_INTERVAL = 0.1
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call does not finish before its deadline or is cancelled"""
+
+class Deadline():
+    def __init__(self,
+                 timeout :Optional[float] = None,
+                 parent :Optional["Deadline"] = None):
+        """
+        Time budget of one call, shared by all of its steps (admission, rate limit, upload, retries, polling,
+        model segments). Clock is monotonic. Besides expiry, a deadline can be cancelled: blocking work running
+        in a worker thread checks it between steps (segments, chunks, sentences) and stops when caller gave up.
+        :param timeout: Time budget in second from now. Default: None (no expiry, cancellation only)
+        :param parent: Deadline of enclosing call, its expiry and cancellation also apply. Default: None
+        """
+        if timeout is not None and timeout < 0:
+            raise ValueError("Timeout must be positive")
+        # Define expiry, earliest one wins
+        expiry = None if timeout is None else time.monotonic() + timeout
+        if parent is not None and parent.expiry is not None:
+            expiry = parent.expiry if expiry is None else min(expiry, parent.expiry)
+        self.__expiry = expiry
+        self.__parent = parent
+        self.__cancelled = threading.Event()
+
+    @classmethod
+    def coerce(cls, deadline :Union[None, float, "Deadline"]) -> "Deadline":
+        """
+        Return deadline of a call argument
+        :param deadline: Deadline (returned as it is), time budget in second or None (no expiry)
+        :return: Deadline
+        """
+        if isinstance(deadline, Deadline):
+            return deadline
+        return cls(timeout = deadline)
+
+    @property
+    def expiry(self) -> Optional[float]:
+        """Return expiry on monotonic clock (None when no expiry)"""
+        return self.__expiry
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """Return remaining time in second, 0 when expired or cancelled (None when no expiry)"""
+        if self.cancelled:
+            return 0.0
+        if self.__expiry is None:
+            return None
+        return max(self.__expiry - time.monotonic(), 0.0)
+
+    @property
+    def cancelled(self) -> bool:
+        """Return True when deadline or its parent was cancelled"""
+        return self.__cancelled.is_set() or (self.__parent is not None and self.__parent.cancelled)
+
+    @property
+    def expired(self) -> bool:
+        """Return True when no time is left (expired or cancelled)"""
+        return self.remaining == 0.0
+
+    def cancel(self) -> None:
+        """Cancel deadline (and its children), work stops at its next check"""
+        self.__cancelled.set()
+
+    def child(self) -> "Deadline":
+        """Return deadline with same expiry that can be cancelled without cancelling this one"""
+        return Deadline(parent = self)
+
+    def check(self, step :str = "call") -> None:
+        """
+        Raise DeadlineExceeded when expired or cancelled
+        :param step: Name of next step, used in message. Default: call
+        :return: None
+        """
+        if self.cancelled:
+            raise DeadlineExceeded(f"Cancelled before {step}")
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline exceeded before {step}")
+
+    def timeout(self, default :Optional[float] = None) -> Optional[float]:
+        """
+        Return timeout of next blocking step: remaining time bounded by default
+        :param default: Timeout of step without deadline. Default: None (no timeout)
+        :return: Timeout in second or None
+        """
+        self.check()
+        remaining = self.remaining
+        if remaining is None:
+            return default
+        return remaining if default is None else min(default, remaining)
+
+    def sleep(self, seconds :float) -> None:
+        """
+        Sleep in calling thread, waking up early when cancelled
+        :param seconds: Sleeping time in second
+        :return: None (DeadlineExceeded is raised when deadline passes or is cancelled before waking up)
+        """
+        wake_up = time.monotonic() + seconds
+        while True:
+            self.check(step = "wake up")
+            left = wake_up - time.monotonic()
+            if left <= 0:
+                return
+            remaining = self.remaining
+            self.__cancelled.wait(min(left, CANCEL_POLL_INTERVAL) if remaining is None
+                                  else min(left, remaining, CANCEL_POLL_INTERVAL))
+
+    def wait_result(self, future :Future) -> Any:
+        """
+        Wait for result of a concurrent future within remaining time, stopping early when cancelled
+        :param future: Future (e.g. of a thread or process pool)
+        :return: Result of future
+        """
+        while True:
+            self.check(step = "result")
+            remaining = self.remaining
+            try:
+                return future.result(timeout = CANCEL_POLL_INTERVAL if remaining is None
+                                     else min(remaining, CANCEL_POLL_INTERVAL))
+            except DeadlineExceeded:
+                raise
+            except concurrent.futures.TimeoutError:
+                # Raised by work itself
+                if future.done():
+                    raise
+
+    async def run(self, awaitable :Awaitable[Any]) -> Any:
+        """
+        Await within remaining time. At expiry awaitable is cancelled, so connections of HTTP clients are closed
+        instead of being left to finish.
+        :param awaitable: Coroutine or future
+        :return: Result of awaitable
+        """
+        try:
+            self.check()
+        except DeadlineExceeded:
+            # Dont leave coroutine never awaited
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        try:
+            return await asyncio.wait_for(awaitable, timeout = self.remaining)
+        except DeadlineExceeded:
+            raise
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("Deadline exceeded") from None
+
+    async def run_in_thread(self,
+                            function :Callable[..., Any],
+                            *args,
+                            **kwargs) -> Any:
+        """
+        Run blocking function in a worker thread within remaining time. Function receives a child deadline
+        (deadline keyword) which is cancelled when time is up or caller is cancelled, so that it stops at its
+        next check and frees CPU. Other calls sharing this deadline are not cancelled.
+        :param function: Blocking function accepting deadline keyword
+        :param args: Positional arguments of function
+        :param kwargs: Keyword arguments of function
+        :return: Result of function
+        """
+        self.check()
+        deadline = self.child()
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(function, *args, deadline = deadline, **kwargs),
+                                          timeout = self.remaining)
+        except DeadlineExceeded:
+            raise
+        except asyncio.TimeoutError:
+            deadline.cancel()
+            raise DeadlineExceeded("Deadline exceeded") from None
+        except asyncio.CancelledError:
+            deadline.cancel()
+            raise
+
+    def iterate(self, iterator :Iterator[Any]) -> Iterator[Any]:
+        """
+        Yield items of a blocking iterator (e.g. audio chunks), checking deadline before each one
+        :param iterator: Iterator
+        :return: Iterator of same items
+        """
+        for item in iterator:
+            self.check(step = "next chunk")
+            yield item
+
+    async def aiterate(self, iterator :AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """
+        Yield items of an async iterator (e.g. audio chunks), waiting for each one within remaining time
+        :param iterator: Async iterator
+        :return: Async iterator of same items
+        """
+        iterator = iterator.__aiter__()
+        while True:
+            try:
+                item = await self.run(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+            yield item
+
+    def __repr__(self) -> str:
+        remaining = self.remaining
+        return f"Deadline(remaining={'inf' if remaining is None else f'{remaining:.3f}'}, cancelled={self.cancelled})"
@@ -0,0 +1,2 @@
+from .latency_tracker import LatencyTracker
+from .metric_counter import MetricCounter
\ No newline at end of file
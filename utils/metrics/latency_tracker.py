@@ -0,0 +1,73 @@
+from collections import deque
+from typing import Optional
+import threading, math
+
+class LatencyTracker():
+    def __init__(self,
+                 alpha :float = 0.3,
+                 window :int = 100):
+        """
+        Track recent latency of a service with an exponentially weighted moving average (EWMA)
+        and a sliding window of raw samples (for percentiles).
+        :param alpha: Smoothing factor of EWMA, from 0 to 1. Higher value reacts faster to changes. Default: 0.3
+        :param window: Number of recent samples kept for percentile computation. Default: 100
+        """
+        # Check alpha
+        if alpha <= 0.0 or alpha > 1.0:
+            raise ValueError("Alpha value must be in range (0, 1]")
+        # Check window
+        if window < 1:
+            raise ValueError("Window must be at least 1")
+
+        # Define params
+        self.__alpha = alpha
+        self.__samples = deque(maxlen = window)
+        self.__ewma = None
+        self.__count = 0
+        self.__lock = threading.Lock()
+
+    def record(self,
+               latency :float,
+               in_window :bool = True) -> None:
+        """
+        Record a new latency sample
+        :param latency: Latency in second
+        :param in_window: Add sample to percentile window too. False only updates EWMA (e.g. penalized failure,
+        which would inflate percentiles). Default: True
+        :return: None
+        """
+        with self.__lock:
+            # First sample
+            if self.__ewma is None:
+                self.__ewma = latency
+            else:
+                self.__ewma = self.__alpha * latency + (1 - self.__alpha) * self.__ewma
+            # Add to window
+            if in_window:
+                self.__samples.append(latency)
+                self.__count += 1
+
+    @property
+    def ewma(self) -> Optional[float]:
+        """Return current EWMA latency (None when no sample was recorded)"""
+        return self.__ewma
+
+    @property
+    def count(self) -> int:
+        """Return total number of samples recorded in window (EWMA only samples are not counted)"""
+        return self.__count
+
+    def percentile(self, q :float) -> Optional[float]:
+        """
+        Return percentile of recent samples (nearest-rank method)
+        :param q: Percentile from 0 to 100
+        :return: Latency in second or None when no sample was recorded
+        """
+        with self.__lock:
+            samples = sorted(self.__samples)
+        # When empty
+        if len(samples) == 0:
+            return None
+        # Nearest rank
+        rank = max(math.ceil(q / 100 * len(samples)), 1)
+        return samples[rank - 1]
@@ -0,0 +1,43 @@
+from typing import Dict
+import threading
+
+class MetricCounter():
+    def __init__(self, name :str):
+        """
+        Thread-safe group of named counters (e.g. bytes saved, skipped audio seconds)
+        :param name: Name of counter group
+        """
+        self.__name = name
+        self.__values :Dict[str, float] = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        """Return name of counter group"""
+        return self.__name
+
+    def increment(self,
+                  key :str,
+                  value :float = 1) -> None:
+        """
+        Add value to a counter
+        :param key: Counter name
+        :param value: Value added. Default: 1
+        :return: None
+        """
+        with self.__lock:
+            self.__values[key] = self.__values.get(key, 0) + value
+
+    def get(self, key :str) -> float:
+        """Return value of a counter (0 when never incremented)"""
+        return self.__values.get(key, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return a copy of all counters"""
+        with self.__lock:
+            return dict(self.__values)
+
+    def reset(self) -> None:
+        """Reset all counters"""
+        with self.__lock:
+            self.__values.clear()
@@ -0,0 +1,41 @@
+from typing import List, Tuple, Union
+import regex as re
+
+def normalize_words(text :str) -> List[str]:
+    """Return lowercase words of text without punctuation"""
+    return re.sub(r"[^\p{L}\p{N}'\s]", " ", text.lower()).split()
+
+def edit_distance(reference :List[str], hypothesis :List[str]) -> int:
+    """Return Levenshtein distance between two word sequences"""
+    previous = list(range(len(hypothesis) + 1))
+    for (i, word) in enumerate(reference, start = 1):
+        current = [i] + [0] * len(hypothesis)
+        for (j, other) in enumerate(hypothesis, start = 1):
+            current[j] = min(previous[j] + 1,
+                             current[j - 1] + 1,
+                             previous[j - 1] + (word != other))
+        previous = current
+    return previous[-1]
+
+def word_error_rate(references :Union[str, List[str]],
+                    hypotheses :Union[str, List[str]]) -> Tuple[float, int, int]:
+    """
+    Return corpus word error rate (total edits over total reference words), texts are normalized first
+    :param references: Reference text or list of texts
+    :param hypotheses: Transcription or list of transcriptions, in order of references
+    :return: (word error rate, edits, reference words)
+    """
+    if isinstance(references, str):
+        references = [references]
+    if isinstance(hypotheses, str):
+        hypotheses = [hypotheses]
+    if len(references) != len(hypotheses):
+        raise ValueError("References and hypotheses must have same length")
+
+    edits = 0
+    words = 0
+    for (reference, hypothesis) in zip(references, hypotheses):
+        reference_words = normalize_words(reference)
+        edits += edit_distance(reference_words, normalize_words(hypothesis or ""))
+        words += len(reference_words)
+    return (edits / words if words > 0 else 0.0, edits, words)
@@ -0,0 +1,2 @@
+from .rate_limit_policy import RateLimitPolicy
+from .adaptive_rate_limiter import AdaptiveRateLimiter, RateLimitExceeded
\ No newline at end of file
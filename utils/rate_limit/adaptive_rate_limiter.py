@@ -0,0 +1,198 @@
+from .rate_limit_policy import RateLimitPolicy
+from typing import Optional, Mapping
+import threading, asyncio, random, time, math, email.utils
+
+class RateLimitExceeded(Exception):
+    def __init__(self,
+                 message :str,
+                 retry_after :Optional[float] = None):
+        """
+        Raised when provider still answers 429 after all retries
+        :param message: Error message
+        :param retry_after: Waiting time in second requested by provider (Retry-After). Default: None
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AdaptiveRateLimiter():
+    def __init__(self,
+                 policy :RateLimitPolicy = RateLimitPolicy()):
+        """
+        Rate limiter combining a token bucket (requests per minute) with an adaptive concurrency limit.
+        Concurrency grows additively after each success and shrinks multiplicatively after each 429 (AIMD).
+        Use acquire/release in synchronous code and aacquire/arelease in asynchronous code.
+        :param policy: Rate limit policy
+        """
+        # Check policy
+        if policy.requests_per_minute <= 0:
+            raise ValueError("Requests per minute must be positive")
+        if policy.min_concurrency < 1 or policy.min_concurrency > policy.max_concurrency:
+            raise ValueError("Concurrency must satisfy 1 <= min_concurrency <= max_concurrency")
+
+        # Define params
+        self.__policy = policy
+        self.__rate = policy.requests_per_minute / 60
+        self.__tokens = float(policy.burst)
+        self.__last_refill = time.monotonic()
+        self.__paused_until = 0.0
+        self.__last_decrease = 0.0
+        self.__limit = float(min(max(policy.initial_concurrency, policy.min_concurrency), policy.max_concurrency))
+        self.__in_flight = 0
+        # Synchronization
+        self.__condition = threading.Condition()
+        self.__release_event = None
+
+    @property
+    def policy(self) -> RateLimitPolicy:
+        """Return rate limit policy"""
+        return self.__policy
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Return current concurrency limit"""
+        return math.floor(self.__limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Return number of requests currently holding a slot"""
+        return self.__in_flight
+
+    def _try_acquire(self) -> Optional[float]:
+        """
+        Try to take a token and a concurrency slot
+        :return: 0 when acquired, waiting time in second for the next token, or None when waiting for a free slot.
+        """
+        now = time.monotonic()
+        # Refill bucket
+        self.__tokens = min(self.__policy.burst, self.__tokens + (now - self.__last_refill) * self.__rate)
+        self.__last_refill = now
+
+        # Paused by retry-after
+        if now < self.__paused_until:
+            return self.__paused_until - now
+        # No free slot
+        if self.__in_flight >= self.concurrency_limit:
+            return None
+        # No token
+        if self.__tokens < 1:
+            return (1 - self.__tokens) / self.__rate
+
+        # Acquired
+        self.__tokens -= 1
+        self.__in_flight += 1
+        return 0
+
+    def acquire(self, timeout :Optional[float] = None) -> bool:
+        """
+        Synchronously wait for a token and a concurrency slot
+        :param timeout: Maximum waiting time in second. Default: None (wait until acquired)
+        :return: True when acquired, False when timeout passed
+        """
+        expiry = None if timeout is None else time.monotonic() + timeout
+        with self.__condition:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return True
+                if expiry is not None:
+                    remaining = expiry - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = remaining if wait is None else min(wait, remaining)
+                self.__condition.wait(timeout = wait)
+
+    def release(self) -> None:
+        """Synchronously release a concurrency slot"""
+        with self.__condition:
+            self.__in_flight -= 1
+            self.__condition.notify_all()
+
+    async def aacquire(self) -> None:
+        """Asynchronously wait for a token and a concurrency slot"""
+        while True:
+            with self.__condition:
+                wait = self._try_acquire()
+            if wait == 0:
+                return
+            # Wait for release or next token
+            if self.__release_event is None:
+                self.__release_event = asyncio.Event()
+            try:
+                await asyncio.wait_for(self.__release_event.wait(), timeout = wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def arelease(self) -> None:
+        """Asynchronously release a concurrency slot"""
+        with self.__condition:
+            self.__in_flight -= 1
+        # Wake up all waiters
+        if self.__release_event is not None:
+            self.__release_event.set()
+            self.__release_event = None
+
+    def on_success(self) -> None:
+        """Additive increase of concurrency limit after a successful request"""
+        with self.__condition:
+            self.__limit = min(self.__policy.max_concurrency,
+                               self.__limit + self.__policy.additive_increase / max(self.__limit, 1.0))
+            self.__condition.notify_all()
+
+    def on_rate_limited(self, retry_after :Optional[float] = None) -> None:
+        """
+        Multiplicative decrease of concurrency limit after a 429 status code, and pause until retry-after passed
+        :param retry_after: Waiting time in second returned by service (Default: None)
+        """
+        with self.__condition:
+            now = time.monotonic()
+            # Honour retry-after
+            if retry_after is not None and retry_after > 0:
+                self.__paused_until = max(self.__paused_until, now + retry_after)
+            # Empty bucket
+            self.__tokens = min(self.__tokens, 0.0)
+            # Decrease at most once per pause window, concurrent 429s belong to the same congestion event
+            if now - self.__last_decrease >= max(retry_after or 0.0, 1.0):
+                self.__limit = max(self.__policy.min_concurrency,
+                                   self.__limit * self.__policy.multiplicative_decrease)
+                self.__last_decrease = now
+
+    def backoff_delay(self,
+                      attempt :int,
+                      retry_after :Optional[float] = None) -> float:
+        """
+        Return exponential backoff delay with full jitter, never shorter than retry-after
+        :param attempt: Retry attempt, starting from 0
+        :param retry_after: Waiting time in second returned by service (Default: None)
+        :return: Delay in second
+        """
+        ceiling = min(self.__policy.max_backoff, self.__policy.base_backoff * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        return max(delay, retry_after or 0.0)
+
+    @staticmethod
+    def parse_retry_after(headers :Optional[Mapping[str,str]]) -> Optional[float]:
+        """
+        Return waiting time in second from retry-after-ms or retry-after (seconds or HTTP date) headers
+        :param headers: Response headers
+        :return: float or None when not specified
+        """
+        if headers is None:
+            return None
+        # Milliseconds header
+        try:
+            return float(headers.get("retry-after-ms")) / 1000
+        except (TypeError, ValueError):
+            pass
+        # Seconds header
+        retry_after = headers.get("retry-after")
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            pass
+        # Date header
+        if retry_after is None:
+            return None
+        retry_date = email.utils.parsedate_tz(retry_after)
+        if retry_date is None:
+            return None
+        return max(float(email.utils.mktime_tz(retry_date) - time.time()), 0.0)
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+class RateLimitPolicy(BaseModel):
+    # Token bucket
+    requests_per_minute :float = 20.0
+    burst :int = 5
+    # AIMD concurrency
+    initial_concurrency :int = 2
+    min_concurrency :int = 1
+    max_concurrency :int = 8
+    additive_increase :float = 1.0
+    multiplicative_decrease :float = 0.5
+    # Retry backoff
+    base_backoff :float = 0.5
+    max_backoff :float = 60.0
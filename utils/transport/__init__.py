@@ -0,0 +1 @@
+from .shared_transport import SharedTransport
\ No newline at end of file
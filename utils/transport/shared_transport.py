@@ -0,0 +1,562 @@
+from ..metrics import MetricCounter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio, importlib.util, ipaddress, logging, socket, ssl, threading, time, weakref
+import aiohttp, anyio, httpcore, httpx
+
+logger = logging.getLogger(__name__)
+
+# Socket options of new connections (TCP_NODELAY is always set by httpcore)
+SOCKET_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+# httpx versions whose transports keep their httpcore pool in _pool (minimum included, maximum excluded)
+HTTPX_POOL_VERSIONS = ((0, 23), (0, 29))
+
+def _http2_available() -> bool:
+    """Return True when h2 package (HTTP/2 support of httpx) is installed"""
+    return importlib.util.find_spec("h2") is not None
+
+class _DnsCache():
+    def __init__(self,
+                 ttl :float,
+                 stats :MetricCounter):
+        """
+        Thread-safe cache of resolved addresses, shared by sync and async pools
+        :param ttl: Time to live of an entry in second (0 disables cache)
+        :param stats: Counters of transport
+        """
+        self.__ttl = ttl
+        self.__stats = stats
+        self.__entries :Dict[str, Tuple[float, List[str]]] = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def _is_ip(host :str) -> bool:
+        """Return True when host is an IP address (nothing to resolve)"""
+        try:
+            ipaddress.ip_address(host)
+            return True
+        except ValueError:
+            return False
+
+    def get(self, host :str) -> Optional[List[str]]:
+        """Return cached addresses, None when missing or expired"""
+        if self._is_ip(host):
+            return [host]
+        with self.__lock:
+            entry = self.__entries.get(host)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        self.__stats.increment("dns_cache_hits")
+        return entry[1]
+
+    def put(self, host :str, infos :List[tuple]) -> List[str]:
+        """Store addresses of getaddrinfo result and return them"""
+        self.__stats.increment("dns_lookups")
+        addresses = list(dict.fromkeys(str(info[4][0]) for info in infos))
+        if self.__ttl > 0 and addresses:
+            with self.__lock:
+                self.__entries[host] = (time.monotonic() + self.__ttl, addresses)
+        return addresses
+
+    def invalidate(self, host :str) -> None:
+        """Drop entry (e.g. after connection error, address may be stale)"""
+        with self.__lock:
+            self.__entries.pop(host, None)
+
+class _TlsSessionCache():
+    def __init__(self, stats :MetricCounter):
+        """
+        Thread-safe cache of TLS sessions by host name, shared by sync and async pools, so that a new connection
+        resumes the session of a previous one (abbreviated handshake) instead of a full handshake
+        :param stats: Counters of transport
+        """
+        self.__stats = stats
+        self.__sessions :Dict[str, ssl.SSLSession] = {}
+        self.__lock = threading.Lock()
+
+    def context(self,
+                ssl_context :ssl.SSLContext,
+                host :Optional[str]) -> Any:
+        """Return TLS context of a new connection, resuming cached session of host when there is one"""
+        with self.__lock:
+            session = self.__sessions.get(host) if host is not None else None
+        return ssl_context if session is None else _ResumingContext(ssl_context, session)
+
+    def put(self,
+            host :Optional[str],
+            ssl_object :Optional[Any]) -> bool:
+        """
+        Store session of a connection, when it can be resumed (TLS 1.3 ticket arrives after handshake)
+        :param host: Server host name
+        :param ssl_object: SSLSocket or SSLObject of connection
+        :return: True when session is stored
+        """
+        session = ssl_object.session if host is not None and ssl_object is not None else None
+        if session is None or (ssl_object.version() == "TLSv1.3" and not session.has_ticket):
+            return False
+        with self.__lock:
+            self.__sessions[host] = session
+        return True
+
+    def record_handshake(self,
+                         ssl_object :Optional[Any],
+                         seconds :float) -> None:
+        """Update stats of a handshake"""
+        self.__stats.increment("tls_handshakes")
+        self.__stats.increment("tls_seconds", seconds)
+        if ssl_object is not None and ssl_object.session_reused:
+            self.__stats.increment("tls_resumed")
+
+class _ResumingContext():
+    def __init__(self, ssl_context :ssl.SSLContext, session :ssl.SSLSession):
+        """TLS context of one connection, same as shared context but resuming a session"""
+        self.__context = ssl_context
+        self.__session = session
+
+    def wrap_socket(self, sock :socket.socket, server_hostname :Optional[str] = None, **kwargs) -> ssl.SSLSocket:
+        return self.__context.wrap_socket(sock, server_hostname = server_hostname, session = self.__session)
+
+    def wrap_bio(self,
+                 incoming :ssl.MemoryBIO,
+                 outgoing :ssl.MemoryBIO,
+                 server_side :bool = False,
+                 server_hostname :Optional[str] = None,
+                 session :Optional[ssl.SSLSession] = None) -> ssl.SSLObject:
+        return self.__context.wrap_bio(incoming, outgoing,
+                                       server_side = server_side,
+                                       server_hostname = server_hostname,
+                                       session = self.__session)
+
+    def __getattr__(self, name :str) -> Any:
+        return getattr(self.__context, name)
+
+class _CountingStream(httpcore.NetworkStream):
+    def __init__(self,
+                 stream :httpcore.NetworkStream,
+                 stats :MetricCounter,
+                 sessions :_TlsSessionCache,
+                 host :Optional[str] = None):
+        """Network stream counting TLS handshakes and keeping its TLS session for next connections"""
+        self.__stream = stream
+        self.__stats = stats
+        self.__sessions = sessions
+        self.__host = host
+        self.__session_saved = host is None
+
+    def _save_session(self) -> None:
+        """Store TLS session once it is resumable"""
+        if not self.__session_saved:
+            self.__session_saved = self.__sessions.put(self.__host, self.__stream.get_extra_info("ssl_object"))
+
+    def read(self, max_bytes :int, timeout :Optional[float] = None) -> bytes:
+        data = self.__stream.read(max_bytes, timeout = timeout)
+        self._save_session()
+        return data
+
+    def write(self, buffer :bytes, timeout :Optional[float] = None) -> None:
+        self.__stream.write(buffer, timeout = timeout)
+
+    def close(self) -> None:
+        self._save_session()
+        self.__stream.close()
+
+    def start_tls(self,
+                  ssl_context :ssl.SSLContext,
+                  server_hostname :Optional[str] = None,
+                  timeout :Optional[float] = None) -> httpcore.NetworkStream:
+        start = time.perf_counter()
+        stream = self.__stream.start_tls(self.__sessions.context(ssl_context, server_hostname),
+                                         server_hostname = server_hostname,
+                                         timeout = timeout)
+        self.__sessions.record_handshake(stream.get_extra_info("ssl_object"), time.perf_counter() - start)
+        return _CountingStream(stream, self.__stats, self.__sessions, host = server_hostname)
+
+    def get_extra_info(self, info :str) -> Any:
+        return self.__stream.get_extra_info(info)
+
+class _AsyncCountingStream(httpcore.AsyncNetworkStream):
+    def __init__(self,
+                 stream :httpcore.AsyncNetworkStream,
+                 stats :MetricCounter,
+                 sessions :_TlsSessionCache,
+                 host :Optional[str] = None):
+        """Async network stream counting TLS handshakes and keeping its TLS session for next connections"""
+        self.__stream = stream
+        self.__stats = stats
+        self.__sessions = sessions
+        self.__host = host
+        self.__session_saved = host is None
+
+    def _save_session(self) -> None:
+        """Store TLS session once it is resumable"""
+        if not self.__session_saved:
+            self.__session_saved = self.__sessions.put(self.__host, self.__stream.get_extra_info("ssl_object"))
+
+    async def read(self, max_bytes :int, timeout :Optional[float] = None) -> bytes:
+        data = await self.__stream.read(max_bytes, timeout = timeout)
+        self._save_session()
+        return data
+
+    async def write(self, buffer :bytes, timeout :Optional[float] = None) -> None:
+        await self.__stream.write(buffer, timeout = timeout)
+
+    async def aclose(self) -> None:
+        self._save_session()
+        await self.__stream.aclose()
+
+    async def start_tls(self,
+                        ssl_context :ssl.SSLContext,
+                        server_hostname :Optional[str] = None,
+                        timeout :Optional[float] = None) -> httpcore.AsyncNetworkStream:
+        start = time.perf_counter()
+        # Resuming context is not a plain SSLContext, anyio then wraps it in a worker thread
+        stream = await self.__stream.start_tls(self.__sessions.context(ssl_context, server_hostname),
+                                               server_hostname = server_hostname,
+                                               timeout = timeout)
+        self.__sessions.record_handshake(stream.get_extra_info("ssl_object"), time.perf_counter() - start)
+        return _AsyncCountingStream(stream, self.__stats, self.__sessions, host = server_hostname)
+
+    def get_extra_info(self, info :str) -> Any:
+        return self.__stream.get_extra_info(info)
+
+class _CachingBackend(httpcore.SyncBackend):
+    def __init__(self, dns :_DnsCache, stats :MetricCounter, sessions :_TlsSessionCache):
+        """Network backend connecting to cached addresses, resuming TLS sessions (host name is still verified)"""
+        self.__dns = dns
+        self.__stats = stats
+        self.__sessions = sessions
+
+    def connect_tcp(self,
+                    host :str,
+                    port :int,
+                    timeout :Optional[float] = None,
+                    local_address :Optional[str] = None,
+                    socket_options :Optional[Iterable] = None) -> httpcore.NetworkStream:
+        start = time.perf_counter()
+        addresses = self.__dns.get(host)
+        if addresses is None:
+            try:
+                infos = socket.getaddrinfo(host, port, type = socket.SOCK_STREAM)
+            except OSError as e:
+                raise httpcore.ConnectError(e) from e
+            addresses = self.__dns.put(host, infos)
+        error = None
+        for address in addresses:
+            try:
+                stream = super().connect_tcp(address, port,
+                                             timeout = timeout,
+                                             local_address = local_address,
+                                             socket_options = socket_options)
+                self.__stats.increment("connections_opened")
+                self.__stats.increment("connect_seconds", time.perf_counter() - start)
+                return _CountingStream(stream, self.__stats, self.__sessions)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        # Cached addresses may be stale
+        self.__dns.invalidate(host)
+        self.__stats.increment("connect_errors")
+        raise error
+
+class _AsyncCachingBackend(httpcore.AnyIOBackend):
+    def __init__(self, dns :_DnsCache, stats :MetricCounter, sessions :_TlsSessionCache):
+        """Async network backend connecting to cached addresses, resuming TLS sessions (host name is still verified)"""
+        self.__dns = dns
+        self.__stats = stats
+        self.__sessions = sessions
+
+    async def connect_tcp(self,
+                          host :str,
+                          port :int,
+                          timeout :Optional[float] = None,
+                          local_address :Optional[str] = None,
+                          socket_options :Optional[Iterable] = None) -> httpcore.AsyncNetworkStream:
+        start = time.perf_counter()
+        addresses = self.__dns.get(host)
+        if addresses is None:
+            try:
+                infos = await anyio.getaddrinfo(host, port, type = socket.SOCK_STREAM)
+            except OSError as e:
+                raise httpcore.ConnectError(e) from e
+            addresses = self.__dns.put(host, infos)
+        error = None
+        for address in addresses:
+            try:
+                stream = await super().connect_tcp(address, port,
+                                                   timeout = timeout,
+                                                   local_address = local_address,
+                                                   socket_options = socket_options)
+                self.__stats.increment("connections_opened")
+                self.__stats.increment("connect_seconds", time.perf_counter() - start)
+                return _AsyncCountingStream(stream, self.__stats, self.__sessions)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        # Cached addresses may be stale
+        self.__dns.invalidate(host)
+        self.__stats.increment("connect_errors")
+        raise error
+
+class _SharedHTTPTransport(httpx.BaseTransport):
+    def __init__(self, owner :"SharedTransport"):
+        """Transport of one client over shared pool. Closing client leaves pool open."""
+        self.__owner = owner
+
+    def handle_request(self, request :httpx.Request) -> httpx.Response:
+        return self.__owner._handle_request(request)
+
+    def close(self) -> None:
+        pass
+
+class _SharedAsyncHTTPTransport(httpx.AsyncBaseTransport):
+    def __init__(self, owner :"SharedTransport"):
+        """Async transport of one client over shared pool of running event loop. Closing client leaves pool open."""
+        self.__owner = owner
+
+    async def handle_async_request(self, request :httpx.Request) -> httpx.Response:
+        return await self.__owner._ahandle_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+class _SharedConnector(aiohttp.TCPConnector):
+    """Connector of aiohttp sessions over shared pool. Closing session leaves pool open."""
+
+    async def close(self, *args, **kwargs) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        """Close pooled connections"""
+        await aiohttp.TCPConnector.close(self)
+
+class SharedTransport():
+    _default :Optional["SharedTransport"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self,
+                 http2 :Optional[bool] = None,
+                 max_connections :Optional[int] = 100,
+                 max_keepalive_connections :Optional[int] = 20,
+                 keepalive_expiry :Optional[float] = 30.0,
+                 connect_retries :int = 1,
+                 dns_ttl :float = 300.0,
+                 verify :bool = True,
+                 name :str = "shared_transport"):
+        """
+        Connection pool shared by HTTP clients of all providers (Groq, ElevenLabs, AssemblyAI, Deepgram, LMNT),
+        so that connections and TLS sessions opened by one request are reused by next ones instead of paying
+        a cold DNS lookup, TCP connect and TLS handshake every time. Requests to same origin are multiplexed on
+        one HTTP/2 connection when server supports it.
+        One TLS context (certificates loaded once) is used by all connections, new connections resume the TLS
+        session of a previous connection to same host, resolved addresses are cached and stats count
+        connections against requests (see connection_reuse).
+        Async pools are bound to an event loop, one pool is kept per running loop.
+        :param http2: Enable HTTP/2 (requires h2: pip install httpx[http2]). Default: None (when h2 is installed)
+        :param max_connections: Maximum number of open connections (None: no limit). Default: 100
+        :param max_keepalive_connections: Maximum number of idle connections kept open. Default: 20
+        :param keepalive_expiry: Idle time in second before a kept connection is closed. Default: 30.0
+        :param connect_retries: Retries of failed connection attempts (request is not sent yet). Default: 1
+        :param dns_ttl: Time to live of resolved addresses in second, 0 disables cache. Default: 300.0
+        :param verify: Verify TLS certificates. Default: True
+        :param name: Name used in stats. Default: shared_transport
+        """
+        if http2 is None:
+            http2 = _http2_available()
+        elif http2 and not _http2_available():
+            raise ImportError("HTTP/2 requires h2. Please install: pip install httpx[http2]")
+
+        # Define params
+        self.__http2 = http2
+        self.__limits = httpx.Limits(max_connections = max_connections,
+                                     max_keepalive_connections = max_keepalive_connections,
+                                     keepalive_expiry = keepalive_expiry)
+        self.__retries = connect_retries
+        self.__dns_ttl = dns_ttl
+        self.__stats = MetricCounter(name = name)
+        self.__dns = _DnsCache(ttl = dns_ttl, stats = self.__stats)
+        self.__sessions = _TlsSessionCache(stats = self.__stats)
+        # TLS contexts, created once (ALPN of aiohttp one is HTTP/1.1 only)
+        self.__ssl_context = httpx.create_ssl_context(verify = verify, http2 = http2)
+        self.__http1_ssl_context = httpx.create_ssl_context(verify = verify, http2 = False)
+        # Pools
+        self.__sync_pool = self._build_pool(httpx.HTTPTransport, httpcore.ConnectionPool,
+                                            _CachingBackend(self.__dns, self.__stats, self.__sessions))
+        self.__async_pools :"weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = \
+            weakref.WeakKeyDictionary()
+        self.__connectors :"weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _SharedConnector]" = \
+            weakref.WeakKeyDictionary()
+        self.__lock = threading.Lock()
+        # Views given to clients
+        self.__transport = _SharedHTTPTransport(self)
+        self.__async_transport = _SharedAsyncHTTPTransport(self)
+
+    @classmethod
+    def default(cls, **kwargs) -> "SharedTransport":
+        """Return process-wide transport, arguments only apply when it is created"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(**kwargs)
+            return cls._default
+
+    @property
+    def http2(self) -> bool:
+        """Return True when HTTP/2 is enabled"""
+        return self.__http2
+
+    @property
+    def stats(self) -> MetricCounter:
+        """
+        Return counters: requests, http2_requests, connections_opened, connect_seconds, connect_errors,
+        tls_handshakes, tls_resumed, tls_seconds, dns_lookups, dns_cache_hits (LMNT aiohttp connections are not counted)
+        """
+        return self.__stats
+
+    @property
+    def connection_reuse(self) -> Optional[float]:
+        """Return share of requests sent on an already open connection (None before first request)"""
+        requests = self.__stats.get("requests")
+        if requests == 0:
+            return None
+        return max(1.0 - self.__stats.get("connections_opened") / requests, 0.0)
+
+    def _build_pool(self, transport_class, pool_class, backend):
+        """Return httpx transport whose pool uses caching network backend"""
+        transport = transport_class(verify = self.__ssl_context,
+                                    http2 = self.__http2,
+                                    limits = self.__limits,
+                                    retries = self.__retries,
+                                    socket_options = SOCKET_OPTIONS)
+        # httpx does not expose network backend, replace pool by same one with caching backend (private attribute,
+        # only done on versions known to keep pool there)
+        version = tuple(int(part) for part in httpx.__version__.split(".")[:2] if part.isdigit())
+        if not (HTTPX_POOL_VERSIONS[0] <= version < HTTPX_POOL_VERSIONS[1]) or \
+                not isinstance(getattr(transport, "_pool", None), pool_class):
+            logger.warning(f"httpx {httpx.__version__} is not supported by network backend, "
+                           f"DNS cache, TLS session resumption and connection stats are disabled")
+            return transport
+        transport._pool = pool_class(ssl_context = self.__ssl_context,
+                                     max_connections = self.__limits.max_connections,
+                                     max_keepalive_connections = self.__limits.max_keepalive_connections,
+                                     keepalive_expiry = self.__limits.keepalive_expiry,
+                                     http1 = True,
+                                     http2 = self.__http2,
+                                     retries = self.__retries,
+                                     socket_options = SOCKET_OPTIONS,
+                                     network_backend = backend)
+        return transport
+
+    def _async_pool(self) -> httpx.AsyncHTTPTransport:
+        """Return async pool of running event loop (created on first use)"""
+        loop = asyncio.get_running_loop()
+        with self.__lock:
+            pool = self.__async_pools.get(loop)
+            if pool is None:
+                pool = self._build_pool(httpx.AsyncHTTPTransport, httpcore.AsyncConnectionPool,
+                                        _AsyncCachingBackend(self.__dns, self.__stats, self.__sessions))
+                self.__async_pools[loop] = pool
+            return pool
+
+    def _count_response(self, response :httpx.Response) -> httpx.Response:
+        """Update stats of a response"""
+        self.__stats.increment("requests")
+        if response.extensions.get("http_version") == b"HTTP/2":
+            self.__stats.increment("http2_requests")
+        return response
+
+    def _handle_request(self, request :httpx.Request) -> httpx.Response:
+        """Send request over sync pool"""
+        return self._count_response(self.__sync_pool.handle_request(request))
+
+    async def _ahandle_request(self, request :httpx.Request) -> httpx.Response:
+        """Send request over async pool of running event loop"""
+        return self._count_response(await self._async_pool().handle_async_request(request))
+
+    def transport(self) -> httpx.BaseTransport:
+        """Return transport for httpx.Client (e.g. transport keyword of Deepgram requests)"""
+        return self.__transport
+
+    def async_transport(self) -> httpx.AsyncBaseTransport:
+        """Return transport for httpx.AsyncClient, usable from any event loop"""
+        return self.__async_transport
+
+    def client(self, **kwargs) -> httpx.Client:
+        """
+        Return HTTP client over shared pool, closing it leaves pool open
+        :param kwargs: Keyword arguments of httpx.Client (base_url, headers, timeout, ...)
+        :return: httpx.Client
+        """
+        return httpx.Client(transport = self.__transport, **kwargs)
+
+    def async_client(self, **kwargs) -> httpx.AsyncClient:
+        """
+        Return async HTTP client over shared pools (can be created outside of event loop), closing it leaves
+        pools open
+        :param kwargs: Keyword arguments of httpx.AsyncClient (base_url, headers, timeout, ...)
+        :return: httpx.AsyncClient
+        """
+        return httpx.AsyncClient(transport = self.__async_transport, **kwargs)
+
+    def aiohttp_connector(self) -> aiohttp.TCPConnector:
+        """
+        Return aiohttp connector of running event loop (e.g. LMNT sessions), with same limits, keep-alive,
+        DNS cache and TLS context. Closing session leaves connector open.
+        :return: aiohttp.TCPConnector
+        """
+        loop = asyncio.get_running_loop()
+        with self.__lock:
+            connector = self.__connectors.get(loop)
+            if connector is None or connector.closed:
+                connector = _SharedConnector(limit = self.__limits.max_connections or 0,
+                                             keepalive_timeout = self.__limits.keepalive_expiry,
+                                             use_dns_cache = self.__dns_ttl > 0,
+                                             ttl_dns_cache = self.__dns_ttl or None,
+                                             ssl = self.__http1_ssl_context)
+                self.__connectors[loop] = connector
+            return connector
+
+    def warmup(self, *urls :str) -> Dict[str, Optional[float]]:
+        """
+        Open connections ahead of first requests (DNS lookup, TCP connect and TLS handshake), any response
+        status is fine
+        :param urls: Provider urls, e.g. https://api.groq.com
+        :return: Duration in second of each url (None when it failed)
+        """
+        timings = {}
+        with self.client() as client:
+            for url in urls:
+                start = time.perf_counter()
+                try:
+                    client.head(url)
+                    timings[url] = time.perf_counter() - start
+                except httpx.HTTPError:
+                    timings[url] = None
+        return timings
+
+    async def awarmup(self, *urls :str) -> Dict[str, Optional[float]]:
+        """
+        Open connections of running event loop ahead of first requests, see warmup
+        :param urls: Provider urls, e.g. https://api.groq.com
+        :return: Duration in second of each url (None when it failed)
+        """
+        async with self.async_client() as client:
+            async def head(url :str) -> Optional[float]:
+                start = time.perf_counter()
+                try:
+                    await client.head(url)
+                    return time.perf_counter() - start
+                except httpx.HTTPError:
+                    return None
+            durations = await asyncio.gather(*[head(url) for url in urls])
+        return dict(zip(urls, durations))
+
+    def close(self) -> None:
+        """Close connections of sync pool"""
+        self.__sync_pool.close()
+
+    async def aclose(self) -> None:
+        """Close connections of running event loop (httpx pool and aiohttp connector)"""
+        loop = asyncio.get_running_loop()
+        with self.__lock:
+            pool = self.__async_pools.pop(loop, None)
+            connector = self.__connectors.pop(loop, None)
+        if pool is not None:
+            await pool.aclose()
+        if connector is not None:
+            await connector.shutdown()
@@ -1,4 +1,5 @@
-from .base_recognizer import BaseRecognizer, AdvancedRecognizer, Word, TranscriptionResponse
+from .base_recognizer import BaseRecognizer, AdvancedRecognizer, CompositeRecognizer, Word, TranscriptionResponse
 from .base_phoneme_mapper import BasePhonemeMapper
 from .base_synthesizer import BaseSynthesizer
-from .base_entities import AudioType, StatusCode
\ No newline at end of file
+from .base_entities import AudioType, StatusCode
+from .readiness import ReadinessMixin
\ No newline at end of file
@@ -5,6 +5,7 @@ class AudioType(Enum):
     LINK = 1
     BINARY_IO = 2
     BYTES = 3
+    AUDIO_BUFFER = 4
 
 class StatusCode(Enum):
     SUCCESS = 0
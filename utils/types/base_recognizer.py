@@ -1,7 +1,9 @@
 from pydantic import BaseModel
-from typing import Union, BinaryIO, List
+from typing import Union, BinaryIO, List, Tuple, Optional
 from .base_entities import AudioType, StatusCode
-import os
+from ..audio import AudioBuffer, UploadEncoder, SpeechRegion
+from ..deadline import Deadline
+import asyncio, os, threading
 
 class Word(BaseModel):
     text :str
@@ -14,7 +16,12 @@ class TranscriptionResponse(BaseModel):
     text :Union[str,None] = None
     confidence: Union[float,None] = None
     segments :Union[List[Word],None] = None
-    description :str = None
+    description :Union[str,None] = None
+    provider :Union[str,None] = None
+    speech_regions :Union[List[SpeechRegion],None] = None
+    language :Union[str,None] = None
+    language_probability :Union[float,None] = None
+    duration :Union[float,None] = None
 
 class BaseRecognizer():
     def __init__(self, model = None):
@@ -26,6 +33,16 @@ class BaseRecognizer():
         """Transcribe audio into string"""
         raise NotImplementedError
 
+    @property
+    def supports_sync(self) -> bool:
+        """Return True when transcribe can be called"""
+        return True
+
+    @property
+    def supports_async(self) -> bool:
+        """Return True when atranscribe can be called"""
+        return hasattr(self, "atranscribe")
+
     @staticmethod
     def _convert_to_millisecond(time :float) -> int:
         """Convert from second to millisecond"""
@@ -40,17 +57,40 @@ class BaseRecognizer():
         # Return
         return float(time/1000)
 
+    @staticmethod
+    def _is_existed_path(path :str) -> bool:
+        """Return True when local path existed"""
+        return isinstance(path, str) and os.path.exists(path)
+
+    @staticmethod
+    def _get_upload_content(audio :Union[bytes, AudioBuffer],
+                            upload_encoder :Optional[UploadEncoder] = None) -> Tuple[bytes, str]:
+        """
+        Return content to upload with its file extension (empty when unknown), compressed when encoder is set
+        :param audio: Audio bytes or AudioBuffer
+        :param upload_encoder: Pre-upload encoder (Default: None)
+        :return: (content, extension)
+        """
+        if upload_encoder is not None:
+            return upload_encoder.encode(audio)
+        if isinstance(audio, AudioBuffer):
+            return (audio.to_wav_bytes(), "wav")
+        return (bytes(audio), "")
+
     def _get_audio_type(self,
-                        audio :Union[str, bytes, BinaryIO]):
+                        audio :Union[str, bytes, BinaryIO, AudioBuffer]):
         """
         Return Audio Type of input path
         :param audio:
         :return:
         """
-        if isinstance(audio, bytes):
+        if isinstance(audio, AudioBuffer):
+            # Return decoded audio Type
+            return AudioType.AUDIO_BUFFER
+        elif isinstance(audio, bytes):
             # Return Bytes Type
             return AudioType.BYTES
-        elif isinstance(audio, BinaryIO):
+        elif isinstance(audio, BinaryIO) or hasattr(audio, "read"):
             # Return Binary Type
             return AudioType.BINARY_IO
         elif isinstance(audio, str):
@@ -67,3 +107,92 @@ class BaseRecognizer():
 class AdvancedRecognizer(BaseRecognizer):
     def __init__(self):
         super().__init__()
+
+class CompositeRecognizer(BaseRecognizer):
+    # Event loop running async only recognizers for synchronous callers
+    _loop :Optional[asyncio.AbstractEventLoop] = None
+    _loop_lock = threading.Lock()
+
+    def __init__(self):
+        """Base class for Recognizer delegating work to other recognizers"""
+        super().__init__()
+
+    @classmethod
+    def _background_loop(cls) -> asyncio.AbstractEventLoop:
+        """Return process-wide event loop running in a daemon thread, created on first use"""
+        with cls._loop_lock:
+            if cls._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target = loop.run_forever, name = "recognizer-loop", daemon = True).start()
+                CompositeRecognizer._loop = loop
+            return cls._loop
+
+    @staticmethod
+    def _recognizer_name(recognizer :BaseRecognizer) -> str:
+        """Return readable name of recognizer (class name with model name when available)"""
+        name = type(recognizer).__name__
+        model_name = getattr(recognizer, "model_name", None)
+        return f"{name}:{model_name}" if model_name else name
+
+    @staticmethod
+    def _to_response(output :Union[str, TranscriptionResponse]) -> TranscriptionResponse:
+        """Normalize output of recognizer (Some recognizers return plain string) into TranscriptionResponse"""
+        if isinstance(output, TranscriptionResponse):
+            return output
+        if isinstance(output, str):
+            return TranscriptionResponse(text = output)
+        # Unknown output
+        return TranscriptionResponse(status_code = StatusCode.FAILED,
+                                     description = f"Unsupported output type: {type(output).__name__}")
+
+    @staticmethod
+    def _bind_deadline(kwargs :dict) -> Optional[Deadline]:
+        """
+        Replace deadline argument of a call (seconds or Deadline) by one Deadline shared by all inner recognizers,
+        so that time spent by one of them is not given again to the next one
+        :param kwargs: Keyword arguments of call, updated in place
+        :return: Deadline or None when call has no deadline
+        """
+        if kwargs.get("deadline") is None:
+            kwargs.pop("deadline", None)
+            return None
+        kwargs["deadline"] = Deadline.coerce(kwargs["deadline"])
+        return kwargs["deadline"]
+
+    def _run_recognizer(self,
+                        recognizer :BaseRecognizer,
+                        audio,
+                        **kwargs) -> TranscriptionResponse:
+        """Synchronously run an inner recognizer (on background event loop when recognizer is asynchronous only)"""
+        deadline = kwargs.get("deadline")
+        if deadline is not None:
+            Deadline.coerce(deadline).check(step = self._recognizer_name(recognizer))
+        if recognizer.supports_sync:
+            output = recognizer.transcribe(audio, **kwargs)
+            return self._to_response(output)
+        # Async only recognizer (e.g. GroqRecognizer with use_async = True)
+        return asyncio.run_coroutine_threadsafe(self._arun_recognizer(recognizer, audio, **kwargs),
+                                                self._background_loop()).result()
+
+    async def _arun_recognizer(self,
+                               recognizer :BaseRecognizer,
+                               audio,
+                               **kwargs) -> TranscriptionResponse:
+        """
+        Asynchronously run an inner recognizer (in a worker thread when recognizer is synchronous only).
+        With a deadline, recognizer is cancelled at expiry, and a worker thread is asked to stop.
+        """
+        deadline = kwargs.pop("deadline", None)
+        if deadline is None:
+            if recognizer.supports_async:
+                output = await recognizer.atranscribe(audio, **kwargs)
+            else:
+                output = await asyncio.to_thread(recognizer.transcribe, audio, **kwargs)
+            return self._to_response(output)
+
+        deadline = Deadline.coerce(deadline)
+        if recognizer.supports_async:
+            output = await deadline.run(recognizer.atranscribe(audio, deadline = deadline, **kwargs))
+        else:
+            output = await deadline.run_in_thread(recognizer.transcribe, audio, **kwargs)
+        return self._to_response(output)
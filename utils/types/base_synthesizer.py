@@ -1,15 +1,39 @@
+from ..audio.transcoder import OutputFormat, StreamTranscoder, transcode, transcode_file
+from typing import Optional
 from pathlib import Path
 audio_extension = [".aac",".mp3",".flac",".ogg",".wav"]
+# Extensions of headerless audio (output format with container none)
+raw_extension = [".raw",".pcm",".ulaw",".alaw"]
 
 class BaseSynthesizer():
-    def __init__(self, model = None):
-        """Base class for Synthesizer """
+    def __init__(self,
+                 model = None,
+                 output_format :Optional[OutputFormat] = None):
+        """
+        Base class for Synthesizer
+        :param model: Model
+        :param output_format: Convert output in process (e.g. OutputFormat.telephony()). Default: None (provider format)
+        """
         self.__model = model
         self._audio_extension = audio_extension
+        self._output_format = output_format
+
+    @property
+    def output_format(self) -> Optional[OutputFormat]:
+        """Return output format (None when provider format is kept)"""
+        return self._output_format
+
+    @property
+    def supports_async(self) -> bool:
+        """Return True when async methods (agenerate, agenerate_with_timestamps, ...) can be called"""
+        return hasattr(self, "agenerate")
 
     def _is_audio_path(self,file_path :str) -> bool:
         # Get extension
         extension = Path(file_path).suffix
+        # Headerless output
+        if self._output_format is not None and self._output_format.container == "none":
+            return extension.lower() in audio_extension + raw_extension
         # Return True or False
         return True if extension.lower() in audio_extension else False
 
@@ -24,6 +48,30 @@ class BaseSynthesizer():
             raise TypeError(f"Wrong audio format! File path must be end with ({','.join(self._audio_extension)})")
         return True
 
+    def _finalize_output(self, file_path :str) -> None:
+        """Convert generated file into output format in place"""
+        if self._output_format is not None:
+            transcode_file(file_path, self._output_format)
+
+    def _write_output(self,
+                      file_path :str,
+                      audio :bytes) -> None:
+        """Write generated audio, converted into output format"""
+        if self._output_format is not None:
+            audio = transcode(audio, self._output_format)
+        with open(file_path, "wb") as file:
+            file.write(audio)
+
+    def _stream_transcoder(self,
+                           input_encoding :str,
+                           input_sample_rate :int) -> Optional[StreamTranscoder]:
+        """Return transcoder of headerless stream into output format (None when provider format is kept)"""
+        if self._output_format is None:
+            return None
+        return StreamTranscoder(output_format = self._output_format,
+                                input_encoding = input_encoding,
+                                input_sample_rate = input_sample_rate)
+
     def generate(self,
                  text :str,
                  generated_path :str,
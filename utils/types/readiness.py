@@ -0,0 +1,57 @@
+from typing import Optional
+import asyncio, threading
+
+# Guard lazy creation of readiness events
+_LOCK = threading.Lock()
+
+class ReadinessMixin():
+    """
+    Readiness flag of locally loaded engines. An instance becomes ready after its warmup, so orchestrators
+    can route traffic only to warm instances (is_ready, wait_until_ready or await_ready).
+    """
+
+    @property
+    def _ready_event(self) -> threading.Event:
+        """Return readiness event (created on first use, subclasses dont need to call mixin constructor)"""
+        event = self.__dict__.get("_ReadinessMixin__ready")
+        if event is None:
+            with _LOCK:
+                event = self.__dict__.setdefault("_ReadinessMixin__ready", threading.Event())
+        return event
+
+    @property
+    def is_ready(self) -> bool:
+        """Return True when instance is warm"""
+        return self._ready_event.is_set()
+
+    def _set_ready(self, ready :bool = True) -> None:
+        """Mark instance as ready or not ready"""
+        if ready:
+            self._ready_event.set()
+        else:
+            self._ready_event.clear()
+
+    def wait_until_ready(self, timeout :Optional[float] = None) -> bool:
+        """
+        Block until instance is ready
+        :param timeout: Maximum waiting time in second. Default: None (no limit)
+        :return: True when ready, False on timeout
+        """
+        return self._ready_event.wait(timeout)
+
+    async def await_ready(self,
+                          timeout :Optional[float] = None,
+                          interval :float = 0.05) -> bool:
+        """
+        Wait until instance is ready without blocking event loop
+        :param timeout: Maximum waiting time in second. Default: None (no limit)
+        :param interval: Polling interval in second. Default: 0.05
+        :return: True when ready, False on timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while not self.is_ready:
+            if deadline is not None and loop.time() >= deadline:
+                return False
+            await asyncio.sleep(interval)
+        return True
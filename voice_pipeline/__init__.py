@@ -0,0 +1,2 @@
+from .voice_session import VoiceSession, TurnMetrics, ReplyHook
+from .lip_sync_pipeline import LipSyncPipeline, LipSyncResult, VisemeCue
\ No newline at end of file
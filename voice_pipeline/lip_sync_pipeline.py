@@ -0,0 +1,233 @@
+from ..utils.types import BaseSynthesizer, BaseRecognizer, BasePhonemeMapper, Word, StatusCode
+from pydantic import BaseModel
+from typing import List, Optional, Dict, Any
+from pathlib import Path
+import regex as re
+import asyncio, hashlib, json, os, shutil
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "eve_agent", "lip_sync")
+
+class VisemeCue(BaseModel):
+    viseme :str
+    start :float
+    end :float
+
+class LipSyncResult(BaseModel):
+    audio_path :str
+    # Word timings in second
+    words :List[Word] = []
+    visemes :List[VisemeCue] = []
+    # provider: timings returned by synthesizer, alignment: timings from local recognizer
+    timing_source :str = "provider"
+    cached :bool = False
+
+class LipSyncPipeline():
+    def __init__(self,
+                 synthesizer :BaseSynthesizer,
+                 mapper :Optional[BasePhonemeMapper] = None,
+                 aligner :Optional[BaseRecognizer] = None,
+                 aligner_model :str = "tiny.en",
+                 cache_dir :Optional[str] = DEFAULT_CACHE_DIR,
+                 rest_viseme :str = "X"):
+        """
+        Synthesize audio and build its time-aligned viseme track in one call. Word timings are taken from the
+        synthesizer when it supports it (generate_with_timestamps / agenerate_with_timestamps), otherwise the
+        generated audio is aligned by a local FasterWhisperRecognizer. Results are cached on disk.
+        :param synthesizer: Any synthesizer
+        :param mapper: Phoneme to viseme mapper. Default: None (PhonemizerMapper, created on first use)
+        :param aligner: Recognizer returning word timings. Default: None (FasterWhisperRecognizer, created on first use)
+        :param aligner_model: Model of default aligner. Default: tiny.en
+        :param cache_dir: Directory of cached audio and tracks, None to disable cache. Default: ~/.cache/eve_agent/lip_sync
+        :param rest_viseme: Viseme used between words. Default: X
+        """
+        # Define components
+        self.__synthesizer = synthesizer
+        self.__mapper = mapper
+        self.__aligner = aligner
+        self.__aligner_model = aligner_model
+        # Define params
+        self.__cache_dir = cache_dir
+        self.__rest_viseme = rest_viseme
+        if self.__cache_dir is not None:
+            os.makedirs(self.__cache_dir, exist_ok = True)
+
+    def _get_mapper(self) -> BasePhonemeMapper:
+        """Return mapper (created once)"""
+        if self.__mapper is None:
+            from ..phoneme_to_viseme import PhonemizerMapper
+            self.__mapper = PhonemizerMapper()
+        return self.__mapper
+
+    def _get_aligner(self) -> BaseRecognizer:
+        """Return aligner (created once)"""
+        if self.__aligner is None:
+            from ..speech_recognizer.faster_whisper_recognizer import FasterWhisperRecognizer
+            self.__aligner = FasterWhisperRecognizer(model_name = self.__aligner_model)
+        return self.__aligner
+
+    def _cache_key(self,
+                   text :str,
+                   extension :str,
+                   synthesis_kwargs :Dict[str, Any]) -> str:
+        """Return key of a synthesis request"""
+        request = {"synthesizer": type(self.__synthesizer).__name__,
+                   "text": text,
+                   "extension": extension.lower(),
+                   "kwargs": synthesis_kwargs}
+        return hashlib.sha256(json.dumps(request, sort_keys = True, default = str).encode()).hexdigest()
+
+    def _load_cached(self,
+                     key :str,
+                     generated_path :str) -> Optional[LipSyncResult]:
+        """Copy cached audio to generated path and return cached result"""
+        if self.__cache_dir is None:
+            return None
+        track_path = os.path.join(self.__cache_dir, f"{key}.json")
+        audio_path = os.path.join(self.__cache_dir, f"{key}{Path(generated_path).suffix}")
+        if not (os.path.exists(track_path) and os.path.exists(audio_path)):
+            return None
+
+        with open(track_path, "r") as file:
+            result = LipSyncResult.model_validate_json(file.read())
+        shutil.copyfile(audio_path, generated_path)
+        result.audio_path = generated_path
+        result.cached = True
+        return result
+
+    def _store(self,
+               key :str,
+               result :LipSyncResult) -> None:
+        """Save audio and track into cache"""
+        if self.__cache_dir is None:
+            return
+        audio_path = os.path.join(self.__cache_dir, f"{key}{Path(result.audio_path).suffix}")
+        track_path = os.path.join(self.__cache_dir, f"{key}.json")
+        # Write then rename, so readers never see partial files
+        shutil.copyfile(result.audio_path, f"{audio_path}.tmp")
+        os.replace(f"{audio_path}.tmp", audio_path)
+        with open(f"{track_path}.tmp", "w") as file:
+            file.write(result.model_dump_json())
+        os.replace(f"{track_path}.tmp", track_path)
+
+    def _align(self,
+               audio_path :str,
+               text :str) -> List[Word]:
+        """Return word timings (in second) of generated audio"""
+        response = self._get_aligner().transcribe(audio_path,
+                                                  in_milliseconds = False,
+                                                  detect_words = True,
+                                                  initial_prompt = text)
+        if response.status_code != StatusCode.SUCCESS:
+            raise Exception(f"Alignment failed: {response.description}")
+        return response.segments or []
+
+    def _build_track(self, words :List[Word]) -> List[VisemeCue]:
+        """Spread visemes of each word evenly over its duration, rest viseme between words"""
+        # Keep letters only
+        cleaned = [(re.sub(r"[^\p{L}\p{N}']", "", word.text), word) for word in words]
+        cleaned = [(text, word) for (text, word) in cleaned if text and word.end > word.start]
+        if len(cleaned) == 0:
+            return []
+
+        # Phonemize all words at once
+        visemes = self._get_mapper().word_to_viseme([text for (text, _) in cleaned])
+
+        cues :List[VisemeCue] = []
+        position = 0.0
+        for (word_visemes, (_, word)) in zip(visemes, cleaned):
+            # Rest before word
+            if word.start > position:
+                cues.append(VisemeCue(viseme = self.__rest_viseme, start = position, end = word.start))
+            if len(word_visemes) == 0:
+                word_visemes = [self.__rest_viseme]
+            step = (word.end - word.start) / len(word_visemes)
+            for (index, viseme) in enumerate(word_visemes):
+                start = word.start + index * step
+                # Merge with previous cue of same viseme
+                if len(cues) > 0 and cues[-1].viseme == viseme and abs(cues[-1].end - start) < 1e-6:
+                    cues[-1].end = start + step
+                else:
+                    cues.append(VisemeCue(viseme = viseme, start = start, end = start + step))
+            position = max(position, word.end)
+
+        # Round to millisecond
+        for cue in cues:
+            cue.start = round(cue.start, 3)
+            cue.end = round(cue.end, 3)
+        return cues
+
+    def generate(self,
+                 text :str,
+                 generated_path :str,
+                 **kwargs) -> LipSyncResult:
+        """
+        Synchronously synthesize audio and its viseme track
+        :param text: Text for generation
+        :param generated_path: Local file path of generated audio
+        :param kwargs: Keyword arguments passed to synthesizer (voice, ...)
+        :return: LipSyncResult
+        """
+        key = self._cache_key(text = text, extension = Path(generated_path).suffix, synthesis_kwargs = kwargs)
+        cached = self._load_cached(key = key, generated_path = generated_path)
+        if cached is not None:
+            return cached
+
+        # Synthesize with provider timings
+        if hasattr(self.__synthesizer, "generate_with_timestamps"):
+            words = self.__synthesizer.generate_with_timestamps(text = text, generated_path = generated_path, **kwargs)
+            source = "provider"
+        # Synthesize then align
+        else:
+            self.__synthesizer.generate(text = text, generated_path = generated_path, **kwargs)
+            words = self._align(audio_path = generated_path, text = text)
+            source = "alignment"
+
+        result = LipSyncResult(audio_path = generated_path,
+                               words = words,
+                               visemes = self._build_track(words),
+                               timing_source = source)
+        self._store(key = key, result = result)
+        return result
+
+    async def agenerate(self,
+                        text :str,
+                        generated_path :str,
+                        **kwargs) -> LipSyncResult:
+        """
+        Asynchronously synthesize audio and its viseme track. Blocking work runs in worker threads.
+        :param text: Text for generation
+        :param generated_path: Local file path of generated audio
+        :param kwargs: Keyword arguments passed to synthesizer (voice, ...)
+        :return: LipSyncResult
+        """
+        key = self._cache_key(text = text, extension = Path(generated_path).suffix, synthesis_kwargs = kwargs)
+        cached = await asyncio.to_thread(self._load_cached, key = key, generated_path = generated_path)
+        if cached is not None:
+            return cached
+
+        # Synthesize with provider timings
+        source = "provider"
+        if self.__synthesizer.supports_async and hasattr(self.__synthesizer, "agenerate_with_timestamps"):
+            words = await self.__synthesizer.agenerate_with_timestamps(text = text,
+                                                                       generated_path = generated_path,
+                                                                       **kwargs)
+        elif hasattr(self.__synthesizer, "generate_with_timestamps"):
+            words = await asyncio.to_thread(self.__synthesizer.generate_with_timestamps,
+                                            text = text, generated_path = generated_path, **kwargs)
+        # Synthesize then align
+        else:
+            if self.__synthesizer.supports_async:
+                await self.__synthesizer.agenerate(text = text, generated_path = generated_path, **kwargs)
+            else:
+                await asyncio.to_thread(self.__synthesizer.generate, text = text, generated_path = generated_path,
+                                        **kwargs)
+            words = await asyncio.to_thread(self._align, audio_path = generated_path, text = text)
+            source = "alignment"
+
+        visemes = await asyncio.to_thread(self._build_track, words)
+        result = LipSyncResult(audio_path = generated_path,
+                               words = words,
+                               visemes = visemes,
+                               timing_source = source)
+        await asyncio.to_thread(self._store, key = key, result = result)
+        return result
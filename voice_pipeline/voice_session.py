@@ -0,0 +1,326 @@
+from ..utils.types import BaseRecognizer, BaseSynthesizer, CompositeRecognizer, StatusCode
+from ..utils.audio import AudioBuffer, frame_levels
+from ..utils.audio.transcoder import OutputFormat, transcode
+from pydantic import BaseModel
+from typing import Callable, Awaitable, AsyncIterator, Union, Optional, List, Dict, Any
+import numpy as np
+import asyncio, logging, tempfile, time, os
+import regex as re
+
+logger = logging.getLogger(__name__)
+
+# Reply hook returns full text or an async iterator of text fragments (e.g. LLM tokens)
+ReplyHook = Callable[[str], Awaitable[Union[str, AsyncIterator[str]]]]
+
+class TurnMetrics(BaseModel):
+    turn :int
+    user_text :str = ""
+    reply_text :str = ""
+    # Latencies in second, measured from end of user speech
+    transcription_latency :Optional[float] = None
+    reply_latency :Optional[float] = None
+    first_audio_latency :Optional[float] = None
+    total_latency :Optional[float] = None
+    interrupted :bool = False
+    # Failure of recognizer, reply hook or synthesizer
+    error :Optional[str] = None
+
+class VoiceSession():
+    def __init__(self,
+                 recognizer :BaseRecognizer,
+                 synthesizer :BaseSynthesizer,
+                 reply :ReplyHook,
+                 sample_rate :int = 16000,
+                 frame_ms :int = 30,
+                 threshold_db :float = -40.0,
+                 min_speech_ms :int = 150,
+                 end_of_speech_ms :int = 600,
+                 max_utterance_s :float = 30.0,
+                 input_queue_size :int = 200,
+                 output_queue_size :int = 50,
+                 chunk_size :int = 4096,
+                 synthesis_format :str = ".wav",
+                 synthesis_kwargs :Optional[Dict[str, Any]] = None):
+        """
+        Full-duplex asyncio voice session: streaming audio in, recognizer, reply hook, synthesizer, streaming audio out.
+        Stages are connected by bounded queues. When user starts speaking again, in-flight reply and synthesis
+        are cancelled and pending output audio is dropped (barge-in).
+        :param recognizer: Any recognizer (atranscribe is used when available, transcribe runs in worker thread)
+        :param synthesizer: Any synthesizer (astream, agenerate or generate is used, in this order)
+        :param reply: Async hook receiving user text and returning reply text or async iterator of text fragments
+        :param sample_rate: Sample rate of input audio (16-bit PCM mono). Default: 16000
+        :param frame_ms: Frame length of endpointing in millisecond. Default: 30
+        :param threshold_db: Level (dBFS) above which a frame is voiced. Default: -40.0
+        :param min_speech_ms: Voiced duration needed to start an utterance (and barge in). Default: 150
+        :param end_of_speech_ms: Silence duration ending an utterance. Default: 600
+        :param max_utterance_s: Utterance longer than this is ended right away. Default: 30.0
+        :param input_queue_size: Maximum number of pending input chunks. Default: 200
+        :param output_queue_size: Maximum number of pending output chunks. Default: 50
+        :param chunk_size: Size of output chunks in bytes when synthesizer writes a whole file. Default: 4096
+        (file is decoded to headerless samples, 16-bit PCM at synthesizer rate unless synthesizer has output format)
+        :param synthesis_format: File extension used when synthesizer writes a file. Default: .wav
+        :param synthesis_kwargs: Keyword arguments passed to synthesizer (voice, ...). Default: None
+        """
+        # Define components
+        self.__recognizer = recognizer
+        self.__synthesizer = synthesizer
+        self.__reply = reply
+        # Define endpointing params
+        self.__sample_rate = sample_rate
+        self.__frame_ms = frame_ms
+        self.__frame_length = int(sample_rate * frame_ms / 1000)
+        self.__threshold_db = threshold_db
+        self.__min_speech_frames = max(int(min_speech_ms / frame_ms), 1)
+        self.__end_of_speech_frames = max(int(end_of_speech_ms / frame_ms), 1)
+        self.__max_utterance_frames = int(max_utterance_s * 1000 / frame_ms)
+        # Define synthesis params
+        self.__chunk_size = chunk_size
+        self.__synthesis_format = synthesis_format
+        self.__synthesis_kwargs = synthesis_kwargs or {}
+        # Define queues
+        self.__input_queue :asyncio.Queue = asyncio.Queue(maxsize = input_queue_size)
+        self.__utterance_queue :asyncio.Queue = asyncio.Queue(maxsize = 2)
+        self.__output_queue :asyncio.Queue = asyncio.Queue(maxsize = output_queue_size)
+        # Define state
+        self.__tasks :List[asyncio.Task] = []
+        self.__turn_task :Optional[asyncio.Task] = None
+        self.__turn_metrics :Optional[TurnMetrics] = None
+        self.__metrics :List[TurnMetrics] = []
+        self.__closed = False
+
+    @property
+    def metrics(self) -> List[TurnMetrics]:
+        """Return latency metrics and errors of finished turns"""
+        return list(self.__metrics)
+
+    @property
+    def is_replying(self) -> bool:
+        """Return True when a reply is being generated or synthesized"""
+        return self.__turn_task is not None and not self.__turn_task.done()
+
+    async def start(self) -> None:
+        """Start session stages"""
+        if len(self.__tasks) == 0:
+            self.__tasks = [asyncio.create_task(self._listen()),
+                            asyncio.create_task(self._respond())]
+
+    async def feed(self, chunk :bytes) -> None:
+        """
+        Push input audio (16-bit PCM mono at sample_rate). Waits when input queue is full.
+        :param chunk: Audio bytes
+        :return: None
+        """
+        await self.__input_queue.put(chunk)
+
+    async def output(self) -> AsyncIterator[bytes]:
+        """Iterate over output audio chunks until session is closed"""
+        while True:
+            chunk = await self.__output_queue.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    async def run(self, audio_in :AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        Convenience function: feed input iterator in background and iterate over output audio
+        :param audio_in: Async iterator of input audio chunks
+        :return: Async iterator of output audio chunks
+        """
+        async def pump():
+            async for chunk in audio_in:
+                await self.feed(chunk)
+            await self.close()
+
+        await self.start()
+        pump_task = asyncio.create_task(pump())
+        try:
+            async for chunk in self.output():
+                yield chunk
+        finally:
+            pump_task.cancel()
+
+    async def close(self) -> None:
+        """Finish pending utterance and reply, then stop session"""
+        if self.__closed:
+            return
+        self.__closed = True
+        # Signal end of input
+        await self.__input_queue.put(None)
+        if len(self.__tasks) > 0:
+            await asyncio.gather(*self.__tasks, return_exceptions = True)
+        await self.__output_queue.put(None)
+
+    def _barge_in(self) -> None:
+        """Cancel in-flight reply and drop pending output audio"""
+        if self.is_replying:
+            self.__turn_task.cancel()
+            if self.__turn_metrics is not None:
+                self.__turn_metrics.interrupted = True
+        # Drop pending output
+        while not self.__output_queue.empty():
+            self.__output_queue.get_nowait()
+
+    async def _listen(self) -> None:
+        """Endpointing stage: split input stream into utterances and detect barge-in"""
+        pending = np.zeros(0, dtype = np.float32)
+        frames :List[np.ndarray] = []
+        voiced_run = 0
+        silence_run = 0
+        in_speech = False
+
+        while True:
+            chunk = await self.__input_queue.get()
+            # End of input
+            if chunk is None:
+                if in_speech:
+                    await self.__utterance_queue.put((np.concatenate(frames), time.perf_counter()))
+                await self.__utterance_queue.put(None)
+                return
+
+            # Split into frames
+            samples = np.frombuffer(chunk, dtype = "<i2").astype(np.float32) / 32768
+            pending = np.concatenate((pending, samples))
+            num_frames = len(pending) // self.__frame_length
+            if num_frames == 0:
+                continue
+            complete = pending[:num_frames * self.__frame_length]
+            pending = pending[num_frames * self.__frame_length:]
+            levels = frame_levels(samples = complete,
+                                  sample_rate = self.__sample_rate,
+                                  frame_ms = self.__frame_ms)
+
+            for (index, level) in enumerate(levels.tolist()):
+                frame = complete[index * self.__frame_length:(index + 1) * self.__frame_length]
+                voiced = level >= self.__threshold_db
+
+                if not in_speech:
+                    # Keep short history to not cut speech onset
+                    frames.append(frame)
+                    frames = frames[-self.__min_speech_frames:]
+                    voiced_run = voiced_run + 1 if voiced else 0
+                    # Speech onset
+                    if voiced_run >= self.__min_speech_frames:
+                        in_speech = True
+                        silence_run = 0
+                        self._barge_in()
+                    continue
+
+                frames.append(frame)
+                silence_run = 0 if voiced else silence_run + 1
+                # End of speech
+                if silence_run >= self.__end_of_speech_frames or len(frames) >= self.__max_utterance_frames:
+                    await self.__utterance_queue.put((np.concatenate(frames), time.perf_counter()))
+                    frames = []
+                    in_speech = False
+                    voiced_run = 0
+
+    async def _respond(self) -> None:
+        """Turn stage: run one turn per utterance, a new utterance waits for barge-in or end of previous turn"""
+        turn = 0
+        while True:
+            item = await self.__utterance_queue.get()
+            if item is None:
+                # Finish last reply
+                if self.__turn_task is not None:
+                    await asyncio.gather(self.__turn_task, return_exceptions = True)
+                return
+
+            # Previous turn is cancelled on barge-in, otherwise wait for it
+            if self.__turn_task is not None:
+                await asyncio.gather(self.__turn_task, return_exceptions = True)
+            (samples, speech_end) = item
+            turn += 1
+            self.__turn_metrics = TurnMetrics(turn = turn)
+            self.__turn_task = asyncio.create_task(self._turn(samples = samples,
+                                                              speech_end = speech_end,
+                                                              metrics = self.__turn_metrics))
+
+    async def _turn(self,
+                    samples :np.ndarray,
+                    speech_end :float,
+                    metrics :TurnMetrics) -> None:
+        """Transcribe utterance, generate reply and stream synthesized audio"""
+        try:
+            # Transcribe
+            audio = AudioBuffer(samples = samples, sample_rate = self.__sample_rate)
+            if self.__recognizer.supports_async:
+                output = await self.__recognizer.atranscribe(audio)
+            else:
+                output = await asyncio.to_thread(self.__recognizer.transcribe, audio)
+            response = CompositeRecognizer._to_response(output)
+            metrics.transcription_latency = time.perf_counter() - speech_end
+            if response.status_code != StatusCode.SUCCESS:
+                metrics.error = response.description or "Transcription failed"
+                logger.warning(f"Turn {metrics.turn}: {metrics.error}")
+                return
+            if not (response.text or "").strip():
+                return
+            metrics.user_text = response.text.strip()
+
+            # Reply
+            reply = await self.__reply(metrics.user_text)
+            metrics.reply_latency = time.perf_counter() - speech_end
+
+            # Synthesize sentence by sentence
+            async for sentence in self._sentences(reply):
+                metrics.reply_text = f"{metrics.reply_text} {sentence}".strip()
+                async for chunk in self._synthesize(sentence):
+                    if metrics.first_audio_latency is None:
+                        metrics.first_audio_latency = time.perf_counter() - speech_end
+                    await self.__output_queue.put(chunk)
+        except Exception as e:
+            # Cancellation by barge-in (CancelledError) is not a failure
+            metrics.error = f"{type(e).__name__}: {e}"
+            logger.exception(f"Turn {metrics.turn} failed")
+        finally:
+            metrics.total_latency = time.perf_counter() - speech_end
+            self.__metrics.append(metrics)
+
+    @staticmethod
+    async def _sentences(reply :Union[str, AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Split reply into sentences, yielding each one as soon as it is complete"""
+        if isinstance(reply, str):
+            for sentence in re.split(r"(?<=[.!?;:])\s+", reply.strip()):
+                if sentence:
+                    yield sentence
+            return
+
+        text = ""
+        async for fragment in reply:
+            text += fragment
+            parts = re.split(r"(?<=[.!?;:])\s+", text)
+            # Last part may be incomplete
+            for sentence in parts[:-1]:
+                if sentence.strip():
+                    yield sentence.strip()
+            text = parts[-1]
+        if text.strip():
+            yield text.strip()
+
+    async def _synthesize(self, text :str) -> AsyncIterator[bytes]:
+        """Synthesize text and yield audio chunks"""
+        # Streaming synthesizer
+        if hasattr(self.__synthesizer, "astream"):
+            async for chunk in self.__synthesizer.astream(text, **self.__synthesis_kwargs):
+                yield chunk
+            return
+
+        # File based synthesizer
+        (descriptor, path) = tempfile.mkstemp(suffix = self.__synthesis_format)
+        os.close(descriptor)
+        try:
+            if self.__synthesizer.supports_async:
+                await self.__synthesizer.agenerate(text = text, generated_path = path, **self.__synthesis_kwargs)
+            else:
+                await asyncio.to_thread(self.__synthesizer.generate, text = text, generated_path = path,
+                                        **self.__synthesis_kwargs)
+            with open(path, "rb") as file:
+                data = file.read()
+        finally:
+            os.remove(path)
+        # Headerless samples like astream, so that sentences can be concatenated
+        output_format = self.__synthesizer.output_format or OutputFormat()
+        if output_format.container != "none":
+            data = await asyncio.to_thread(transcode, data, output_format.model_copy(update = {"container": "none"}))
+        for index in range(0, len(data), self.__chunk_size):
+            yield data[index:index + self.__chunk_size]